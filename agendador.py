@@ -0,0 +1,332 @@
+import math
+import time
+from bisect import bisect_left, insort
+from itertools import accumulate, islice
+
+from app_logic import DIAS_SEMANA, SinalProgramado, ler_sequencia, segundos_da_hora
+
+
+JANELA_ATRASO_SINAL = 60  # segundos: um sinal perdido há menos de 1 minuto (ex.: app recém-aberto) ainda toca
+MARGEM_TIMER_PRECISO_MS = 3000
+TOLERANCIA_DISPARO = 0.001  # segundos antes do prazo em que o sinal já pode ser disparado
+DURACAO_MINIMA_SINAL = 1  # segundos considerados quando a duração da música ainda não é conhecida
+
+
+def dia_da_semana(instante=None):
+    """Nome da tabela do dia (``segunda`` ... ``sexta``) no horário local, ou None no fim de semana."""
+    local = time.localtime(time.time() if instante is None else instante)
+    return DIAS_SEMANA[local.tm_wday] if local.tm_wday < len(DIAS_SEMANA) else None
+
+
+def proxima_meia_noite(instante=None):
+    """Instante (segundos desde a época) em que começa o próximo dia no horário local.
+
+    O cálculo é feito pelo ``mktime`` com ``tm_isdst=-1``, então dias de 23 ou
+    25 horas por causa do horário de verão são respeitados. Onde a meia-noite
+    não existe (o horário de verão começa às 00:00), o resultado é o primeiro
+    instante válido do novo dia.
+    """
+    instante = time.time() if instante is None else instante
+    local = time.localtime(instante)
+    return time.mktime((local.tm_year, local.tm_mon, local.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+
+
+def instante_do_horario(segundos, instante=None):
+    """Instante (segundos desde a época) do horário ``segundos`` desde a meia-noite no dia local de ``instante``."""
+    local = time.localtime(time.time() if instante is None else instante)
+    horas, resto = divmod(int(segundos), 3600)
+    minutos, segundos = divmod(resto, 60)
+    return time.mktime((local.tm_year, local.tm_mon, local.tm_mday, horas, minutos, segundos, 0, 0, -1))
+
+
+class RelogioSistema:
+    """Relógio de parede do sistema (segundos desde a época)."""
+
+    def agora(self):
+        return time.time()
+
+
+class RelogioVirtual:
+    """Relógio controlado por quem o usa, para simular dias inteiros sem esperar."""
+
+    def __init__(self, inicio):
+        self.instante = float(inicio)
+
+    def agora(self):
+        return self.instante
+
+    def avancar(self, segundos):
+        self.instante += segundos
+
+    def definir(self, instante):
+        self.instante = float(instante)
+
+
+def plano_de_espera(restante_ms, antecedencia_ms=0, margem_ms=MARGEM_TIMER_PRECISO_MS):
+    """(espera em ms, timer preciso?) até o próximo despertar, faltando ``restante_ms`` para o disparo.
+
+    Esperas longas usam um timer econômico que acorda um pouco antes do prazo
+    (ou ``antecedencia_ms`` antes, para preparar a saída de áudio); a
+    aproximação final usa um timer preciso.
+    """
+    if restante_ms > margem_ms:
+        espera_ms = restante_ms - margem_ms / 2
+        if antecedencia_ms and restante_ms > antecedencia_ms:
+            espera_ms = min(espera_ms, restante_ms - antecedencia_ms)
+        return int(espera_ms), False
+    return max(math.ceil(restante_ms), 0), True
+
+
+def _chave_horario(sinal):
+    return sinal.segundos
+
+
+def _chave_disparo(sinal):
+    # O horário entra na chave para que um sinal já tocado e movido para mais tarde toque de novo
+    return sinal.id, sinal.segundos
+
+
+def segundos_do_dia(instante):
+    """Segundos desde a meia-noite local de ``instante``, arredondados para cima."""
+    local = time.localtime(instante)
+    segundos = local.tm_hour * 3600 + local.tm_min * 60 + local.tm_sec
+    return segundos + 1 if instante % 1 else segundos
+
+
+def dia_com_mudanca_de_horario(instante):
+    """``True`` se o dia local de ``instante`` começa ou termina o horário de verão."""
+    local = time.localtime(instante)
+    inicio = time.localtime(time.mktime((local.tm_year, local.tm_mon, local.tm_mday, 0, 0, 0, 0, 0, -1)))
+    fim = time.localtime(time.mktime((local.tm_year, local.tm_mon, local.tm_mday, 23, 59, 59, 0, 0, -1)))
+    return inicio.tm_gmtoff != fim.tm_gmtoff
+
+
+class SnapshotProgramacao:
+    """Programação da semana já resolvida, somente leitura e identificada por uma versão.
+
+    As agendas são tuplas de ``SinalProgramado`` com horário válido, em ordem
+    de horário, montadas uma vez fora da thread da interface. Uma gravação não
+    altera o snapshot em uso: gera um novo, que o agendador adota trocando a
+    referência. Quem dispara os sinais nunca espera o banco nem vê uma
+    alteração pela metade. ``versao`` é a do registro de alterações.
+    """
+
+    __slots__ = ("versao", "_agendas")
+
+    def __init__(self, agendas=None, versao=0):
+        """``agendas``: ``{dia: [SinalProgramado, ...]}`` em qualquer ordem."""
+        self.versao = versao
+        self._agendas = {
+            dia: tuple(sorted((sinal for sinal in sinais if sinal.segundos is not None), key=_chave_horario))
+            for dia, sinais in (agendas or {}).items()
+        }
+
+    @classmethod
+    def da_semana(cls, sinais, versao):
+        """A partir dos sinais de todos os dias de ``MusicAppLogic.get_semana``."""
+        agendas = {}
+        for sinal in sinais:
+            agendas.setdefault(sinal.dia, []).append(sinal)
+        return cls(agendas, versao)
+
+    @classmethod
+    def das_linhas(cls, linhas_por_dia, versao):
+        """A partir de ``{dia: [(id, hora, nome, musica), ...]}``, o formato de ``exportar_programacao``."""
+        agendas = {
+            dia: [SinalProgramado(id_linha, dia, hora, nome, musica) for id_linha, hora, nome, musica in linhas]
+            for dia, linhas in linhas_por_dia.items()
+        }
+        return cls(agendas, versao)
+
+    def agenda(self, dia):
+        return self._agendas.get(dia, ())
+
+
+class AgendadorSinais:
+    """Núcleo do agendamento, sem Qt: a agenda do dia e os sinais já disparados.
+
+    O relógio é injetado (``RelogioSistema`` no aplicativo, ``RelogioVirtual``
+    no simulador), então a mesma lógica roda em tempo real ou acelerado. A
+    agenda vem do ``SnapshotProgramacao`` atual, inclusive na virada do dia.
+    """
+
+    def __init__(self, relogio=None, janela_atraso=JANELA_ATRASO_SINAL):
+        self.relogio = relogio or RelogioSistema()
+        self.janela_atraso = janela_atraso
+        self.dia = None
+        self.snapshot = SnapshotProgramacao(versao=-1)
+        self.agenda = ()
+        self.disparados = set()
+        self.latencia_ms = 0.0
+        self._mudanca_de_horario = (None, False)  # (data local, o dia tem mudança de horário?)
+
+    def trocar_dia(self, dia):
+        """Passa a valer o dia ``dia``; os disparos só são esquecidos quando o dia muda."""
+        if dia != self.dia:
+            self.disparados = set()
+            self.agenda = self.snapshot.agenda(dia)
+        self.dia = dia
+
+    def trocar_snapshot(self, snapshot):
+        """Adota ``snapshot`` se não for mais antigo que o atual; retorna se houve troca."""
+        if snapshot.versao < self.snapshot.versao:
+            return False
+        self.snapshot = snapshot
+        self.agenda = snapshot.agenda(self.dia)
+        return True
+
+    def definir_agenda(self, agenda):
+        """``agenda``: ``SinalProgramado`` do dia ordenados por ``segundos``, fora de um snapshot."""
+        self.agenda = tuple(agenda)
+
+    def _dia_com_mudanca_de_horario(self, agora, local):
+        data = (local.tm_year, local.tm_yday)
+        if self._mudanca_de_horario[0] != data:
+            self._mudanca_de_horario = (data, dia_com_mudanca_de_horario(agora))
+        return self._mudanca_de_horario[1]
+
+    def proximo_sinal(self):
+        """``(SinalProgramado, instante)`` do próximo sinal de hoje ainda não tocado, ou None."""
+        agora = self.relogio.agora()
+        limite = agora - self.janela_atraso
+        hoje = time.localtime(agora)
+        if self._dia_com_mudanca_de_horario(agora, hoje):
+            # Horas repetidas ou inexistentes (o mktime leva 02:30 para 03:30) não seguem a ordem
+            # dos segundos: nesses dias, raros, confere o instante real de cada sinal
+            candidatos = (
+                (instante_do_horario(sinal.segundos, agora), indice, sinal)
+                for indice, sinal in enumerate(self.agenda)
+                if _chave_disparo(sinal) not in self.disparados
+            )
+            proximo = min((candidato for candidato in candidatos if candidato[0] >= limite), default=None)
+            return None if proximo is None else (proximo[2], proximo[0])
+        local_limite = time.localtime(limite)
+        if (local_limite.tm_year, local_limite.tm_yday) != (hoje.tm_year, hoje.tm_yday):
+            alvo = 0  # A janela de atraso começa ontem: vale qualquer sinal de hoje
+        else:
+            alvo = segundos_do_dia(limite)
+        # A agenda está em ordem de segundos: a busca binária pula os sinais que já passaram da janela de atraso
+        inicio = bisect_left(self.agenda, alvo, key=_chave_horario)
+        for sinal in islice(self.agenda, inicio, None):
+            if _chave_disparo(sinal) not in self.disparados:
+                return sinal, instante_do_horario(sinal.segundos, agora)
+        return None
+
+    def momento_disparo(self, instante):
+        """Instante em que ``play()`` deve ser chamado para o som começar exatamente em ``instante``."""
+        return instante - self.latencia_ms / 1000
+
+    def sinal_vencido(self):
+        """Marca e retorna o próximo sinal se já é hora de dispará-lo; senão None."""
+        proximo = self.proximo_sinal()
+        if proximo is None or self.momento_disparo(proximo[1]) - self.relogio.agora() > TOLERANCIA_DISPARO:
+            return None
+        self.disparados.add(_chave_disparo(proximo[0]))
+        return proximo
+
+
+class DetectorAjusteRelogio:
+    """Detecta saltos do relógio do sistema comparando-o com o relógio monotônico.
+
+    Ajustes manuais, sincronização NTP e retorno da suspensão mudam o relógio
+    de parede sem que os timers (monotônicos) percebam.
+    """
+
+    def __init__(self, tolerancia=2.0):
+        self.tolerancia = tolerancia
+        self.reiniciar()
+
+    def reiniciar(self):
+        self._parede = time.time()
+        self._monotonico = time.monotonic()
+
+    def verificar(self):
+        """Retorna o salto em segundos (0 se dentro da tolerância) e reinicia a referência."""
+        parede = time.time() - self._parede
+        monotonico = time.monotonic() - self._monotonico
+        self.reiniciar()
+        salto = parede - monotonico
+        return salto if abs(salto) > self.tolerancia else 0.0
+
+
+def duracao_musica(musica, midias):
+    """Duração em segundos de uma música ou sequência segundo o índice de mídias (None se desconhecida)."""
+    sequencia = ler_sequencia(musica)
+    duracoes = [(midias.get(clipe) or {}).get("duracao") for clipe in sequencia["clipes"]]
+    if not duracoes or not all(duracoes):
+        return None
+    duracao = sum(duracoes) - sequencia["crossfade_ms"] / 1000 * (len(duracoes) - 1)
+    if sequencia["duracao_maxima_ms"]:
+        duracao = min(duracao, sequencia["duracao_maxima_ms"] / 1000)
+    return duracao
+
+
+def intervalo_do_sinal(hora, musica, midias):
+    """Intervalo ``(início, fim)`` em segundos do dia em que o sinal toca (None se a hora for inválida)."""
+    inicio = segundos_da_hora(hora)
+    if inicio is None:
+        return None
+    duracao = duracao_musica(musica, midias) or 0
+    return inicio, inicio + max(math.ceil(duracao), DURACAO_MINIMA_SINAL)
+
+
+class IndiceIntervalos:
+    """Intervalos ``[início, fim)`` dos sinais de um dia, ordenados pelo início.
+
+    ``maior_fim[i]`` guarda o maior fim entre os intervalos ``0..i``. Saber se
+    um novo intervalo colide com algum existente custa uma busca binária; listar
+    as colisões percorre apenas os intervalos que ainda podem alcançar o início.
+    """
+
+    def __init__(self, intervalos=()):
+        self._itens = sorted(intervalos, key=lambda item: (item[0], item[1]))
+        self._inicios = [inicio for inicio, _, _ in self._itens]
+        self._maior_fim = list(accumulate((fim for _, fim, _ in self._itens), max))
+
+    def __len__(self):
+        return len(self._itens)
+
+    def adicionar(self, inicio, fim, chave):
+        posicao = bisect_left(self._inicios, inicio)
+        insort(self._inicios, inicio)
+        self._itens.insert(posicao, (inicio, fim, chave))
+        anterior = self._maior_fim[posicao - 1] if posicao else fim
+        self._maior_fim.insert(posicao, max(anterior, fim))
+        for indice in range(posicao + 1, len(self._maior_fim)):
+            if self._maior_fim[indice] >= self._maior_fim[indice - 1]:
+                break
+            self._maior_fim[indice] = self._maior_fim[indice - 1]
+
+    def colide(self, inicio, fim):
+        """``True`` se ``[inicio, fim)`` se sobrepõe a algum intervalo, em O(log n)."""
+        limite = bisect_left(self._inicios, fim)
+        return limite > 0 and self._maior_fim[limite - 1] > inicio
+
+    def sobreposicoes(self, inicio, fim, ignorar=None):
+        """Intervalos ``(inicio, fim, chave)`` que se sobrepõem a ``[inicio, fim)``, exceto a chave ``ignorar``."""
+        encontrados = []
+        indice = bisect_left(self._inicios, fim) - 1
+        # Antes do ponto em que o maior fim não alcança o início, nenhum intervalo pode colidir
+        while indice >= 0 and self._maior_fim[indice] > inicio:
+            item = self._itens[indice]
+            if item[1] > inicio and item[2] != ignorar:
+                encontrados.append(item)
+            indice -= 1
+        encontrados.reverse()
+        return encontrados
+
+    def conflitos(self):
+        """{chave: [(inicio, fim, chave), ...]} de cada intervalo que se sobrepõe a outro."""
+        resultado = {}
+        for indice, item in enumerate(self._itens):
+            # Cada par é visto uma vez, a partir do intervalo que começa depois
+            anterior = indice - 1
+            while anterior >= 0 and self._maior_fim[anterior] > item[0]:
+                outro = self._itens[anterior]
+                if outro[1] > item[0]:
+                    resultado.setdefault(item[2], []).append(outro)
+                    resultado.setdefault(outro[2], []).append(item)
+                anterior -= 1
+        for lista in resultado.values():
+            lista.sort(key=lambda outro: outro[0])
+        return resultado
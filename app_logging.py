@@ -0,0 +1,91 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+
+ARQUIVO_LOG = "sinal.log"
+TAMANHO_MAXIMO_LOG = 1024 * 1024
+ARQUIVOS_ANTIGOS_LOG = 5  # sinal.log.1 ... sinal.log.5
+VARIAVEL_NIVEIS = "SINAL_LOG"
+NIVEL_PADRAO = logging.INFO
+SUBSISTEMAS = ("storage", "scheduler", "player", "updater", "media", "sync", "startup", "diagnostics")
+FORMATO = "%(asctime)s.%(msecs)03d %(levelname)-7s %(name)s [%(threadName)s] %(message)s"
+
+
+class _FilaSemFormatacao(logging.handlers.QueueHandler):
+    """Enfileira o registro como está: a formatação é feita pela thread do ``QueueListener``.
+
+    O ``QueueHandler`` padrão formata a mensagem na thread que registrou; aqui a
+    thread da interface e a do sinal só criam o ``LogRecord`` e o colocam em uma
+    fila sem limite, que nunca bloqueia. Por isso os argumentos da mensagem não
+    devem ser alterados depois de registrados.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def ler_niveis(texto):
+    """``"scheduler=DEBUG,storage=WARNING"`` (ou só ``"DEBUG"`` para todos) em ``{subsistema: nível}``."""
+    niveis = {}
+    for parte in (texto or "").split(","):
+        nome, _, nivel = parte.strip().rpartition("=")
+        nivel = logging.getLevelName(nivel.strip().upper())
+        if not isinstance(nivel, int):
+            continue
+        for subsistema in ([nome.strip()] if nome else SUBSISTEMAS):
+            niveis[subsistema] = nivel
+    return niveis
+
+
+def configurar_registro(pasta, niveis=None):
+    """Liga o registro do aplicativo em ``<pasta>/sinal.log`` e retorna o ``QueueListener``.
+
+    Os loggers ``sinal.<subsistema>`` só enfileiram; uma thread de fundo grava
+    no arquivo (com rotação por tamanho) e, quando existe console, no
+    ``stderr``. No executável sem console (``--noconsole``) o ``stderr`` é
+    ``None`` e apenas o arquivo é usado. Os níveis por subsistema vêm de
+    ``niveis`` ou da variável ``SINAL_LOG``.
+    """
+    fila = queue.SimpleQueue()
+    formatador = logging.Formatter(FORMATO, "%Y-%m-%d %H:%M:%S")
+    destinos = []
+    try:
+        arquivo = logging.handlers.RotatingFileHandler(
+            os.path.join(pasta, ARQUIVO_LOG),
+            maxBytes=TAMANHO_MAXIMO_LOG,
+            backupCount=ARQUIVOS_ANTIGOS_LOG,
+            encoding="utf-8",
+            delay=True,
+        )
+        destinos.append(arquivo)
+    except OSError as e:
+        if sys.stderr is not None:
+            sys.stderr.write(f"Não foi possível abrir o arquivo de log: {e}\n")
+    if sys.stderr is not None:
+        destinos.append(logging.StreamHandler(sys.stderr))
+    for destino in destinos:
+        destino.setFormatter(formatador)
+
+    # O formato não usa arquivo/linha nem processo: evita percorrer a pilha a cada registro
+    logging._srcfile = None
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    raiz = logging.getLogger("sinal")
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.addHandler(_FilaSemFormatacao(fila))
+    raiz.setLevel(NIVEL_PADRAO)
+    raiz.propagate = False
+    for subsistema, nivel in (niveis if niveis is not None else ler_niveis(os.environ.get(VARIAVEL_NIVEIS))).items():
+        logging.getLogger(f"sinal.{subsistema}").setLevel(nivel)
+
+    ouvinte = logging.handlers.QueueListener(fila, *destinos, respect_handler_level=True)
+    ouvinte.start()
+    # Ao sair, o ouvinte grava o que ainda estiver na fila antes de encerrar
+    atexit.register(ouvinte.stop)
+    return ouvinte
@@ -1,22 +1,232 @@
+import json
+import logging
+import os
 import sqlite3
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
+
+DIAS_SEMANA = ["segunda", "terça", "quarta", "quinta", "sexta"]
+CONSULTA_SEMANA = "SELECT * FROM ({}) ORDER BY segundos IS NULL, segundos, hora".format(
+    " UNION ALL ".join(f"SELECT '{dia}' AS dia, id, hora, segundos, nome, musica FROM {dia}" for dia in DIAS_SEMANA)
+)
+
+logger = logging.getLogger("sinal.storage")
+
+
+def segundos_da_hora(hora):
+    """Converte ``HH:MM`` ou ``HH:MM:SS`` em segundos desde a meia-noite (None se inválido)."""
+    try:
+        partes = [int(parte) for parte in str(hora).split(":")]
+    except (TypeError, ValueError):
+        return None
+    if len(partes) == 2:
+        partes.append(0)
+    if len(partes) != 3:
+        return None
+    horas, minutos, segundos = partes
+    if not (0 <= horas < 24 and 0 <= minutos < 60 and 0 <= segundos < 60):
+        return None
+    return horas * 3600 + minutos * 60 + segundos
+
+
+def hora_dos_segundos(segundos):
+    """Texto exibido e sincronizado: ``HH:MM`` quando os segundos são zero, senão ``HH:MM:SS``."""
+    horas, resto = divmod(int(segundos), 3600)
+    minutos, segundos = divmod(resto, 60)
+    if segundos:
+        return f"{horas:02d}:{minutos:02d}:{segundos:02d}"
+    return f"{horas:02d}:{minutos:02d}"
+
+
+def ler_sequencia(musica):
+    """Interpreta a coluna ``musica``: um caminho simples ou uma sequência em JSON.
+
+    Retorna ``{"clipes": [...], "crossfade_ms": int, "duracao_maxima_ms": int}``;
+    um caminho simples vira uma sequência de um único clipe.
+    """
+    if isinstance(musica, str) and musica.startswith("{"):
+        try:
+            dados = json.loads(musica)
+            clipes = [str(clipe) for clipe in dados.get("clipes", []) if clipe]
+            return {
+                "clipes": clipes,
+                "crossfade_ms": max(int(dados.get("crossfade_ms", 0)), 0),
+                "duracao_maxima_ms": max(int(dados.get("duracao_maxima_ms", 0)), 0),
+            }
+        except (AttributeError, TypeError, ValueError):
+            pass
+    return {"clipes": [musica] if musica else [], "crossfade_ms": 0, "duracao_maxima_ms": 0}
+
+
+def montar_sequencia(clipes, crossfade_ms=0, duracao_maxima_ms=0):
+    """Valor gravado em ``musica``: o próprio caminho quando há um único clipe sem opções."""
+    clipes = [clipe for clipe in clipes if clipe]
+    if len(clipes) == 1 and not crossfade_ms and not duracao_maxima_ms:
+        return clipes[0]
+    return json.dumps(
+        {"clipes": clipes, "crossfade_ms": int(crossfade_ms), "duracao_maxima_ms": int(duracao_maxima_ms)},
+        ensure_ascii=False,
+    )
+
+
+@lru_cache(maxsize=4096)
+def clipes_da_musica(musica):
+    """Clipes de ``musica`` como tupla de caminhos internados; cada valor distinto é interpretado uma vez só."""
+    return tuple(sys.intern(clipe) for clipe in ler_sequencia(musica)["clipes"])
+
+
+@lru_cache(maxsize=4096)
+def nome_arquivo(caminho):
+    return sys.intern(os.path.basename(caminho))
+
+
+class SinalProgramado:
+    """Um sinal da programação já interpretado: horário em segundos e textos compartilhados.
+
+    Hora, nome e música passam por ``sys.intern``, então um caminho ou nome
+    repetido em vários dias ocupa memória uma vez só, e a sequência de clipes
+    vem de ``clipes_da_musica`` (uma tupla compartilhada por música). Com
+    ``__slots__`` não há ``__dict__`` por sinal. ``segundos`` é None quando a
+    hora gravada é inválida.
+    """
+
+    __slots__ = ("id", "dia", "segundos", "hora", "nome", "musica", "clipes")
+
+    def __init__(self, id_linha, dia, hora, nome, musica, segundos=None):
+        intern = sys.intern
+        self.id = id_linha
+        self.dia = intern(dia)
+        self.hora = hora = intern(hora) if hora.__class__ is str else hora
+        self.segundos = segundos_da_hora(hora) if segundos is None else segundos
+        self.nome = intern(nome) if nome.__class__ is str else nome
+        self.musica = musica = intern(musica) if musica.__class__ is str else musica
+        self.clipes = clipes_da_musica(musica)
+
+    def __repr__(self):
+        return f"SinalProgramado({self.dia} {self.hora} {self.nome!r})"
+
+    @property
+    def rotulo(self):
+        """Nomes dos arquivos, sem a pasta, como aparecem na tabela."""
+        return " + ".join(nome_arquivo(clipe) for clipe in self.clipes)
+
+
+def ordem_do_sinal(sinal):
+    """Chave de ``sorted`` com a mesma ordem das consultas: segundos, horas inválidas por último."""
+    return sinal.segundos is None, sinal.segundos or 0, sinal.hora or ""
+
+
+class _GrupoAlteracoes:
+    """Grupo do diário, gravado só quando a primeira alteração é registrada.
+
+    Ações que não mudam nenhuma linha (uma sincronização sem novidades, uma
+    edição com o mesmo valor) não deixam grupos vazios no histórico nem
+    descartam o que estava disponível para refazer.
+    """
+
+    __slots__ = ("cursor", "tipo", "descricao", "id")
+
+    def __init__(self, cursor, tipo, descricao):
+        self.cursor = cursor
+        self.tipo = tipo
+        self.descricao = descricao
+        self.id = None
+
+    def obter_id(self):
+        if self.id is None:
+            self.cursor.execute(
+                "INSERT INTO grupos_alteracoes (tipo, descricao, momento) VALUES (?, ?, ?)",
+                (self.tipo, self.descricao, time.time()),
+            )
+            self.id = self.cursor.lastrowid
+            if self.tipo == "edicao":
+                # Uma nova edição descarta o que estava disponível para refazer
+                self.cursor.execute(
+                    "UPDATE grupos_alteracoes SET desfeito=2 WHERE tipo='edicao' AND desfeito=1 AND grupo<>?", (self.id,)
+                )
+        return self.id
+
+
+def diretorio_aplicativo():
+    if getattr(sys, "frozen", False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
 
 class MusicAppLogic:
-    def __init__(self, arquivo_dados):
+    def __init__(self, arquivo_dados, inicializar=True):
         self.arquivo_dados = arquivo_dados
-        self.criar_tabelas()
+        if inicializar:
+            self.criar_tabelas()
 
     def criar_tabelas(self):
         try:
             conn = sqlite3.connect(self.arquivo_dados)
             cursor = conn.cursor()
 
-            for dia in ["segunda", "terça", "quarta", "quinta", "sexta"]:
+            for dia in DIAS_SEMANA:
                 cursor.execute(f"CREATE TABLE IF NOT EXISTS {dia} (hora TEXT, nome TEXT, musica TEXT)")
+                self._migrar_ids(cursor, dia)
+                self._migrar_segundos(cursor, dia)
+            cursor.execute("CREATE TABLE IF NOT EXISTS configuracoes (chave TEXT PRIMARY KEY, valor TEXT)")
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS alteracoes ("
+                "versao INTEGER PRIMARY KEY AUTOINCREMENT, dia TEXT, operacao TEXT, id TEXT, "
+                "hora TEXT, nome TEXT, musica TEXT, momento REAL)"
+            )
+            colunas = [coluna[1] for coluna in cursor.execute("PRAGMA table_info(alteracoes)")]
+            for coluna in ("grupo INTEGER", "hora_anterior TEXT", "nome_anterior TEXT", "musica_anterior TEXT"):
+                if coluna.split()[0] not in colunas:
+                    cursor.execute(f"ALTER TABLE alteracoes ADD COLUMN {coluna}")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_alteracoes_grupo ON alteracoes (grupo)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_alteracoes_momento ON alteracoes (momento)")
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS grupos_alteracoes ("
+                "grupo INTEGER PRIMARY KEY AUTOINCREMENT, tipo TEXT, descricao TEXT, momento REAL, "
+                "desfeito INTEGER NOT NULL DEFAULT 0)"
+            )
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_grupos_desfeito ON grupos_alteracoes (tipo, desfeito)")
 
             conn.commit()
             conn.close()
         except Exception as e:
-            print(f"Erro ao criar tabelas: {str(e)}")
+            logger.exception("Erro ao criar tabelas: %s", e)
+
+    @staticmethod
+    def _migrar_ids(cursor, dia):
+        # Bancos antigos não possuem identificador estável por linha
+        colunas = [coluna[1] for coluna in cursor.execute(f"PRAGMA table_info({dia})")]
+        if "id" not in colunas:
+            cursor.execute(f"ALTER TABLE {dia} ADD COLUMN id TEXT")
+        cursor.execute(f"UPDATE {dia} SET id=lower(hex(randomblob(16))) WHERE id IS NULL")
+        cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{dia}_id ON {dia} (id)")
+
+    @staticmethod
+    def _migrar_segundos(cursor, dia):
+        # O horário em segundos desde a meia-noite é a referência usada para agendar os sinais
+        colunas = [coluna[1] for coluna in cursor.execute(f"PRAGMA table_info({dia})")]
+        if "segundos" not in colunas:
+            cursor.execute(f"ALTER TABLE {dia} ADD COLUMN segundos INTEGER")
+        pendentes = cursor.execute(f"SELECT rowid, hora FROM {dia} WHERE segundos IS NULL").fetchall()
+        cursor.executemany(
+            f"UPDATE {dia} SET segundos=? WHERE rowid=?",
+            [(segundos_da_hora(hora), rowid) for rowid, hora in pendentes if segundos_da_hora(hora) is not None],
+        )
+
+    @contextmanager
+    def transacao(self):
+        conn = sqlite3.connect(self.arquivo_dados)
+        try:
+            yield conn.cursor()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
 
     def executar_query(self, query, params=()):
         try:
@@ -26,7 +236,7 @@ class MusicAppLogic:
             conn.commit()
             conn.close()
         except Exception as e:
-            print(f"Erro ao executar query: {str(e)}")
+            logger.exception("Erro ao executar query: %s", e)
 
     def selecionar_query(self, query, params=()):
         try:
@@ -37,21 +247,503 @@ class MusicAppLogic:
             conn.close()
             return resultados
         except Exception as e:
-            print(f"Erro ao executar query de seleção: {str(e)}")
+            logger.exception("Erro ao executar query de seleção: %s", e)
             return []
 
     def get_musicas_por_dia(self, dia):
         return self.selecionar_query(f"SELECT hora, nome, musica FROM {dia.lower()}")
 
+    def get_agenda_por_dia(self, dia):
+        """Sinais do dia como (segundos, hora, nome, musica), em ordem de horário."""
+        return self.selecionar_query(
+            f"SELECT segundos, hora, nome, musica FROM {dia.lower()} WHERE segundos IS NOT NULL ORDER BY segundos"
+        )
+
+    def get_config(self, chave, padrao=None):
+        resultado = self.selecionar_query("SELECT valor FROM configuracoes WHERE chave=?", (chave,))
+        return resultado[0][0] if resultado else padrao
+
+    def set_config(self, chave, valor):
+        self.executar_query(
+            "INSERT OR REPLACE INTO configuracoes (chave, valor) VALUES (?, ?)",
+            (chave, None if valor is None else str(valor)),
+        )
+
+    def listar_musicas_referenciadas(self):
+        consulta = " UNION ".join(f"SELECT musica FROM {dia}" for dia in DIAS_SEMANA)
+        caminhos = []
+        for (musica,) in self.selecionar_query(consulta):
+            caminhos.extend(ler_sequencia(musica)["clipes"])
+        return list(dict.fromkeys(caminhos))
+
+    # Todas as alterações passam pelas primitivas abaixo, que gravam no diário
+    # (tabela alteracoes) o estado novo e o anterior de cada linha. Cada ação do
+    # usuário forma um grupo, que é a unidade de desfazer/refazer.
+
+    @staticmethod
+    def _novo_grupo(cursor, tipo, descricao):
+        return _GrupoAlteracoes(cursor, tipo, descricao)
+
+    @staticmethod
+    def _registrar_alteracao(cursor, grupo, dia, operacao, id_linha, novo=None, anterior=None):
+        novo = novo or (None, None, None)
+        anterior = anterior or (None, None, None)
+        cursor.execute(
+            "INSERT INTO alteracoes (grupo, dia, operacao, id, hora, nome, musica, "
+            "hora_anterior, nome_anterior, musica_anterior, momento) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (grupo.obter_id(), dia, operacao, id_linha, *novo, *anterior, time.time()),
+        )
+
+    @staticmethod
+    def _ler_linha(cursor, dia, id_linha):
+        return cursor.execute(f"SELECT hora, nome, musica FROM {dia} WHERE id=?", (id_linha,)).fetchone()
+
+    @staticmethod
+    def _normalizar_hora(hora):
+        segundos = segundos_da_hora(hora)
+        return (hora if segundos is None else hora_dos_segundos(segundos)), segundos
+
+    def _inserir(self, cursor, grupo, dia, id_linha, hora, nome, musica):
+        hora, segundos = self._normalizar_hora(hora)
+        cursor.execute(
+            f"INSERT INTO {dia} (id, hora, segundos, nome, musica) VALUES (?, ?, ?, ?, ?)",
+            (id_linha, hora, segundos, nome, musica),
+        )
+        self._registrar_alteracao(cursor, grupo, dia, "insert", id_linha, (hora, nome, musica))
+        return True
+
+    def _atualizar(self, cursor, grupo, dia, id_linha, **valores):
+        """Altera os campos de uma linha. Retorna False (e não grava nada) se os valores já eram esses."""
+        anterior = self._ler_linha(cursor, dia, id_linha)
+        if anterior is None:
+            return False
+        if "hora" in valores:
+            valores["hora"], valores["segundos"] = self._normalizar_hora(valores["hora"])
+        novo = tuple(valores.get(campo, atual) for campo, atual in zip(("hora", "nome", "musica"), anterior))
+        if novo == anterior:
+            return False
+        atribuicoes = ", ".join(f"{campo}=?" for campo in valores)
+        cursor.execute(f"UPDATE {dia} SET {atribuicoes} WHERE id=?", (*valores.values(), id_linha))
+        self._registrar_alteracao(cursor, grupo, dia, "update", id_linha, novo, anterior)
+        return True
+
+    def _remover(self, cursor, grupo, dia, id_linha):
+        anterior = self._ler_linha(cursor, dia, id_linha)
+        if anterior is None:
+            return False
+        cursor.execute(f"DELETE FROM {dia} WHERE id=?", (id_linha,))
+        self._registrar_alteracao(cursor, grupo, dia, "delete", id_linha, anterior=anterior)
+        return True
+
+    def _gravar(self, cursor, grupo, dia, id_linha, hora, nome, musica):
+        if self._ler_linha(cursor, dia, id_linha) is None:
+            return self._inserir(cursor, grupo, dia, id_linha, hora, nome, musica)
+        return self._atualizar(cursor, grupo, dia, id_linha, hora=hora, nome=nome, musica=musica)
+
+    def get_linhas_por_dia(self, dia):
+        return self.selecionar_query(f"SELECT id, hora, nome, musica FROM {dia.lower()}")
+
+    def get_sinais_por_dia(self, dia):
+        """``SinalProgramado`` do dia em ordem de horário (horas inválidas por último)."""
+        return [
+            SinalProgramado(id_linha, dia, hora, nome, musica, segundos)
+            for id_linha, hora, segundos, nome, musica in self.selecionar_query(
+                f"SELECT id, hora, segundos, nome, musica FROM {self.validar_dia(dia)} "
+                "ORDER BY segundos IS NULL, segundos, hora"
+            )
+        ]
+
+    def get_semana(self):
+        """``SinalProgramado`` de todos os dias, lidos em uma única consulta e em ordem de horário."""
+        return [SinalProgramado(id_linha, dia, hora, nome, musica, segundos)
+                for dia, id_linha, hora, segundos, nome, musica in self.selecionar_query(CONSULTA_SEMANA)]
+
+    def get_semana_com_versao(self):
+        """``(sinais de get_semana, versão)`` lidos na mesma transação, para montar o snapshot do agendador."""
+        with self.transacao() as cursor:
+            # Transação explícita: a versão e as linhas vêm do mesmo estado do banco
+            cursor.execute("BEGIN")
+            versao = cursor.execute("SELECT MAX(versao) FROM alteracoes").fetchone()[0]
+            linhas = cursor.execute(CONSULTA_SEMANA).fetchall()
+        sinais = [SinalProgramado(id_linha, dia, hora, nome, musica, segundos)
+                  for dia, id_linha, hora, segundos, nome, musica in linhas]
+        return sinais, versao if versao is not None else self.versao_base()
+
+    def buscar_ids(self, dia, hora, nome, musica=None):
+        if musica is None:
+            consulta = self.selecionar_query(f"SELECT id FROM {dia.lower()} WHERE hora=? AND nome=?", (hora, nome))
+        else:
+            consulta = self.selecionar_query(
+                f"SELECT id FROM {dia.lower()} WHERE hora=? AND nome=? AND musica=?", (hora, nome, musica)
+            )
+        return [id_linha for (id_linha,) in consulta]
+
+    def dias_com_itens_similares(self, dia_ignorado, hora, nome, musica):
+        dias = []
+        with self.transacao() as cursor:
+            for dia in DIAS_SEMANA:
+                if dia == dia_ignorado:
+                    continue
+                encontrado = cursor.execute(
+                    f"SELECT 1 FROM {dia} WHERE hora=? AND nome=? AND musica=? LIMIT 1", (hora, nome, musica)
+                ).fetchone()
+                if encontrado:
+                    dias.append(dia)
+        return dias
+
     def adicionar_musica(self, dia, hora, nome, musica):
-        self.executar_query(f"INSERT INTO {dia.lower()} (hora, nome, musica) VALUES (?, ?, ?)", (hora, nome, musica))
-        print("Nova música adicionada com sucesso!")
+        dia = dia.lower()
+        id_linha = uuid.uuid4().hex
+        try:
+            with self.transacao() as cursor:
+                grupo = self._novo_grupo(cursor, "edicao", f"Adicionar '{nome}'")
+                self._inserir(cursor, grupo, dia, id_linha, hora, nome, musica)
+            logger.info("Sinal adicionado: dia=%s hora=%s nome=%s", dia, hora, nome)
+        except Exception as e:
+            logger.exception("Erro ao adicionar música: %s", e)
+        return id_linha
+
+    def adicionar_musicas(self, dias, hora, nome, musica):
+        """Adiciona a mesma música em vários dias como uma única ação (um único desfazer)."""
+        ids = {}
+        try:
+            with self.transacao() as cursor:
+                grupo = self._novo_grupo(cursor, "edicao", f"Adicionar '{nome}'")
+                for dia in dias:
+                    ids[dia.lower()] = uuid.uuid4().hex
+                    self._inserir(cursor, grupo, dia.lower(), ids[dia.lower()], hora, nome, musica)
+            logger.info("Sinal adicionado: dias=%s hora=%s nome=%s", ",".join(ids), hora, nome)
+        except Exception as e:
+            logger.exception("Erro ao adicionar música: %s", e)
+        return ids
+
+    def _substituir_musica(self, cursor, grupo, musica_antiga, musica_nova):
+        """Troca ``musica_antiga`` por ``musica_nova`` em todos os dias; retorna quantas linhas mudaram."""
+        alteradas = 0
+        for dia in DIAS_SEMANA:
+            linhas = cursor.execute(
+                f"SELECT id, musica FROM {dia} WHERE musica=? OR musica LIKE '{{%'", (musica_antiga,)
+            ).fetchall()
+            for id_linha, musica in linhas:
+                if musica == musica_antiga:
+                    alteradas += self._atualizar(cursor, grupo, dia, id_linha, musica=musica_nova)
+                    continue
+                # Sequência: troca apenas os clipes que apontam para o arquivo antigo
+                sequencia = ler_sequencia(musica)
+                if musica_antiga not in sequencia["clipes"]:
+                    continue
+                clipes = [musica_nova if clipe == musica_antiga else clipe for clipe in sequencia["clipes"]]
+                nova = montar_sequencia(clipes, sequencia["crossfade_ms"], sequencia["duracao_maxima_ms"])
+                alteradas += self._atualizar(cursor, grupo, dia, id_linha, musica=nova)
+        return alteradas
 
     def deletar_musica(self, dia, hora, nome):
-        self.executar_query(f"DELETE FROM {dia.lower()} WHERE hora=? AND nome=?", (hora, nome))
-        print("Música deletada com sucesso!")
+        self.deletar_musicas([(dia, id_linha) for id_linha in self.buscar_ids(dia, hora, nome)])
+
+    def deletar_musicas(self, itens):
+        """Remove as linhas ``[(dia, id), ...]`` como uma única ação."""
+        try:
+            with self.transacao() as cursor:
+                grupo = self._novo_grupo(cursor, "edicao", f"Deletar {len(itens)} sinal(is)")
+                for dia, id_linha in itens:
+                    self._remover(cursor, grupo, dia.lower(), id_linha)
+            logger.info("Sinais removidos: %d", len(itens))
+        except Exception as e:
+            logger.exception("Erro ao deletar música: %s", e)
 
     def editar_musica(self, dia, hora, nome, campo, nova_informacao=None):
-        query = f"UPDATE {dia.lower()} SET {campo}=? WHERE hora=? AND nome=?"
-        self.executar_query(query, (nova_informacao, hora, nome) if nova_informacao else (None, hora, nome))
-        print(f"Informação editada com sucesso para o campo {campo}!")
+        for id_linha in self.buscar_ids(dia, hora, nome):
+            self.editar_musica_por_id(dia, id_linha, campo, nova_informacao)
+
+    def editar_musica_por_id(self, dia, id_linha, campo, nova_informacao=None):
+        if campo not in ("hora", "nome", "musica"):
+            raise ValueError(f"Campo inválido: {campo}")
+        try:
+            with self.transacao() as cursor:
+                grupo = self._novo_grupo(cursor, "edicao", f"Editar {campo}")
+                self._atualizar(cursor, grupo, dia.lower(), id_linha, **{campo: nova_informacao or None})
+            logger.info("Sinal editado: dia=%s id=%s campo=%s", dia, id_linha, campo)
+        except Exception as e:
+            logger.exception("Erro ao editar música: %s", e)
+
+    @staticmethod
+    def validar_dia(dia):
+        dia = str(dia or "").lower()
+        if dia not in DIAS_SEMANA:
+            raise ValueError(f"Dia inválido: {dia!r} (use {', '.join(DIAS_SEMANA)})")
+        return dia
+
+    def aplicar_lote(self, operacoes, descricao=None):
+        """Aplica ``operacoes`` em uma única transação e como uma única ação de desfazer.
+
+        Cada operação é um dicionário com ``operacao`` igual a ``adicionar``
+        (``dias``/``dia``, ``hora``, ``nome``, ``musica``), ``remover`` (``dia``,
+        ``id``), ``editar`` (``dia``, ``id`` e os campos alterados),
+        ``copiar_dia`` (``origem``, ``destino``, ``substituir``) ou
+        ``substituir_musica`` (``antiga``, ``nova``: troca o arquivo em todos os
+        dias, inclusive dentro de sequências). Qualquer erro
+        levanta ``ValueError`` e desfaz o lote inteiro. Retorna um resumo com
+        as quantidades e os ids criados.
+        """
+        resumo = {"adicionados": 0, "removidos": 0, "editados": 0, "ids": []}
+        with self.transacao() as cursor:
+            grupo = self._novo_grupo(cursor, "edicao", descricao or f"Lote de {len(operacoes)} alteração(ões)")
+            for numero, operacao in enumerate(operacoes, 1):
+                try:
+                    self._aplicar_operacao(cursor, grupo, operacao, resumo)
+                except (KeyError, TypeError, ValueError) as e:
+                    raise ValueError(f"Operação {numero}: {e}") from e
+        logger.info("Lote aplicado: %s", resumo)
+        return resumo
+
+    def _aplicar_operacao(self, cursor, grupo, operacao, resumo):
+        tipo = operacao["operacao"]
+        if tipo == "adicionar":
+            if segundos_da_hora(operacao["hora"]) is None:
+                raise ValueError(f"Hora inválida: {operacao['hora']!r}")
+            if not operacao.get("musica"):
+                raise ValueError("Música não informada")
+            dias = operacao.get("dias") or [operacao["dia"]]
+            for dia in dias:
+                id_linha = uuid.uuid4().hex
+                self._inserir(
+                    cursor, grupo, self.validar_dia(dia), id_linha, operacao["hora"], operacao.get("nome") or "",
+                    operacao["musica"],
+                )
+                resumo["ids"].append(id_linha)
+                resumo["adicionados"] += 1
+        elif tipo in ("remover", "editar"):
+            dia = self.validar_dia(operacao["dia"])
+            if self._ler_linha(cursor, dia, operacao["id"]) is None:
+                raise ValueError(f"Sinal {operacao['id']!r} não encontrado em {dia}")
+            if tipo == "remover":
+                self._remover(cursor, grupo, dia, operacao["id"])
+                resumo["removidos"] += 1
+                return
+            valores = {campo: operacao[campo] for campo in ("hora", "nome", "musica") if campo in operacao}
+            if not valores:
+                raise ValueError("Nenhum campo para editar")
+            if "hora" in valores and segundos_da_hora(valores["hora"]) is None:
+                raise ValueError(f"Hora inválida: {valores['hora']!r}")
+            self._atualizar(cursor, grupo, dia, operacao["id"], **valores)
+            resumo["editados"] += 1
+        elif tipo == "copiar_dia":
+            origem = self.validar_dia(operacao["origem"])
+            destino = self.validar_dia(operacao["destino"])
+            if origem == destino:
+                raise ValueError("Origem e destino são o mesmo dia")
+            existentes = cursor.execute(f"SELECT id, hora, nome, musica FROM {destino}").fetchall()
+            if operacao.get("substituir"):
+                for id_linha, _, _, _ in existentes:
+                    self._remover(cursor, grupo, destino, id_linha)
+                    resumo["removidos"] += 1
+                existentes = []
+            repetidos = {(hora, nome, musica) for _, hora, nome, musica in existentes}
+            for hora, nome, musica in cursor.execute(f"SELECT hora, nome, musica FROM {origem}").fetchall():
+                if (hora, nome, musica) in repetidos:
+                    continue
+                id_linha = uuid.uuid4().hex
+                self._inserir(cursor, grupo, destino, id_linha, hora, nome, musica)
+                resumo["ids"].append(id_linha)
+                resumo["adicionados"] += 1
+        elif tipo == "substituir_musica":
+            if not operacao["nova"]:
+                raise ValueError("Música não informada")
+            resumo["editados"] += self._substituir_musica(cursor, grupo, operacao["antiga"], operacao["nova"])
+        else:
+            raise ValueError(f"Operação desconhecida: {tipo!r}")
+
+    # Desfazer/refazer e restauração a partir do diário
+
+    def _entradas_grupo(self, cursor, grupo):
+        return cursor.execute(
+            "SELECT dia, operacao, id, hora, nome, musica, hora_anterior, nome_anterior, musica_anterior "
+            "FROM alteracoes WHERE grupo=? ORDER BY versao",
+            (grupo,),
+        ).fetchall()
+
+    def _reverter_entradas(self, cursor, grupo, entradas):
+        for dia, operacao, id_linha, _, _, _, hora_ant, nome_ant, musica_ant in reversed(entradas):
+            if operacao == "insert":
+                self._remover(cursor, grupo, dia, id_linha)
+            elif hora_ant is None and nome_ant is None and musica_ant is None:
+                raise ValueError("O histórico não possui o estado anterior desta alteração.")
+            else:
+                self._gravar(cursor, grupo, dia, id_linha, hora_ant, nome_ant, musica_ant)
+
+    def _reaplicar_entradas(self, cursor, grupo, entradas):
+        for dia, operacao, id_linha, hora, nome, musica, _, _, _ in entradas:
+            if operacao == "delete":
+                self._remover(cursor, grupo, dia, id_linha)
+            else:
+                self._gravar(cursor, grupo, dia, id_linha, hora, nome, musica)
+
+    def descricao_desfazer(self):
+        resultado = self.selecionar_query(
+            "SELECT descricao FROM grupos_alteracoes WHERE tipo='edicao' AND desfeito=0 ORDER BY grupo DESC LIMIT 1"
+        )
+        return resultado[0][0] if resultado else None
+
+    def descricao_refazer(self):
+        resultado = self.selecionar_query(
+            "SELECT descricao FROM grupos_alteracoes WHERE tipo='edicao' AND desfeito=1 ORDER BY grupo LIMIT 1"
+        )
+        return resultado[0][0] if resultado else None
+
+    def desfazer(self):
+        """Desfaz a última ação do usuário. Retorna a descrição da ação ou None."""
+        with self.transacao() as cursor:
+            alvo = cursor.execute(
+                "SELECT grupo, descricao FROM grupos_alteracoes WHERE tipo='edicao' AND desfeito=0 "
+                "ORDER BY grupo DESC LIMIT 1"
+            ).fetchone()
+            if alvo is None:
+                return None
+            grupo = self._novo_grupo(cursor, "desfazer", alvo[1])
+            self._reverter_entradas(cursor, grupo, self._entradas_grupo(cursor, alvo[0]))
+            cursor.execute("UPDATE grupos_alteracoes SET desfeito=1 WHERE grupo=?", (alvo[0],))
+        return alvo[1]
+
+    def refazer(self):
+        """Refaz a última ação desfeita. Retorna a descrição da ação ou None."""
+        with self.transacao() as cursor:
+            alvo = cursor.execute(
+                "SELECT grupo, descricao FROM grupos_alteracoes WHERE tipo='edicao' AND desfeito=1 "
+                "ORDER BY grupo LIMIT 1"
+            ).fetchone()
+            if alvo is None:
+                return None
+            grupo = self._novo_grupo(cursor, "refazer", alvo[1])
+            self._reaplicar_entradas(cursor, grupo, self._entradas_grupo(cursor, alvo[0]))
+            cursor.execute("UPDATE grupos_alteracoes SET desfeito=0 WHERE grupo=?", (alvo[0],))
+        return alvo[1]
+
+    def restaurar_ate(self, momento):
+        """Volta a programação ao estado em que estava no instante ``momento`` (timestamp).
+
+        A restauração é registrada como uma nova ação e, portanto, também pode ser desfeita.
+        """
+        if momento < float(self.get_config("historico_compactado_ate", "0")):
+            raise ValueError("O histórico anterior a essa data já foi compactado.")
+        with self.transacao() as cursor:
+            entradas = cursor.execute(
+                "SELECT dia, operacao, id, hora, nome, musica, hora_anterior, nome_anterior, musica_anterior "
+                "FROM alteracoes WHERE momento > ? ORDER BY versao",
+                (momento,),
+            ).fetchall()
+            grupo = self._novo_grupo(cursor, "edicao", "Restaurar programação")
+            self._reverter_entradas(cursor, grupo, entradas)
+        return len(entradas)
+
+    def compactar_historico(self, antes_de):
+        """Remove do diário as ações anteriores a ``antes_de`` (timestamp)."""
+        with self.transacao() as cursor:
+            ultima_versao = cursor.execute(
+                "SELECT MAX(versao) FROM alteracoes WHERE momento < ?", (antes_de,)
+            ).fetchone()[0]
+            if ultima_versao is None:
+                return 0
+            removidas = cursor.execute("DELETE FROM alteracoes WHERE versao <= ?", (ultima_versao,)).rowcount
+            cursor.execute(
+                "DELETE FROM grupos_alteracoes WHERE grupo NOT IN (SELECT DISTINCT grupo FROM alteracoes "
+                "WHERE grupo IS NOT NULL) AND momento < ?",
+                (antes_de,),
+            )
+            cursor.execute(
+                "INSERT OR REPLACE INTO configuracoes (chave, valor) VALUES ('alteracoes_base', ?)", (str(ultima_versao),)
+            )
+            cursor.execute(
+                "INSERT OR REPLACE INTO configuracoes (chave, valor) VALUES ('historico_compactado_ate', ?)",
+                (str(antes_de),),
+            )
+        return removidas
+
+    # Sincronização entre estações: o servidor expõe o registro de alterações e os
+    # clientes aplicam apenas o que mudou desde a última versão recebida.
+
+    def versao_atual(self):
+        resultado = self.selecionar_query("SELECT MAX(versao) FROM alteracoes")
+        if not resultado or resultado[0][0] is None:
+            # Diário vazio após compactação: a versão continua sendo a última removida
+            return self.versao_base()
+        return resultado[0][0]
+
+    def versao_base(self):
+        """Versão mais antiga que ainda pode ser reconstruída a partir do registro de alterações."""
+        return int(self.get_config("alteracoes_base", "0"))
+
+    def alteracoes_desde(self, versao):
+        # Versão negativa: quem pede nunca recebeu a cópia completa, única forma de
+        # obter as linhas anteriores ao registro de alterações. Versão à frente da atual:
+        # o banco foi recriado ou restaurado depois da última sincronização de quem pede
+        if versao < 0 or versao < self.versao_base() or versao > self.versao_atual():
+            return None
+        return self.listar_alteracoes(versao)
+
+    def listar_alteracoes(self, versao):
+        linhas = self.selecionar_query(
+            "SELECT versao, dia, operacao, id, hora, nome, musica FROM alteracoes WHERE versao > ? ORDER BY versao",
+            (versao,),
+        )
+        return [
+            {"versao": v, "dia": dia, "operacao": operacao, "id": id_linha, "hora": hora, "nome": nome, "musica": musica}
+            for v, dia, operacao, id_linha, hora, nome, musica in linhas
+        ]
+
+    def exportar_programacao(self):
+        with self.transacao() as cursor:
+            versao = cursor.execute("SELECT MAX(versao) FROM alteracoes").fetchone()[0] or self.versao_base()
+            linhas = {
+                dia: [list(linha) for linha in cursor.execute(f"SELECT id, hora, nome, musica FROM {dia}")]
+                for dia in DIAS_SEMANA
+            }
+        return {"versao": versao, "linhas": linhas}
+
+    def aplicar_alteracoes_remotas(self, alteracoes, versao_remota):
+        """Aplica em uma única transação as alterações recebidas de outra estação.
+
+        Retorna quantas linhas locais realmente mudaram.
+        """
+        alteradas = 0
+        with self.transacao() as cursor:
+            grupo = self._novo_grupo(cursor, "remoto", "Sincronização")
+            for alteracao in alteracoes:
+                dia = alteracao["dia"]
+                if dia not in DIAS_SEMANA:
+                    continue
+                if alteracao["operacao"] == "delete":
+                    alteradas += self._remover(cursor, grupo, dia, alteracao["id"])
+                else:
+                    alteradas += self._gravar(
+                        cursor, grupo, dia, alteracao["id"], alteracao["hora"], alteracao["nome"], alteracao["musica"]
+                    )
+            self._gravar_versao_remota(cursor, versao_remota)
+        return alteradas
+
+    def substituir_programacao(self, programacao):
+        """Troca toda a programação local pela recebida, também de forma atômica.
+
+        Linhas iguais às recebidas não são regravadas; retorna quantas mudaram.
+        """
+        alteradas = 0
+        with self.transacao() as cursor:
+            grupo = self._novo_grupo(cursor, "remoto", "Sincronização completa")
+            for dia in DIAS_SEMANA:
+                recebidas = {linha[0]: linha for linha in programacao["linhas"].get(dia, [])}
+                for (id_linha,) in cursor.execute(f"SELECT id FROM {dia}").fetchall():
+                    if id_linha not in recebidas:
+                        alteradas += self._remover(cursor, grupo, dia, id_linha)
+                for id_linha, hora, nome, musica in recebidas.values():
+                    alteradas += self._gravar(cursor, grupo, dia, id_linha, hora, nome, musica)
+            self._gravar_versao_remota(cursor, programacao["versao"])
+        return alteradas
+
+    @staticmethod
+    def _gravar_versao_remota(cursor, versao_remota):
+        cursor.execute(
+            "INSERT OR REPLACE INTO configuracoes (chave, valor) VALUES ('sync_versao_remota', ?)", (str(versao_remota),)
+        )
+
+    def versao_remota(self):
+        """Última versão recebida do servidor, ou -1 se esta estação nunca sincronizou."""
+        return int(self.get_config("sync_versao_remota", "-1"))
@@ -1,16 +1,38 @@
 import sys
 import os
 import json
+import logging
+import time
+
+INICIO_PROCESSO = time.perf_counter()
+
+# Uma segunda execução só repassa o comando para a instância aberta e encerra, antes das importações pesadas
+INSTANCIA = None
+if __name__ == "__main__":
+    from single_instance import garantir_instancia_unica
+
+    INSTANCIA = garantir_instancia_unica(sys.argv[1:])
+    if INSTANCIA is None:
+        sys.exit(0)
+
+# O perfil de desempenho (--perfil ou SINAL_PERFIL) é ligado antes das importações pesadas
+from app_logic import diretorio_aplicativo
+from session_profiler import criar_perfilador
+
+PERFILADOR = criar_perfilador(sys.argv[1:], os.environ, diretorio_aplicativo())
+if PERFILADOR is not None and PERFILADOR.inicio == 0:
+    PERFILADOR.iniciar()
+
 import subprocess
 import tempfile
 import urllib.error
 import urllib.request
+from datetime import date
 from PyQt5.QtWidgets import (
     QApplication,
     QMainWindow,
     QLabel,
     QPushButton,
-    QStyledItemDelegate,
     QVBoxLayout,
     QWidget,
     QTableWidget,
@@ -25,20 +47,70 @@ from PyQt5.QtWidgets import (
     QDesktopWidget,
     QTimeEdit,
     QLineEdit,
-    QGraphicsDropShadowEffect,
     QFrame,
     QMessageBox,
     QToolButton,
     QStyle,
     QProgressDialog,
+    QShortcut,
+    QDateTimeEdit,
+    QSystemTrayIcon,
+    QMenu,
+    QListWidget,
+    QAbstractItemView,
+    QTableView,
+    QSpinBox,
+    QFormLayout,
+    QDateEdit,
 )
-from PyQt5.QtCore import Qt, QTimer, QTime, QUrl, QDate, QDateTime
-from PyQt5.QtGui import QIcon, QPixmap, QFont, QColor
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+from PyQt5.QtCore import Qt, QTimer, QTime, QDate, QDateTime, QEvent, QEventLoop, QThread, QObject, pyqtSignal
+from PyQt5.QtGui import QIcon, QPixmap, QFont, QColor, QBrush, QKeySequence
+from PyQt5.QtMultimedia import QMediaPlayer
 import sqlite3
+from app_logic import (
+    MusicAppLogic,
+    DIAS_SEMANA,
+    SinalProgramado,
+    diretorio_aplicativo,
+    hora_dos_segundos,
+    ler_sequencia,
+    montar_sequencia,
+    ordem_do_sinal,
+)
+from db_worker import DatabaseWorker
+from playback_history import PlaybackHistory, RESULTADO_TOCADO, caminho_reproducoes, intervalo_do_mes
+from media_index import MediaIndex, aquecer_arquivos, formatar_duracao
+from media_library import MediaLibrary, PASTA_BIBLIOTECA
+from audio_cache import VariantCache, PASTA_VARIANTES, localizar_ffmpeg, parametros_da_configuracao
+from sync import SyncServer, HOST_PADRAO, PORTA_PADRAO, criar_cliente, exportar_para_pasta
+from startup import StartupStages, caminho_instantaneo, carregar_instantaneo, salvar_instantaneo
+from agendador import (
+    JANELA_ATRASO_SINAL,
+    AgendadorSinais,
+    DetectorAjusteRelogio,
+    IndiceIntervalos,
+    SnapshotProgramacao,
+    dia_da_semana,
+    duracao_musica,
+    instante_do_horario,
+    intervalo_do_sinal,
+    plano_de_espera,
+    proxima_meia_noite,
+)
+from audio_output import CHAVE_LATENCIA, AudioKeepAlive, LatencyCalibrator, SequencePlayer, nome_dispositivo_saida
+from stall_watchdog import ARQUIVO_DIAGNOSTICO, StallWatchdog
+from schedule_search import ScheduleSearch
+from week_model import WeekModel
+from theme import SombraWidget, aplicar_tema, baixo_render_ativo, baixo_render_forcado
+from app_logging import configurar_registro
+from single_instance import COMANDO_IMPORTAR, COMANDO_MOSTRAR, COMANDO_RECARREGAR, ler_comandos
+
+log_banco = logging.getLogger("sinal.storage")
+log_agendador = logging.getLogger("sinal.scheduler")
+log_player = logging.getLogger("sinal.player")
+log_atualizador = logging.getLogger("sinal.updater")
+log_midias = logging.getLogger("sinal.media")
+log_sync = logging.getLogger("sinal.sync")
 
 
 APP_VERSION = "1.2.22"
@@ -49,6 +121,10 @@ DEFAULT_GITHUB_OWNER = "LuizGustavoStelo"
 DEFAULT_GITHUB_REPO = "Sinal"
 GITHUB_API_BASE_URL = "https://api.github.com"
 DOWNLOAD_USER_AGENT = "Sinal-Updater"
+TEMPO_LIMITE_BANCO_MS = 2000
+WM_TIMECHANGE = 0x001E
+ANTECEDENCIA_SAIDA_ATIVA_MS = 15000  # a saída de áudio é acordada este tempo antes de cada sinal
+ESPERA_SAIDA_ATIVA_MS = 10000
 
 
 class GitHubAPIError(RuntimeError):
@@ -58,11 +134,9 @@ class GitHubAPIError(RuntimeError):
         super().__init__(message)
         self.status = status
 def add_drop_shadow(widget, blur_radius=16, x_offset=0, y_offset=3, opacity=110):
-    shadow = QGraphicsDropShadowEffect(widget)
-    shadow.setBlurRadius(blur_radius)
-    shadow.setOffset(x_offset, y_offset)
-    shadow.setColor(QColor(0, 0, 0, opacity))
-    widget.setGraphicsEffect(shadow)
+    # Sombra pré-renderizada em cache (theme.SombraWidget); oculta no modo leve
+    widget.sombra = SombraWidget(widget, blur_radius, x_offset, y_offset, opacity)
+    return widget.sombra
 
 
 class UpdateManager:
@@ -409,7 +483,6 @@ class EditDialog(QDialog):
     def __init__(self, input_type="text", parent=None):
         super().__init__(parent)
         self.setWindowTitle("Editar Informação")
-        self.setStyleSheet("background-color: white;")
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(24, 20, 24, 20)
         self.layout.setSpacing(16)
@@ -427,8 +500,9 @@ class EditDialog(QDialog):
 
         if input_type == "time":
             self.input_widget = QTimeEdit(self)
-            self.input_widget.setDisplayFormat("HH:mm")
-            self.input_widget.setTime(QTime.currentTime())  # Define o tempo atual como padrão
+            self.input_widget.setDisplayFormat("HH:mm:ss")
+            agora = QTime.currentTime()
+            self.input_widget.setTime(QTime(agora.hour(), agora.minute()))  # Define o tempo atual como padrão
         else:
             self.input_widget = QLineEdit(self)
 
@@ -442,103 +516,347 @@ class EditDialog(QDialog):
 
         for button in self.button_box.buttons():
             button.setFixedSize(90, 40)
-            button.setStyleSheet("background-color: white; color: black; border-radius: 5px; border: 1px solid black;")
             add_drop_shadow(button)
 
     def get_input(self):
         if isinstance(self.input_widget, QTimeEdit):
-            return self.input_widget.time().toString("HH:mm")
+            return hora_dos_segundos(self.input_widget.time().msecsSinceStartOfDay() // 1000)
         else:
             return self.input_widget.text()
         
-class MusicAppLogic:
-    def __init__(self, arquivo_dados):
-        self.arquivo_dados = arquivo_dados
-        self.criar_tabelas()
+class HoraInputDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Selecione a Hora")
+        self.setModal(True)
 
-    def criar_tabelas(self):
-        try:
-            conn = sqlite3.connect(self.arquivo_dados)
-            cursor = conn.cursor()
+        self.layout = QVBoxLayout(self)
 
-            for dia in ["segunda", "terça", "quarta", "quinta", "sexta"]:
-                cursor.execute(f"CREATE TABLE IF NOT EXISTS {dia} (hora TEXT, nome TEXT, musica TEXT)")
+        self.time_edit = QTimeEdit(self)
+        self.time_edit.setDisplayFormat("HH:mm:ss")
+        agora = QTime.currentTime()
+        self.time_edit.setTime(QTime(agora.hour(), agora.minute()))  # Define o tempo atual como padrão
+        self.layout.addWidget(self.time_edit)
 
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            print(f"Erro ao criar tabelas: {str(e)}")
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        self.layout.addWidget(self.button_box)
 
-    def executar_query(self, query, params=()):
-        try:
-            conn = sqlite3.connect(self.arquivo_dados)
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            print(f"Erro ao executar query: {str(e)}")
+        # Padronizar botões
+        for button in self.button_box.buttons():
+            button.setFixedSize(90, 40)
+            add_drop_shadow(button)
+
+    def get_selected_time(self):
+        # Segundos só aparecem no texto quando diferentes de zero (HH:MM:SS)
+        return hora_dos_segundos(self.time_edit.time().msecsSinceStartOfDay() // 1000)
 
-    def selecionar_query(self, query, params=()):
-        try:
-            conn = sqlite3.connect(self.arquivo_dados)
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            resultados = cursor.fetchall()
-            conn.close()
-            return resultados
-        except Exception as e:
-            print(f"Erro ao executar query de seleção: {str(e)}")
-            return []
 
-    def get_musicas_por_dia(self, dia):
-        return self.selecionar_query(f"SELECT hora, nome, musica FROM {dia.lower()}")
+class SequenciaDialog(QDialog):
+    def __init__(self, arquivos, crossfade_ms=0, duracao_maxima_ms=0, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Sequência de Músicas")
+        self.layout = QVBoxLayout(self)
+        self.layout.setContentsMargins(24, 20, 24, 20)
+        self.layout.setSpacing(16)
 
-    def adicionar_musica(self, dia, hora, nome, musica):
-        self.executar_query(f"INSERT INTO {dia.lower()} (hora, nome, musica) VALUES (?, ?, ?)", (hora, nome, musica))
-        print("Nova música adicionada com sucesso!")
+        self.label = QLabel("Arraste para definir a ordem de reprodução:", self)
+        self.layout.addWidget(self.label)
 
-    def deletar_musica(self, dia, hora, nome):
-        self.executar_query(f"DELETE FROM {dia.lower()} WHERE hora=? AND nome=?", (hora, nome))
-        print("Música deletada com sucesso!")
+        self.lista = QListWidget(self)
+        self.lista.setDragDropMode(QAbstractItemView.InternalMove)
+        for arquivo in arquivos:
+            self.lista.addItem(os.path.basename(arquivo))
+            self.lista.item(self.lista.count() - 1).setData(Qt.UserRole, arquivo)
+        self.layout.addWidget(self.lista)
+
+        formulario = QFormLayout()
+        self.crossfade_spin = QSpinBox(self)
+        self.crossfade_spin.setRange(0, 10000)
+        self.crossfade_spin.setSingleStep(250)
+        self.crossfade_spin.setSuffix(" ms")
+        self.crossfade_spin.setValue(crossfade_ms)
+        formulario.addRow("Transição entre músicas:", self.crossfade_spin)
+        self.duracao_spin = QSpinBox(self)
+        self.duracao_spin.setRange(0, 3600)
+        self.duracao_spin.setSuffix(" s")
+        self.duracao_spin.setSpecialValueText("Sem limite")
+        self.duracao_spin.setValue(duracao_maxima_ms // 1000)
+        formulario.addRow("Duração máxima:", self.duracao_spin)
+        self.layout.addLayout(formulario)
 
-    def editar_musica(self, dia, hora, nome, campo, nova_informacao=None):
-        query = f"UPDATE {dia.lower()} SET {campo}=? WHERE hora=? AND nome=?"
-        self.executar_query(query, (nova_informacao, hora, nome) if nova_informacao else (None, hora, nome))
-        print(f"Informação editada com sucesso para o campo {campo}!")
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        self.layout.addWidget(self.button_box)
 
-class HoraInputDialog(QDialog):
+        for button in self.button_box.buttons():
+            button.setFixedSize(90, 40)
+            add_drop_shadow(button)
+
+    def get_clipes(self):
+        return [self.lista.item(indice).data(Qt.UserRole) for indice in range(self.lista.count())]
+
+
+class RestoreDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setWindowTitle("Selecione a Hora")
-        self.setModal(True)
-        self.setStyleSheet("background-color: white;")
-
+        self.setWindowTitle("Restaurar Programação")
         self.layout = QVBoxLayout(self)
+        self.layout.setContentsMargins(24, 20, 24, 20)
+        self.layout.setSpacing(16)
 
-        self.time_edit = QTimeEdit(self)
-        self.time_edit.setDisplayFormat("HH:mm")
-        self.time_edit.setTime(QTime.currentTime())  # Define o tempo atual como padrão
-        self.layout.addWidget(self.time_edit)
+        self.label = QLabel("Voltar a programação para como estava em:", self)
+        self.layout.addWidget(self.label)
+
+        self.datetime_edit = QDateTimeEdit(QDateTime.currentDateTime().addSecs(-60 * 60), self)
+        self.datetime_edit.setDisplayFormat("dd/MM/yyyy HH:mm")
+        self.datetime_edit.setCalendarPopup(True)
+        self.datetime_edit.setMaximumDateTime(QDateTime.currentDateTime())
+        self.layout.addWidget(self.datetime_edit)
 
         self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
         self.button_box.accepted.connect(self.accept)
         self.button_box.rejected.connect(self.reject)
         self.layout.addWidget(self.button_box)
 
-        # Padronizar botões
         for button in self.button_box.buttons():
             button.setFixedSize(90, 40)
-            button.setStyleSheet("background-color: white; color: black; border-radius: 5px; border: 1px solid black;")
             add_drop_shadow(button)
 
-    def get_selected_time(self):
-        return self.time_edit.time().toString("HH:mm")
-    
+    def get_timestamp(self):
+        return self.datetime_edit.dateTime().toSecsSinceEpoch()
+
+
+class MediaIndexThread(QThread):
+    indice_atualizado = pyqtSignal(dict)
+
+    def __init__(self, arquivo_dados, parent=None):
+        super().__init__(parent)
+        self.arquivo_dados = arquivo_dados
+
+    def run(self):
+        try:
+            caminhos = MusicAppLogic(self.arquivo_dados).listar_musicas_referenciadas()
+            indice = MediaIndex(self.arquivo_dados)
+            resumo = indice.atualizar(caminhos, cancel_callback=self.isInterruptionRequested)
+            indice.remover_nao_referenciados(caminhos)
+            log_midias.info("Índice de mídias atualizado: %s", resumo)
+            self.indice_atualizado.emit(indice.carregar_todos())
+        except Exception as e:
+            log_midias.exception("Erro ao indexar mídias: %s", e)
+
+
+class MediaPrewarmThread(QThread):
+    def __init__(self, caminhos, parent=None):
+        super().__init__(parent)
+        self.caminhos = list(caminhos)
+
+    def run(self):
+        lidos = aquecer_arquivos(self.caminhos, cancel_callback=self.isInterruptionRequested)
+        log_midias.info("Mídias do dia pré-carregadas: %d de %d", lidos, len(self.caminhos))
+
+
+class LibraryImportThread(QThread):
+    importacao_concluida = pyqtSignal(dict)
+
+    def __init__(self, biblioteca, arquivo_dados, parent=None):
+        super().__init__(parent)
+        self.biblioteca = biblioteca
+        self.arquivo_dados = arquivo_dados
+
+    def run(self):
+        try:
+            # Conexões SQLite não podem ser compartilhadas entre threads
+            logic = MusicAppLogic(self.arquivo_dados)
+            resumo = self.biblioteca.importar_referencias(logic, cancel_callback=self.isInterruptionRequested)
+            resumo["removidos"] = self.biblioteca.remover_nao_referenciados(logic.listar_musicas_referenciadas())
+        except Exception as e:
+            resumo = {"erro": str(e)}
+        self.importacao_concluida.emit(resumo)
+
+
+class LibraryCopyThread(QThread):
+    """Copia para a biblioteca os arquivos escolhidos ao adicionar ou editar um sinal."""
+
+    progresso = pyqtSignal(int)  # porcentagem do total de bytes
+
+    def __init__(self, biblioteca, arquivos, parent=None):
+        super().__init__(parent)
+        self.biblioteca = biblioteca
+        self.arquivos = list(arquivos)
+        # Lidos por quem iniciou a thread depois de wait()
+        self.caminhos = list(arquivos)
+        self.erros = []
+
+    def run(self):
+        tamanhos = []
+        for arquivo in self.arquivos:
+            try:
+                tamanhos.append(os.path.getsize(arquivo))
+            except OSError:
+                tamanhos.append(0)
+        total = 2 * sum(tamanhos) or 1
+        concluido = 0
+        caminhos = []
+        erros = []
+        for arquivo, tamanho in zip(self.arquivos, tamanhos):
+            def avancar(feito, _, base=concluido):
+                self.progresso.emit(min(100, (base + feito) * 100 // total))
+
+            try:
+                caminhos.append(self.biblioteca.importar(arquivo, progresso=avancar))
+            except OSError as exc:
+                log_midias.warning("Não foi possível copiar %s para a biblioteca: %s", arquivo, exc)
+                caminhos.append(arquivo)
+                erros.append(f"{os.path.basename(arquivo)}: {exc}")
+            concluido += 2 * tamanho
+        self.caminhos = caminhos
+        self.erros = erros
+
+
+class AudioProcessingThread(QThread):
+    variantes_prontas = pyqtSignal(dict)
+
+    def __init__(self, variant_cache, midias, parent=None):
+        super().__init__(parent)
+        self.variant_cache = variant_cache
+        self.midias = dict(midias)
+
+    def run(self):
+        try:
+            parametros = parametros_da_configuracao(MusicAppLogic(self.variant_cache.arquivo_dados))
+            resumo = self.variant_cache.processar(
+                self.midias, parametros, cancel_callback=self.isInterruptionRequested
+            )
+            log_midias.info("Normalização de volume concluída: %s", resumo)
+            self.variantes_prontas.emit(self.variant_cache.carregar_variantes(self.midias, parametros))
+        except Exception as e:
+            log_midias.exception("Erro ao normalizar músicas: %s", e)
+
+
+class SyncThread(QThread):
+    sincronizacao_concluida = pyqtSignal(bool, str)
+
+    def __init__(self, arquivo_dados, modo, destino, token=None, parent=None):
+        super().__init__(parent)
+        self.arquivo_dados = arquivo_dados
+        self.modo = modo
+        self.destino = destino
+        self.token = token
+
+    def run(self):
+        logic = MusicAppLogic(self.arquivo_dados)
+        try:
+            if self.modo == "cliente":
+                alteradas = criar_cliente(logic, self.destino, self.token).sincronizar()
+                self.sincronizacao_concluida.emit(alteradas > 0, f"{alteradas} alteração(ões) recebida(s)")
+            else:
+                versao = exportar_para_pasta(logic, self.destino)
+                self.sincronizacao_concluida.emit(False, f"Programação exportada (versão {versao})")
+        except Exception as e:
+            self.sincronizacao_concluida.emit(False, f"Erro: {str(e)}")
+
+
+CHAVES_CONFIGURACAO_INTERFACE = (
+    "normalizar_volume",
+    "biblioteca_gerenciada",
+    "modo_baixo_render",
+    "modo_bandeja",
+    "manter_audio_ativo",
+    "verificar_atualizacoes",
+    "sync_modo",
+    "sync_origem",
+    "sync_porta",
+    "sync_pasta",
+    "sync_token",
+)
+
+
+def carregar_configuracoes_interface(logic):
+    return {chave: logic.get_config(chave) for chave in CHAVES_CONFIGURACAO_INTERFACE}
+
+
+class UpdateCheckThread(QThread):
+    atualizacao_disponivel = pyqtSignal(str)
+
+    def __init__(self, update_manager, parent=None):
+        super().__init__(parent)
+        self.update_manager = update_manager
+
+    def run(self):
+        try:
+            tem_atualizacao, versao = self.update_manager.has_newer_version(APP_VERSION)
+        except Exception as e:
+            log_atualizador.warning("Erro ao verificar atualizações: %s", e)
+            return
+        if tem_atualizacao:
+            self.atualizacao_disponivel.emit(versao)
+
+
+class DatabaseBridge(QObject):
+    """Entrega na thread da interface os resultados das consultas feitas pelo DatabaseWorker."""
+
+    resultado_pronto = pyqtSignal(object, object, object, object)
+
+    def __init__(self, worker, parent=None):
+        super().__init__(parent)
+        self.worker = worker
+        # Emitido pela thread do banco (ou pela interface, quando um pedido é substituído);
+        # a conexão enfileirada sempre executa o callback depois, na thread da interface
+        self.resultado_pronto.connect(self._entregar, Qt.QueuedConnection)
+
+    def executar(self, funcao, *args, chave=None, ao_concluir=None, ao_falhar=None, ao_cancelar=None, **kwargs):
+        """``ao_cancelar`` é chamado se o pedido for substituído por outro com a mesma chave ou descartado."""
+        future = self.worker.submeter(funcao, *args, chave=chave, **kwargs)
+        future.add_done_callback(lambda f: self.resultado_pronto.emit(f, ao_concluir, ao_falhar, ao_cancelar))
+        return future
+
+    def _entregar(self, future, ao_concluir, ao_falhar, ao_cancelar):
+        if future.cancelled():
+            if ao_cancelar is not None:
+                ao_cancelar()
+            return
+        excecao = future.exception()
+        if excecao is not None:
+            if ao_falhar is not None:
+                ao_falhar(excecao)
+            return
+        if ao_concluir is not None:
+            ao_concluir(future.result())
+
+
 class MusicAppUI(QMainWindow):
     def __init__(self, logic):
         super().__init__()
         self.logic = logic
+        # Toda consulta ao banco feita pela interface passa pela thread dedicada
+        self.db_worker = DatabaseWorker(logic.arquivo_dados)
+        self.db_bridge = DatabaseBridge(self.db_worker, self)
+        # O histórico de reprodução fica em outro banco, com a sua própria thread
+        self.historico_worker = DatabaseWorker(
+            caminho_reproducoes(logic.arquivo_dados), fabrica=PlaybackHistory, nome="SinalPlaybackHistory"
+        )
+        self.historico_bridge = DatabaseBridge(self.historico_worker, self)
+        self.reproducao_automatica = None
+        self.historico_timer = QTimer(self)
+        self.historico_timer.setTimerType(Qt.VeryCoarseTimer)
+        self.historico_timer.timeout.connect(lambda: self.historico_worker.submeter("descarregar", chave="descarregar"))
+        self.historico_timer.start(60 * 1000)
+        self.consultas_lentas = {}
+        # Agenda do dia e sinais já tocados; a lógica de agendamento não depende do Qt
+        self.agendador = AgendadorSinais()
+        self.midias = {}
+        # Intervalos [início, fim) dos sinais de cada dia e a linha (hora, nome) de cada id
+        self.indices_dia = {}
+        self.rotulos_sinais = {}
+        # Busca por nome e arquivo em todos os dias, atualizada pelo registro de alterações
+        self.busca = ScheduleSearch()
+        self.resultado_busca = None
+        self.arquivo_instantaneo = caminho_instantaneo(logic.arquivo_dados)
+        self.update_manager = None
+        self.etapas_inicializacao = StartupStages(INICIO_PROCESSO, registrar=logging.getLogger("sinal.startup").info)
         self.setWindowTitle("Sinal")
         self.setWindowIcon(QIcon('assets/icon.png'))
         self.setFixedSize(450, 600)
@@ -550,8 +868,7 @@ class MusicAppUI(QMainWindow):
         self.layout.setContentsMargins(0, 0, 0, 0)
         self.layout.setSpacing(0)
         self.central_widget.setLayout(self.layout)
-        self.setStyleSheet("")
-        self.central_widget.setStyleSheet("background-color: #003b71;")
+        self.central_widget.setObjectName("painelCentral")
 
         self.content_widget = QWidget()
         self.content_layout = QVBoxLayout()
@@ -565,7 +882,7 @@ class MusicAppUI(QMainWindow):
         fonte_relogio.setPointSize(14)
         fonte_relogio.setBold(False)
         self.relogio_label.setFont(fonte_relogio)
-        self.relogio_label.setStyleSheet("color: white; background-color: transparent;")
+        self.relogio_label.setObjectName("relogio")
         self.content_layout.addWidget(self.relogio_label)
 
         self.status_label = QLabel("Status: Aguardando")
@@ -573,7 +890,7 @@ class MusicAppUI(QMainWindow):
         fonte_status.setPointSize(12)
         fonte_status.setBold(False)
         self.status_label.setFont(fonte_status)
-        self.status_label.setStyleSheet("color: white; background-color: transparent;")
+        self.status_label.setObjectName("status")
         self.content_layout.addWidget(self.status_label)
 
         self.day_buttons_layout = QHBoxLayout()
@@ -588,19 +905,24 @@ class MusicAppUI(QMainWindow):
             button.setCheckable(True)
             button.setFixedSize(80, 35)
             button.setFont(fonte_dias)
-            button.setStyleSheet("QPushButton { background-color: white; color: black; border-radius: 5px; border: 1px solid black; } QPushButton:checked { background-color: #f1c50e; }")
             button.clicked.connect(self.on_day_button_clicked)
             self.day_buttons_layout.addWidget(button)
             add_drop_shadow(button)
             self.buttons[day.lower()] = button
 
+        self.busca_edit = QLineEdit()
+        self.busca_edit.setPlaceholderText("Buscar por nome ou arquivo em todos os dias (Ctrl+F)")
+        self.busca_edit.setClearButtonEnabled(True)
+        self.busca_edit.textChanged.connect(self.aplicar_busca)
+        self.content_layout.addWidget(self.busca_edit)
+
         self.setup_table_widget()
 
         self.content_layout.addWidget(self.table_widget)
-        self.content_layout.setStretch(3, 1)
+        self.content_layout.setStretch(4, 1)
 
         self.bottom_widget = QWidget()
-        self.bottom_widget.setStyleSheet("background-color: #f1c50e;")
+        self.bottom_widget.setObjectName("barraInferior")
         self.bottom_layout = QHBoxLayout()
         self.bottom_layout.setContentsMargins(10, 10, 10, 10)
         self.bottom_layout.setSpacing(10)
@@ -613,7 +935,6 @@ class MusicAppUI(QMainWindow):
         font = self.novo_button.font()
         font.setPointSize(14)
         self.novo_button.setFont(font)
-        self.novo_button.setStyleSheet("background-color: white; color: black; border-radius: 5px; border: 1px solid black;")
         self.novo_button.setToolTip("Criar novo sinal")
         self.novo_button.clicked.connect(self.adicionar_nova_musica)
         self.bottom_layout.addWidget(self.novo_button)
@@ -624,7 +945,6 @@ class MusicAppUI(QMainWindow):
         font = self.play_button.font()
         font.setPointSize(14)
         self.play_button.setFont(font)
-        self.play_button.setStyleSheet("background-color: white; color: black; border-radius: 5px; border: 1px solid black;")
         self.play_button.setToolTip("Toca a musica selecionada")
         self.play_button.clicked.connect(self.play_selected_music)
         self.bottom_layout.addWidget(self.play_button)
@@ -635,7 +955,6 @@ class MusicAppUI(QMainWindow):
         font = self.stop_button.font()
         font.setPointSize(14)
         self.stop_button.setFont(font)
-        self.stop_button.setStyleSheet("background-color: white; color: black; border-radius: 5px; border: 1px solid black;")
         self.stop_button.setToolTip("Para de tocar imediatamente")
         self.stop_button.clicked.connect(self.stop_playing_music)
         self.bottom_layout.addWidget(self.stop_button)
@@ -646,7 +965,6 @@ class MusicAppUI(QMainWindow):
         font = self.deletar_button.font()
         font.setPointSize(14)
         self.deletar_button.setFont(font)
-        self.deletar_button.setStyleSheet("background-color: white; color: black; border-radius: 5px; border: 1px solid black;")
         self.deletar_button.setToolTip("Deleta as musicas selecionadas")
         self.deletar_button.clicked.connect(self.deletar_musicas_selecionadas)
         self.bottom_layout.addWidget(self.deletar_button)
@@ -657,26 +975,615 @@ class MusicAppUI(QMainWindow):
         font = self.info_button.font()
         font.setPointSize(14)
         self.info_button.setFont(font)
-        self.info_button.setStyleSheet("background-color: white; color: black; border-radius: 5px; border: 1px solid black;")
         self.info_button.setToolTip("Informações")
         self.info_button.clicked.connect(self.show_info_dialog)
         self.bottom_layout.addWidget(self.info_button)
         add_drop_shadow(self.info_button)
 
+        # Os sinais são disparados por um timer armado para o próximo horário, não pelo relógio da tela
+        self.maior_erro_disparo_ms = 0.0
+        self.manter_saida_ativa = False
+        self.audio_keepalive = AudioKeepAlive(self)
+        self.saida_ativa_timer = QTimer(self)
+        self.saida_ativa_timer.setSingleShot(True)
+        self.saida_ativa_timer.timeout.connect(self.encerrar_saida_ativa)
+        self.sinal_timer = QTimer(self)
+        self.sinal_timer.setSingleShot(True)
+        self.sinal_timer.setTimerType(Qt.PreciseTimer)
+        self.sinal_timer.timeout.connect(self.disparar_sinal_agendado)
+        # Um único timer armado para a próxima meia-noite local troca o dia ativo
+        self.virada_timer = QTimer(self)
+        self.virada_timer.setSingleShot(True)
+        self.virada_timer.setTimerType(Qt.PreciseTimer)
+        self.virada_timer.timeout.connect(self.on_virada_do_dia)
+        self.armar_virada_do_dia()
+        self.detector_ajuste = DetectorAjusteRelogio()
+        self.ajuste_relogio_timer = QTimer(self)
+        self.ajuste_relogio_timer.setTimerType(Qt.VeryCoarseTimer)
+        self.ajuste_relogio_timer.timeout.connect(self.verificar_ajuste_relogio)
+        self.ajuste_relogio_timer.start(5 * 60 * 1000)
+        self.prewarm_thread = None
+        self.dica_disparo = None
+        self.maior_travamento = None  # (data, duração em ms, horário) do maior travamento do dia
+        # Mede a resposta do laço de eventos e grava a pilha da thread principal quando ela trava
+        self.watchdog = StallWatchdog(os.path.join(diretorio_aplicativo(), ARQUIVO_DIAGNOSTICO), parent=self)
+        self.watchdog.travamento_detectado.connect(self.on_travamento_detectado)
+        self.watchdog.start()
+
+        self.bandeja = None
+        self.modo_bandeja = False
+        self.saindo = False
+        self.update_check_thread = None
+        self.update_timer = QTimer(self)
+        self.update_timer.setTimerType(Qt.VeryCoarseTimer)
+        self.update_timer.timeout.connect(self.verificar_atualizacoes_em_segundo_plano)
+
+        self.selected_day = None
+        self.set_selected_day(self.dia_atual() or "segunda")
+        # Primeira pintura com a cópia local da programação; o banco é consultado nas etapas seguintes
+        self.mostrar_instantaneo()
         self.atualizar_relogio()  
 
+        # Só atualiza o relógio da tela; parado enquanto a janela está oculta ou minimizada
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.atualizar_relogio)
         self.timer.start(1000)  
 
-        self.selected_day = None
-        self.player = QMediaPlayer()
+        # Um par de players alternados toca as sequências de clipes sem intervalo
+        self.player = SequencePlayer(self)
         self.player.stateChanged.connect(self.on_player_state_changed)
-        self.music_played = False
-        QTimer.singleShot(1000, self.select_current_day_button)
-        self.day_check_timer = QTimer(self)
-        self.day_check_timer.timeout.connect(self.verificar_dia_atual)
-        self.day_check_timer.start(4 * 60 * 60 * 1000)  # 4 horas em milissegundos
+        self.player.falhou.connect(self.on_reproducao_falhou)
+
+        self.biblioteca = MediaLibrary(os.path.join(diretorio_aplicativo(), PASTA_BIBLIOTECA))
+        self.library_import_thread = None
+
+        diretorio_app = diretorio_aplicativo()
+        self.variant_cache = VariantCache(
+            os.path.join(diretorio_app, PASTA_VARIANTES),
+            self.logic.arquivo_dados,
+            localizar_ffmpeg(diretorio_app),
+        )
+        self.audio_processing_thread = None
+        self.normalizacao_ativa = False
+        self.biblioteca_gerenciada = False
+        self.variantes = {}
+
+        QShortcut(QKeySequence.Undo, self, activated=self.desfazer_alteracao)
+        QShortcut(QKeySequence.Redo, self, activated=self.refazer_alteracao)
+        QShortcut(QKeySequence("Ctrl+Shift+Z"), self, activated=self.refazer_alteracao)
+        QShortcut(QKeySequence.Find, self, activated=self.busca_edit.setFocus)
+        QShortcut(QKeySequence("Ctrl+Shift+S"), self, activated=self.mostrar_semana)
+
+        self.sync_server = None
+        self.sync_thread = None
+        self.sync_modo = ""
+        self.sync_destino = None
+        self.sync_token = None
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setTimerType(Qt.VeryCoarseTimer)
+        self.sync_timer.timeout.connect(self.executar_sincronizacao)
+
+        self.media_index_thread = None
+        self.reindexacao_pendente = False
+        self.media_index_timer = QTimer(self)
+        self.media_index_timer.setTimerType(Qt.VeryCoarseTimer)
+        self.media_index_timer.timeout.connect(self.iniciar_indexacao_midias)
+        self.media_index_timer.start(10 * 60 * 1000)  # Reverificação incremental a cada 10 minutos
+
+        self.etapas_inicializacao.adicionar(
+            "abrir banco", lambda: self.executar_no_banco(lambda logic: None, descricao="abrindo o banco de dados")
+        )
+        self.etapas_inicializacao.adicionar(
+            "configurações",
+            lambda: self.executar_no_banco(
+                carregar_configuracoes_interface,
+                descricao="lendo as configurações",
+                ao_concluir=self.aplicar_configuracoes,
+            ),
+        )
+        self.etapas_inicializacao.adicionar("programação", self.carregar_programacao_inicial)
+        self.etapas_inicializacao.adicionar("atualizador", self.preparar_atualizador)
+        self.etapas_inicializacao.adicionar("indexação de mídias", self.iniciar_indexacao_midias)
+        self.etapas_inicializacao.adicionar("compactação do histórico", self.compactar_historico)
+        self.etapas_inicializacao.adicionar("sinais perdidos", self.registrar_sinais_perdidos)
+        self.inicializacao_iniciada = False
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.retomar_relogio()
+        if not self.inicializacao_iniciada:
+            self.etapas_inicializacao.marcar("janela exibida")
+            self.iniciar_etapas()
+
+    def iniciar_etapas(self):
+        if self.inicializacao_iniciada:
+            return
+        self.inicializacao_iniciada = True
+        QTimer.singleShot(0, self.executar_etapa_inicializacao)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            if self.isMinimized():
+                self.timer.stop()
+            else:
+                self.retomar_relogio()
+
+    def retomar_relogio(self):
+        if self.isVisible() and not self.isMinimized() and not self.timer.isActive():
+            self.atualizar_relogio()
+            self.timer.start(1000)
+
+    def executar_etapa_inicializacao(self):
+        # Uma etapa por volta do laço de eventos, para a janela continuar respondendo
+        if self.etapas_inicializacao.executar_proxima():
+            QTimer.singleShot(0, self.executar_etapa_inicializacao)
+
+    def dia_atual(self):
+        return dia_da_semana()
+
+    def mostrar_instantaneo(self):
+        programacao = carregar_instantaneo(self.arquivo_instantaneo)
+        if programacao is None:
+            return
+        linhas = programacao["linhas"]
+        dia = self.dia_atual()
+        if dia is not None:
+            # Cópia local provisória: qualquer snapshot lido do banco a substitui
+            self.agendador.trocar_snapshot(SnapshotProgramacao.das_linhas(linhas, versao=-1))
+            self.agendador.trocar_dia(dia)
+            self.agendar_proximo_sinal()
+        self.preencher_tabela(self.selected_day, sorted(
+            (SinalProgramado(id_linha, self.selected_day, hora, nome, musica)
+             for id_linha, hora, nome, musica in linhas.get(self.selected_day, [])),
+            key=ordem_do_sinal,
+        ))
+        self.etapas_inicializacao.marcar("cópia local da programação exibida")
+
+    def carregar_programacao_inicial(self):
+        self.show_musicas()
+        self.atualizar_agenda()
+        self.atualizar_indice_busca()
+        return self.salvar_instantaneo_programacao()
+
+    def salvar_instantaneo_programacao(self):
+        arquivo = self.arquivo_instantaneo
+
+        def salvar(logic):
+            salvar_instantaneo(arquivo, logic.exportar_programacao())
+
+        return self.executar_no_banco(
+            salvar,
+            chave="instantaneo",
+            descricao="salvando a cópia local da programação",
+            ao_falhar=lambda exc: log_banco.error("Erro ao salvar a cópia local da programação: %s", exc),
+        )
+
+    def preparar_atualizador(self):
+        self.update_manager = UpdateManager(self)
+
+    def executar_no_banco(self, funcao, *args, chave=None, descricao="consultando a programação",
+                          ao_concluir=None, ao_falhar=None, **kwargs):
+        """Executa ``funcao`` na thread do banco sem bloquear a interface.
+
+        Se a resposta demorar mais que ``TEMPO_LIMITE_BANCO_MS`` o status avisa
+        que o aplicativo está aguardando o banco, em vez de congelar a janela.
+        """
+        def concluir(resultado):
+            self.encerrar_espera_banco(future)
+            if ao_concluir is not None:
+                ao_concluir(resultado)
+
+        def falhar(excecao):
+            self.encerrar_espera_banco(future)
+            if ao_falhar is not None:
+                ao_falhar(excecao)
+            else:
+                log_banco.error("Erro no banco de dados (%s): %s", descricao, excecao)
+                self.status_label.setText(f"Status: Erro no banco de dados ({descricao})")
+
+        future = self.db_bridge.executar(
+            funcao, *args, chave=chave, ao_concluir=concluir, ao_falhar=falhar,
+            ao_cancelar=lambda: self.encerrar_espera_banco(future), **kwargs
+        )
+        QTimer.singleShot(TEMPO_LIMITE_BANCO_MS, lambda: self.avisar_banco_lento(future, descricao))
+        return future
+
+    def avisar_banco_lento(self, future, descricao):
+        if future.done():
+            return
+        mensagem = f"Status: Aguardando o banco de dados ({descricao})..."
+        self.consultas_lentas[future] = mensagem
+        self.status_label.setText(mensagem)
+
+    def encerrar_espera_banco(self, future):
+        mensagem = self.consultas_lentas.pop(future, None)
+        if mensagem is not None and self.status_label.text() == mensagem:
+            self.status_label.setText("Status: Aguardando")
+
+    def configurar_bandeja(self, ativa):
+        self.modo_bandeja = ativa and QSystemTrayIcon.isSystemTrayAvailable()
+        if not self.modo_bandeja:
+            if self.bandeja is not None:
+                self.bandeja.hide()
+            return
+        if self.bandeja is None:
+            self.bandeja = QSystemTrayIcon(QIcon('assets/icon.png'), self)
+            menu = QMenu(self)
+            menu.addAction("Abrir o Sinal", self.restaurar_da_bandeja)
+            menu.addSeparator()
+            menu.addAction("Sair", self.sair_do_aplicativo)
+            self.bandeja.setContextMenu(menu)
+            self.bandeja.activated.connect(self.on_bandeja_ativada)
+        self.atualizar_dica_bandeja()
+        self.bandeja.show()
+
+    def definir_modo_bandeja(self, ativa):
+        self.executar_no_banco("set_config", "modo_bandeja", "1" if ativa else "0", descricao="salvando a configuração")
+        self.configurar_bandeja(ativa)
+
+    def on_bandeja_ativada(self, motivo):
+        if motivo in (QSystemTrayIcon.Trigger, QSystemTrayIcon.DoubleClick):
+            self.restaurar_da_bandeja()
+
+    def ocultar_na_bandeja(self):
+        self.hide()
+        if self.bandeja is not None:
+            self.bandeja.showMessage("Sinal", "O Sinal continua tocando os sinais em segundo plano.",
+                                     QSystemTrayIcon.Information, 3000)
+
+    def restaurar_da_bandeja(self):
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    def executar_comando(self, comando, argumento=""):
+        """Comandos da linha de comando, inclusive os repassados por uma segunda execução."""
+        if comando == COMANDO_MOSTRAR:
+            self.restaurar_da_bandeja()
+        elif comando == COMANDO_RECARREGAR:
+            self.recarregar_programacao()
+        elif comando == COMANDO_IMPORTAR:
+            self.restaurar_da_bandeja()
+            if not os.path.isfile(argumento):
+                self.status_label.setText(f"Status: Arquivo não encontrado ({os.path.basename(argumento)})")
+                return
+            self.criar_sinal(argumento)
+
+    def sair_do_aplicativo(self):
+        self.saindo = True
+        self.close()
+        QApplication.instance().quit()
+
+    def atualizar_dica_bandeja(self):
+        if self.bandeja is None:
+            return
+        proximo = self.agendador.proximo_sinal()
+        if proximo is None:
+            self.bandeja.setToolTip("Sinal - nenhum sinal restante hoje")
+        else:
+            sinal, _ = proximo
+            self.bandeja.setToolTip(f"Sinal - próximo: {sinal.hora} {sinal.nome}")
+
+    def verificar_atualizacoes_em_segundo_plano(self):
+        if self.update_manager is None or not self.update_manager.is_available():
+            return
+        if self.update_check_thread is not None and self.update_check_thread.isRunning():
+            return
+        self.update_check_thread = UpdateCheckThread(self.update_manager, self)
+        self.update_check_thread.atualizacao_disponivel.connect(self.on_atualizacao_disponivel)
+        self.update_check_thread.start(QThread.LowPriority)
+
+    def on_atualizacao_disponivel(self, versao):
+        mensagem = f"A versão {versao} está disponível. Abra a janela de informações para atualizar."
+        if self.bandeja is not None and self.bandeja.isVisible():
+            self.bandeja.showMessage("Atualização disponível", mensagem, QSystemTrayIcon.Information, 10000)
+        else:
+            self.status_label.setText(f"Status: Versão {versao} disponível")
+
+    def aplicar_configuracoes(self, configuracoes):
+        self.normalizacao_ativa = configuracoes["normalizar_volume"] == "1"
+        self.biblioteca_gerenciada = configuracoes["biblioteca_gerenciada"] == "1"
+        # Iniciado com --bandeja: a janela ainda está oculta e precisa do ícone para ser reaberta
+        self.configurar_bandeja(configuracoes["modo_bandeja"] == "1" or self.isHidden())
+        self.manter_saida_ativa = configuracoes["manter_audio_ativo"] == "1"
+        self.carregar_latencia_audio()
+        if configuracoes["verificar_atualizacoes"] == "1":
+            self.update_timer.start(6 * 60 * 60 * 1000)
+        baixo_render = configuracoes["modo_baixo_render"] == "1"
+        if baixo_render != baixo_render_ativo():
+            aplicar_tema(QApplication.instance(), baixo_render)
+        self.iniciar_sincronizacao(configuracoes)
+        self.iniciar_processamento_audio()
+
+    def carregar_latencia_audio(self):
+        self.executar_no_banco(
+            "get_config",
+            CHAVE_LATENCIA + nome_dispositivo_saida(),
+            descricao="lendo as configurações",
+            ao_concluir=self.aplicar_latencia_audio,
+        )
+
+    def aplicar_latencia_audio(self, valor):
+        try:
+            self.agendador.latencia_ms = max(float(valor or 0), 0.0)
+        except ValueError:
+            self.agendador.latencia_ms = 0.0
+        self.agendar_proximo_sinal()
+
+    def definir_latencia_audio(self, dispositivo, latencia_ms):
+        self.executar_no_banco(
+            "set_config", CHAVE_LATENCIA + dispositivo, f"{latencia_ms:.1f}", descricao="salvando a configuração"
+        )
+        if dispositivo == nome_dispositivo_saida():
+            self.agendador.latencia_ms = latencia_ms
+            self.agendar_proximo_sinal()
+
+    def definir_saida_ativa(self, ativa):
+        self.executar_no_banco("set_config", "manter_audio_ativo", "1" if ativa else "0", descricao="salvando a configuração")
+        self.manter_saida_ativa = ativa
+        if not ativa:
+            self.encerrar_saida_ativa()
+        self.agendar_proximo_sinal()
+
+    def ativar_saida_audio(self):
+        self.saida_ativa_timer.stop()
+        self.audio_keepalive.iniciar()
+
+    def encerrar_saida_ativa(self):
+        # Mantém o fluxo aberto se o próximo sinal já estiver dentro da antecedência
+        proximo = self.agendador.proximo_sinal()
+        if (self.manter_saida_ativa and proximo is not None
+                and (self.agendador.momento_disparo(proximo[1]) - time.time()) * 1000 <= ANTECEDENCIA_SAIDA_ATIVA_MS):
+            return
+        if self.player.state() == QMediaPlayer.PlayingState:
+            return
+        self.audio_keepalive.parar()
+
+    def iniciar_indexacao_midias(self):
+        if self.media_index_thread is not None and self.media_index_thread.isRunning():
+            self.reindexacao_pendente = True
+            return
+        self.reindexacao_pendente = False
+        self.media_index_thread = MediaIndexThread(self.logic.arquivo_dados, self)
+        self.media_index_thread.indice_atualizado.connect(self.on_indice_midias_atualizado)
+        self.media_index_thread.finished.connect(self.on_indexacao_midias_finalizada)
+        self.media_index_thread.start(QThread.LowPriority)
+
+    def on_indice_midias_atualizado(self, midias):
+        self.midias = midias
+        self.show_musicas()
+        self.carregar_indices_sobreposicao()
+        self.iniciar_processamento_audio()
+
+    def definir_normalizacao(self, ativa):
+        self.executar_no_banco("set_config", "normalizar_volume", "1" if ativa else "0", descricao="salvando a configuração")
+        self.normalizacao_ativa = ativa
+        if ativa:
+            self.iniciar_processamento_audio()
+
+    def iniciar_processamento_audio(self):
+        if not self.normalizacao_ativa or not self.variant_cache.disponivel() or not self.midias:
+            return
+        if self.audio_processing_thread is not None and self.audio_processing_thread.isRunning():
+            return
+        self.audio_processing_thread = AudioProcessingThread(self.variant_cache, self.midias, self)
+        self.audio_processing_thread.variantes_prontas.connect(self.on_variantes_prontas)
+        self.audio_processing_thread.start(QThread.LowPriority)
+
+    def on_variantes_prontas(self, variantes):
+        self.variantes = variantes
+
+    def arquivo_para_reproducao(self, musica):
+        # Apenas consulta em memória: a normalização já foi feita em segundo plano
+        if self.normalizacao_ativa:
+            return self.variantes.get(musica, musica)
+        return musica
+
+    def tocar_musica(self, musica):
+        sequencia = ler_sequencia(musica)
+        self.player.tocar(
+            [self.arquivo_para_reproducao(clipe) for clipe in sequencia["clipes"]],
+            sequencia["crossfade_ms"],
+            sequencia["duracao_maxima_ms"],
+        )
+
+    def desfazer_alteracao(self):
+        self.executar_no_banco(
+            "desfazer",
+            descricao="desfazendo",
+            ao_concluir=lambda descricao: self.on_historico_aplicado(descricao, "Desfeito", "Nada para desfazer"),
+            ao_falhar=lambda exc: self.on_historico_falhou(exc, "desfazer"),
+        )
+
+    def refazer_alteracao(self):
+        self.executar_no_banco(
+            "refazer",
+            descricao="refazendo",
+            ao_concluir=lambda descricao: self.on_historico_aplicado(descricao, "Refeito", "Nada para refazer"),
+            ao_falhar=lambda exc: self.on_historico_falhou(exc, "refazer"),
+        )
+
+    def on_historico_aplicado(self, descricao, prefixo, mensagem_vazia):
+        if descricao is None:
+            self.status_label.setText(f"Status: {mensagem_vazia}")
+            return
+        self.status_label.setText(f"Status: {prefixo} - {descricao}")
+        self.recarregar_programacao()
+
+    def on_historico_falhou(self, exc, acao):
+        if not isinstance(exc, (ValueError, sqlite3.Error)):
+            log_banco.error("Erro ao %s alteração: %s", acao, exc)
+        self.status_label.setText(f"Status: Não foi possível {acao} ({exc})")
+
+    def recarregar_programacao(self):
+        self.show_musicas()
+        self.carregar_indices_sobreposicao()
+        self.atualizar_indice_busca()
+        self.atualizar_agenda()
+        self.salvar_instantaneo_programacao()
+        self.iniciar_indexacao_midias()
+
+    def compactar_historico(self):
+        def compactar(logic):
+            dias = int(logic.get_config("historico_dias", "90"))
+            return logic.compactar_historico(time.time() - dias * 24 * 60 * 60)
+
+        def concluir(removidas):
+            if removidas:
+                log_banco.info("Histórico compactado: %d alteração(ões) antiga(s) removida(s)", removidas)
+
+        self.executar_no_banco(
+            compactar,
+            descricao="compactando o histórico",
+            ao_concluir=concluir,
+            ao_falhar=lambda exc: log_banco.error("Erro ao compactar histórico: %s", exc),
+        )
+
+    def iniciar_sincronizacao(self, configuracoes):
+        self.sync_modo = configuracoes["sync_modo"] or ""
+        self.sync_token = configuracoes["sync_token"] or None
+        if self.sync_modo == "servidor":
+            try:
+                porta = int(configuracoes["sync_porta"] or PORTA_PADRAO)
+                # Sem token, só esta máquina é atendida: a programação não fica aberta à rede
+                host = "0.0.0.0" if self.sync_token else HOST_PADRAO
+                self.sync_server = SyncServer(self.logic.arquivo_dados, host, porta, self.sync_token)
+                self.sync_server.iniciar()
+                log_sync.info("Servidor de sincronização ativo em %s:%d", host, self.sync_server.porta)
+                if not self.sync_token:
+                    log_sync.warning("Sem sync_token configurado: as outras estações não conseguem sincronizar")
+            except OSError as e:
+                log_sync.error("Não foi possível iniciar o servidor de sincronização: %s", e)
+            self.sync_destino = configuracoes["sync_pasta"]
+            if self.sync_destino:
+                self.sync_timer.start(60 * 1000)
+        elif self.sync_modo == "cliente" and configuracoes["sync_origem"]:
+            self.sync_destino = configuracoes["sync_origem"]
+            self.sync_timer.start(30 * 1000)
+            QTimer.singleShot(0, self.executar_sincronizacao)
+
+    def executar_sincronizacao(self):
+        if self.sync_thread is not None and self.sync_thread.isRunning():
+            return
+        if not self.sync_destino:
+            return
+        self.sync_thread = SyncThread(
+            self.logic.arquivo_dados, self.sync_modo, self.sync_destino, self.sync_token, self
+        )
+        self.sync_thread.sincronizacao_concluida.connect(self.on_sincronizacao_concluida)
+        self.sync_thread.start(QThread.LowPriority)
+
+    def on_sincronizacao_concluida(self, mudou, mensagem):
+        log_sync.info("Sincronização: %s", mensagem)
+        if mudou:
+            self.recarregar_programacao()
+
+    def definir_baixo_render(self, ativo):
+        self.executar_no_banco("set_config", "modo_baixo_render", "1" if ativo else "0", descricao="salvando a configuração")
+        aplicar_tema(QApplication.instance(), ativo)
+
+    def biblioteca_ativa(self):
+        return self.biblioteca_gerenciada
+
+    def definir_biblioteca(self, ativa):
+        self.executar_no_banco(
+            "set_config", "biblioteca_gerenciada", "1" if ativa else "0", descricao="salvando a configuração"
+        )
+        self.biblioteca_gerenciada = ativa
+
+    def preparar_musica(self, musica):
+        """Valor de ``musica`` (arquivo ou sequência) com os clipes trocados pelas cópias na biblioteca."""
+        sequencia = ler_sequencia(musica)
+        clipes = self.preparar_arquivos_musica(sequencia["clipes"])
+        return montar_sequencia(clipes, sequencia["crossfade_ms"], sequencia["duracao_maxima_ms"])
+
+    def preparar_arquivos_musica(self, arquivos):
+        """Caminhos a gravar na programação: as cópias na biblioteca, se ela estiver ativa.
+
+        O hash e a cópia rodam em uma thread; enquanto isso a janela continua
+        respondendo e um diálogo mostra o andamento (arquivos WAV grandes
+        levam segundos).
+        """
+        if not self.biblioteca_ativa():
+            return list(arquivos)
+        progresso = QProgressDialog("Copiando para a biblioteca de músicas...", None, 0, 100, self)
+        progresso.setWindowTitle("Biblioteca de músicas")
+        progresso.setWindowModality(Qt.WindowModal)
+        progresso.setMinimumDuration(500)
+        progresso.setAutoClose(False)
+        progresso.setValue(0)
+
+        espera = QEventLoop(self)
+        thread = LibraryCopyThread(self.biblioteca, arquivos, self)
+        thread.progresso.connect(progresso.setValue)
+        thread.finished.connect(espera.quit)
+        thread.start(QThread.LowPriority)
+        if not thread.isFinished():
+            espera.exec_()
+        thread.wait()
+        progresso.close()
+        for objeto in (thread, progresso, espera):
+            objeto.deleteLater()
+        if thread.erros:
+            QMessageBox.warning(
+                self,
+                "Biblioteca de músicas",
+                "Não foi possível copiar para a biblioteca. O caminho original será usado.\n" + "\n".join(thread.erros),
+            )
+        return thread.caminhos
+
+    def importar_musicas_para_biblioteca(self):
+        if self.library_import_thread is not None and self.library_import_thread.isRunning():
+            return
+        self.status_label.setText("Status: Copiando músicas para a biblioteca...")
+        self.library_import_thread = LibraryImportThread(self.biblioteca, self.logic.arquivo_dados, self)
+        self.library_import_thread.importacao_concluida.connect(self.on_importacao_biblioteca_concluida)
+        self.library_import_thread.start(QThread.LowPriority)
+
+    def on_importacao_biblioteca_concluida(self, resumo):
+        if "erro" in resumo:
+            self.status_label.setText("Status: Falha ao copiar músicas para a biblioteca")
+            log_midias.error("Erro ao importar músicas para a biblioteca: %s", resumo["erro"])
+        else:
+            self.status_label.setText(
+                f"Status: {resumo['importados']} música(s) copiada(s) para a biblioteca"
+            )
+            log_midias.info("Importação para a biblioteca concluída: %s", resumo)
+        self.recarregar_programacao()
+
+    def on_indexacao_midias_finalizada(self):
+        if self.reindexacao_pendente:
+            self.iniciar_indexacao_midias()
+
+    def closeEvent(self, event):
+        if self.modo_bandeja and not self.saindo:
+            # Fechar a janela apenas a esconde; os sinais continuam sendo tocados
+            event.ignore()
+            self.ocultar_na_bandeja()
+            return
+        if self.bandeja is not None:
+            self.bandeja.hide()
+        self.audio_keepalive.parar()
+        self.watchdog.parar()
+        self.db_worker.parar(2)
+        try:
+            self.historico_worker.submeter("fechar").result(timeout=2)
+        except Exception as e:
+            log_banco.error("Erro ao gravar o histórico de reprodução: %s", e)
+        self.historico_worker.parar(2)
+        if self.sync_server is not None:
+            self.sync_server.parar()
+        for thread in (self.media_index_thread, self.library_import_thread, self.audio_processing_thread,
+                       self.sync_thread, self.prewarm_thread):
+            if thread is not None and thread.isRunning():
+                thread.requestInterruption()
+                thread.wait(2000)
+        super().closeEvent(event)
 
     def show_info_dialog(self):
         info_dialog = InfoDialog(self)
@@ -689,15 +1596,12 @@ class MusicAppUI(QMainWindow):
         self.table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table_widget.verticalHeader().setVisible(False)
         self.table_widget.horizontalHeader().setVisible(True)
-        self.table_widget.horizontalHeader().setStyleSheet("QHeaderView::section { background-color: lightgray; }")
-        self.table_widget.setStyleSheet("QTableWidget { background-color: rgba(3, 119, 175, 0.5); color: white; border: 1px solid lightgray; gridline-color: lightgray; }")
         self.table_widget.itemDoubleClicked.connect(self.editar_musica)
 
     def verificar_dia_atual(self):
-        current_day = QDate.currentDate().dayOfWeek()
-        if current_day <= 5:  # Apenas dias úteis (segunda a sexta)
-            current_day_str = ["segunda", "terça", "quarta", "quinta", "sexta"][current_day - 1]
-            self.set_selected_day(current_day_str)
+        dia = self.dia_atual()
+        if dia is not None:
+            self.set_selected_day(dia)
             self.show_musicas()
         # No fim de semana, não alterar o dia selecionado
 
@@ -707,75 +1611,342 @@ class MusicAppUI(QMainWindow):
         self.selected_day = day
 
     def atualizar_relogio(self):
-        hora_atual = QTime.currentTime()
-        self.relogio_label.setText(hora_atual.toString('HH:mm:ss'))
-        dia_semana_atual = QDate.currentDate().dayOfWeek()
-        if dia_semana_atual in [1, 2, 3, 4, 5]:
-            dia_atual_db = ["segunda", "terça", "quarta", "quinta", "sexta"][dia_semana_atual - 1]
-            self.verificar_musicas_automaticas(dia_atual_db, hora_atual)
-
-    def verificar_itens_similares(self, hora, nome, musica):
-        dias_similares = []
-        dias = ["segunda", "terça", "quarta", "quinta", "sexta"]
-        for dia in dias:
-            if dia == self.selected_day:
-                continue
-            musicas_dia = self.logic.get_musicas_por_dia(dia)
-            for h, n, m in musicas_dia:
-                if h == hora and n == nome and m == musica:
-                    dias_similares.append(dia)
-                    break  # Encontrou no dia, não precisa verificar mais
-        return dias_similares
-
-    def verificar_musicas_automaticas(self, dia, hora_atual):
-        musicas = self.logic.get_musicas_por_dia(dia)
-        current_time_str = hora_atual.toString("HH:mm")
-
-        for hora, nome, musica in musicas:
-            hora_musica = QTime.fromString(hora, "HH:mm")
-            if hora_musica.toString("HH:mm") == current_time_str:
-                if not self.music_played:  # Verifica se a música já foi tocada
-                    self.player.setMedia(QMediaContent(QUrl.fromLocalFile(musica)))
-                    self.player.play()
-                    self.status_label.setText(f"Status: Reproduzindo {nome} automaticamente")
-                    self.music_played = True
-                break
-        else:
-            self.music_played = False  # Reset para permitir que a música seja tocada no próximo horário
+        self.relogio_label.setText(QTime.currentTime().toString('HH:mm:ss'))
+
+    def armar_virada_do_dia(self):
+        # Recalculado a cada virada: dias com horário de verão têm 23 ou 25 horas
+        restante = proxima_meia_noite() - time.time()
+        self.virada_timer.start(max(int(restante * 1000), 0) + 50)
+
+    def on_virada_do_dia(self):
+        if self.dia_atual() != self.agendador.dia:
+            # Fecha o dia que terminou até a meia-noite (a janela de atraso já não vale para ele)
+            # e depois confere o dia novo, caso o computador tenha acordado bem depois da virada
+            meia_noite = instante_do_horario(0)
+            self.registrar_sinais_perdidos(meia_noite, date.fromtimestamp(meia_noite - 1))
+            self.registrar_sinais_perdidos()
+            self.atualizar_agenda()
+            self.verificar_dia_atual()
+        self.armar_virada_do_dia()
+        # O maior travamento exibido é sempre o do dia atual
+        self.atualizar_dica_status()
+
+    def verificar_ajuste_relogio(self):
+        salto = self.detector_ajuste.verificar()
+        if salto:
+            log_agendador.warning("Relógio do sistema ajustado em %+.0f s; reagendando os sinais", salto)
+            self.on_relogio_alterado()
+
+    def on_relogio_alterado(self):
+        self.detector_ajuste.reiniciar()
+        self.on_virada_do_dia()
+        self.agendar_proximo_sinal()
+
+    def nativeEvent(self, event_type, message):
+        # O Windows avisa todas as janelas quando a data/hora do sistema muda
+        if sys.platform == "win32" and event_type == b"windows_generic_MSG":
+            import ctypes.wintypes
+            msg = ctypes.wintypes.MSG.from_address(int(message))
+            if msg.message == WM_TIMECHANGE:
+                QTimer.singleShot(0, self.on_relogio_alterado)
+        return super().nativeEvent(event_type, message)
+
+    def atualizar_agenda(self):
+        # O dia muda na hora com o snapshot atual; o banco é lido depois, na thread do banco
+        self.agendador.trocar_dia(self.dia_atual())
+        self.agendar_proximo_sinal()
+        self.executar_no_banco(
+            lambda logic: SnapshotProgramacao.da_semana(*logic.get_semana_com_versao()),
+            chave="agenda",
+            descricao="carregando a programação da semana",
+            ao_concluir=self.on_snapshot_carregado,
+        )
+
+    def on_snapshot_carregado(self, snapshot):
+        # Troca de referência na thread da interface: o disparo vê o snapshot antigo ou o novo, nunca uma mistura
+        if self.agendador.trocar_snapshot(snapshot):
+            self.agendar_proximo_sinal()
+            self.aquecer_midias_do_dia()
+
+    def aquecer_midias_do_dia(self):
+        if self.prewarm_thread is not None and self.prewarm_thread.isRunning():
+            return
+        caminhos = sorted({
+            self.arquivo_para_reproducao(clipe)
+            for sinal in self.agendador.agenda
+            for clipe in sinal.clipes
+        })
+        if not caminhos:
+            return
+        self.prewarm_thread = MediaPrewarmThread(caminhos, self)
+        self.prewarm_thread.start(QThread.LowPriority)
+
+    def agendar_proximo_sinal(self):
+        self.sinal_timer.stop()
+        proximo = self.agendador.proximo_sinal()
+        self.atualizar_dica_bandeja()
+        if proximo is not None:
+            self.armar_sinal_timer(self.agendador.momento_disparo(proximo[1]))
+
+    def armar_sinal_timer(self, disparo):
+        restante_ms = (disparo - time.time()) * 1000
+        antecedencia_ms = ANTECEDENCIA_SAIDA_ATIVA_MS if self.manter_saida_ativa else 0
+        if antecedencia_ms and restante_ms <= antecedencia_ms:
+            self.ativar_saida_audio()
+        # Espera longa com timer econômico; o horário é relido perto do prazo
+        espera_ms, preciso = plano_de_espera(restante_ms, antecedencia_ms)
+        self.sinal_timer.setTimerType(Qt.PreciseTimer if preciso else Qt.VeryCoarseTimer)
+        self.sinal_timer.start(espera_ms)
+
+    def disparar_sinal_agendado(self):
+        vencido = self.agendador.sinal_vencido()
+        if vencido is None:
+            # Acordou na fase de espera longa (ou o relógio foi ajustado): arma a aproximação final
+            self.agendar_proximo_sinal()
+            return
+        sinal, instante = vencido
+        disparo = self.agendador.momento_disparo(instante)
+        self.tocar_musica(sinal.musica)
+        # Erro estimado do início do som: momento do play() somado à latência calibrada do dispositivo
+        erro_ms = (time.time() - disparo) * 1000
+        self.registrar_erro_disparo(sinal.hora, erro_ms)
+        self.registrar_reproducao(sinal.segundos, sinal.nome, sinal.musica, instante, erro_ms)
+        if self.audio_keepalive.ativo():
+            self.saida_ativa_timer.start(ESPERA_SAIDA_ATIVA_MS)
+        self.status_label.setText(f"Status: Reproduzindo {sinal.nome} automaticamente")
+        self.agendar_proximo_sinal()
+
+    def registrar_reproducao(self, segundos, nome, musica, instante, erro_ms):
+        data = time.strftime("%Y-%m-%d", time.localtime(instante))
+        # O future devolve o id do registro, usado para marcar a falha só deste sinal
+        self.reproducao_automatica = self.historico_worker.submeter(
+            "registrar", data, self.agendador.dia, segundos, time.time(), nome, musica, erro_ms, RESULTADO_TOCADO
+        )
+
+    def on_reproducao_falhou(self, clipe):
+        self.status_label.setText(f"Status: Não foi possível tocar {os.path.basename(clipe)}")
+        if self.reproducao_automatica is not None:
+            registro = self.reproducao_automatica
+            # Mesma thread do histórico: o registro já foi processado quando a falha é marcada
+            self.historico_worker.submeter(
+                lambda historico: historico.marcar_falha(registro.result(), f"Arquivo inválido: {clipe}")
+            )
+
+    def registrar_sinais_perdidos(self, ate=None, dia_local=None):
+        # A agenda é lida da programação e o registro é feito na thread do histórico
+        if ate is None:
+            ate = time.time() - JANELA_ATRASO_SINAL
+        return self.executar_no_banco(
+            lambda logic: {dia: logic.get_agenda_por_dia(dia) for dia in DIAS_SEMANA},
+            descricao="verificando sinais perdidos",
+            ao_concluir=lambda agenda: self.historico_worker.submeter("registrar_perdidos", agenda, ate, dia_local),
+        )
+
+    def registrar_erro_disparo(self, hora, erro_ms):
+        self.maior_erro_disparo_ms = max(self.maior_erro_disparo_ms, abs(erro_ms))
+        log_agendador.info("Sinal das %s disparado com erro de %+.1f ms", hora, erro_ms)
+        self.dica_disparo = (
+            f"Último sinal automático: {hora}, erro de {erro_ms:+.1f} ms "
+            f"(maior erro nesta execução: {self.maior_erro_disparo_ms:.1f} ms)"
+        )
+        self.atualizar_dica_status()
+
+    def on_travamento_detectado(self, duracao_ms, maior_hoje_ms, horario):
+        self.maior_travamento = (time.strftime("%Y-%m-%d"), maior_hoje_ms, horario)
+        self.atualizar_dica_status()
+
+    def atualizar_dica_status(self):
+        linhas = [self.dica_disparo] if self.dica_disparo else []
+        if self.maior_travamento is not None and self.maior_travamento[0] == time.strftime("%Y-%m-%d"):
+            _, duracao_ms, horario = self.maior_travamento
+            linhas.append(f"Maior travamento da janela hoje: {duracao_ms:.0f} ms às {horario} (ver {ARQUIVO_DIAGNOSTICO})")
+        self.status_label.setToolTip("\n".join(linhas))
 
     def on_day_button_clicked(self):
         clicked_button = self.sender()
         self.set_selected_day([day for day, button in self.buttons.items() if button is clicked_button][0])
         self.show_musicas()
 
-    def select_current_day_button(self):
-        current_day = QDate.currentDate().dayOfWeek()
-        if current_day <= 5:  # Apenas dias úteis (segunda a sexta)
-            current_day_str = ["segunda", "terça", "quarta", "quinta", "sexta"][current_day - 1]
-            self.set_selected_day(current_day_str)
-            self.show_musicas()
-        else:
-            # No fim de semana, selecionar segunda como padrão ou manter atual
-            self.set_selected_day("segunda")
-            self.show_musicas()
-
     def show_musicas(self):
         if not self.selected_day:
             return
+        dia = self.selected_day
+        # Cliques rápidos nos dias substituem a consulta ainda na fila pela mais recente
+        self.executar_no_banco(
+            "get_sinais_por_dia",
+            dia,
+            chave="show_musicas",
+            descricao="carregando a programação",
+            ao_concluir=lambda sinais: self.preencher_tabela(dia, sinais),
+        )
+
+    def preencher_tabela(self, dia, sinais):
+        if dia != self.selected_day:
+            return
 
         self.table_widget.setRowCount(0)
-        musicas = self.logic.get_musicas_por_dia(self.selected_day)
-        musicas = sorted(musicas, key=lambda x: x[0])
+        conflitos = self.indexar_dia(dia, sinais).conflitos()
 
-        for i, (hora, nome, musica) in enumerate(musicas):
+        for i, sinal in enumerate(sinais):
             self.table_widget.insertRow(i)
-            self.table_widget.setItem(i, 0, QTableWidgetItem(hora))  # Coluna 0
-            self.table_widget.setItem(i, 1, QTableWidgetItem(nome))  # Coluna 1
-            item_musica = QTableWidgetItem(os.path.basename(musica))
-            item_musica.setData(Qt.UserRole, musica)  # Armazenar caminho completo
+            item_hora = QTableWidgetItem(sinal.hora)
+            item_hora.setData(Qt.UserRole, sinal.id)  # Identificador estável da linha
+            self.table_widget.setItem(i, 0, item_hora)  # Coluna 0
+            self.table_widget.setItem(i, 1, QTableWidgetItem(sinal.nome))  # Coluna 1
+            item_musica = QTableWidgetItem(sinal.rotulo)
+            item_musica.setData(Qt.UserRole, sinal.musica)  # Armazenar caminho completo
+            item_musica.setToolTip("\n".join(sinal.clipes))
             self.table_widget.setItem(i, 2, item_musica)  # Coluna 2
+            if sinal.id in conflitos:
+                self.marcar_sobreposicao(i, dia, conflitos[sinal.id])
+            self.aplicar_info_midia(i, sinal.musica)
+        self.filtrar_tabela()
+
+    def atualizar_indice_busca(self):
+        versao = self.busca.versao
+
+        def consultar(logic):
+            # Só o que mudou desde a última versão indexada; sem registro suficiente, reconstrói tudo
+            alteracoes = logic.alteracoes_desde(versao)
+            if alteracoes is None:
+                programacao = logic.exportar_programacao()
+                return ScheduleSearch(programacao["linhas"], programacao["versao"])
+            return alteracoes
+
+        self.executar_no_banco(
+            consultar,
+            chave="indice_busca",
+            descricao="atualizando a busca",
+            ao_concluir=self.on_indice_busca_atualizado,
+        )
+
+    def on_indice_busca_atualizado(self, resultado):
+        if isinstance(resultado, ScheduleSearch):
+            if resultado.versao < self.busca.versao:
+                return
+            self.busca = resultado
+        else:
+            self.busca.aplicar_alteracoes(resultado)
+        self.aplicar_busca()
+
+    def aplicar_busca(self):
+        self.resultado_busca = self.busca.buscar(self.busca_edit.text())
+        for dia, button in self.buttons.items():
+            if self.resultado_busca is None:
+                button.setText(dia.capitalize())
+                button.setToolTip("")
+            else:
+                encontrados = len(self.resultado_busca.get(dia, ()))
+                button.setText(f"{dia.capitalize()[:3]} ({encontrados})")
+                button.setToolTip(f"{encontrados} sinal(is) encontrado(s) em {dia}")
+        self.filtrar_tabela()
+
+    def filtrar_tabela(self):
+        encontrados = None if self.resultado_busca is None else self.resultado_busca.get(self.selected_day, set())
+        for row in range(self.table_widget.rowCount()):
+            oculta = encontrados is not None and self.table_widget.item(row, 0).data(Qt.UserRole) not in encontrados
+            self.table_widget.setRowHidden(row, oculta)
+
+    def intervalo_do_sinal(self, hora, musica):
+        return intervalo_do_sinal(hora, musica, self.midias)
+
+    def indexar_dia(self, dia, sinais):
+        intervalos = []
+        rotulos = {}
+        for sinal in sinais:
+            intervalo = self.intervalo_do_sinal(sinal.hora, sinal.musica)
+            if intervalo is not None:
+                intervalos.append((intervalo[0], intervalo[1], sinal.id))
+                rotulos[sinal.id] = (sinal.hora, sinal.nome)
+        self.indices_dia[dia] = IndiceIntervalos(intervalos)
+        self.rotulos_sinais[dia] = rotulos
+        return self.indices_dia[dia]
+
+    def carregar_indices_sobreposicao(self):
+        def carregar(logic):
+            semana = {dia: [] for dia in DIAS_SEMANA}
+            for sinal in logic.get_semana():
+                semana[sinal.dia].append(sinal)
+            return semana
+
+        self.executar_no_banco(
+            carregar,
+            chave="sobreposicoes",
+            descricao="verificando sobreposições",
+            ao_concluir=self.on_semana_carregada,
+        )
+
+    def on_semana_carregada(self, semana):
+        for dia, sinais in semana.items():
+            self.indexar_dia(dia, sinais)
+
+    def descrever_sobreposicoes(self, dia, sobreposicoes):
+        rotulos = self.rotulos_sinais.get(dia, {})
+        return ", ".join(
+            "{} ({})".format(*rotulos.get(chave, (hora_dos_segundos(inicio), "?"))) for inicio, _, chave in sobreposicoes
+        )
+
+    def marcar_sobreposicao(self, row, dia, sobreposicoes):
+        for column in range(self.table_widget.columnCount()):
+            self.table_widget.item(row, column).setBackground(QBrush(QColor(230, 140, 20, 170)))
+        self.table_widget.item(row, 0).setToolTip(
+            "Sobrepõe-se a: " + self.descrever_sobreposicoes(dia, sobreposicoes)
+        )
+
+    def sobreposicoes_do_sinal(self, dias, hora, musica, ignorar=None):
+        """{dia: sobreposições} que o sinal teria em cada dia, consultando apenas o índice em memória."""
+        intervalo = self.intervalo_do_sinal(hora, musica)
+        if intervalo is None:
+            return {}
+        resultado = {}
+        for dia in dias:
+            indice = self.indices_dia.get(dia)
+            if indice is None or (ignorar is None and not indice.colide(*intervalo)):
+                continue
+            sobreposicoes = indice.sobreposicoes(*intervalo, ignorar=ignorar)
+            if sobreposicoes:
+                resultado[dia] = sobreposicoes
+        return resultado
+
+    def confirmar_sobreposicoes(self, dias, hora, musica, ignorar=None):
+        sobreposicoes = self.sobreposicoes_do_sinal(dias, hora, musica, ignorar)
+        if not sobreposicoes:
+            return True
+        detalhes = "\n".join(
+            f"{dia.capitalize()}: {self.descrever_sobreposicoes(dia, itens)}" for dia, itens in sobreposicoes.items()
+        )
+        resposta = QMessageBox.question(
+            self,
+            "Sinais sobrepostos",
+            f"O sinal das {hora} vai tocar ao mesmo tempo que:\n{detalhes}\n\nDeseja salvar mesmo assim?",
+            QMessageBox.Yes | QMessageBox.No,
+        )
+        return resposta == QMessageBox.Yes
+
+    def aplicar_info_midia(self, row, musica):
+        sequencia = ler_sequencia(musica)
+        infos = [self.midias.get(clipe) for clipe in sequencia["clipes"]]
+        if not infos or None in infos:
+            return
+        item_musica = self.table_widget.item(row, 2)
+        ausentes = [clipe for clipe, info in zip(sequencia["clipes"], infos) if not info["acessivel"]]
+        if ausentes:
+            # Arquivo movido ou apagado: destaca a linha inteira para correção
+            for column in range(self.table_widget.columnCount()):
+                self.table_widget.item(row, column).setBackground(QBrush(QColor(190, 40, 40, 170)))
+            item_musica.setToolTip("Arquivo não encontrado: " + "\n".join(ausentes))
+        else:
+            duracao = duracao_musica(musica, self.midias)
+            if duracao:
+                item_musica.setText(f"{item_musica.text()} ({formatar_duracao(duracao)})")
 
     def adicionar_nova_musica(self):
+        self.criar_sinal()
+
+    def mostrar_semana(self):
+        SemanaDialog(self, self).exec_()
+
+    def criar_sinal(self, arquivo_musica=None):
         hora_dialog = HoraInputDialog(self)
         if hora_dialog.exec() != QDialog.Accepted:
             return
@@ -798,39 +1969,77 @@ class MusicAppUI(QMainWindow):
         if not dias_selecionados:
             return
 
-        arquivo_musica, _ = QFileDialog.getOpenFileName(self, "Selecione a música", "", "MP3 Files (*.mp3)")
+        if arquivo_musica is None:
+            arquivo_musica = self.selecionar_musica("Selecione a música (várias formam uma sequência)")
         if not arquivo_musica:
             return
-
-        for dia in dias_selecionados:
-            self.logic.adicionar_musica(dia, hora, nome, arquivo_musica)
-        self.show_musicas()
+        if not self.confirmar_sobreposicoes(dias_selecionados, hora, arquivo_musica):
+            return
+        # Só copia para a biblioteca depois de confirmado, inclusive arquivos vindos de fora
+        # (segunda execução, gerenciador de arquivos)
+        arquivo_musica = self.preparar_musica(arquivo_musica)
+
+        self.executar_no_banco(
+            "adicionar_musicas",
+            dias_selecionados,
+            hora,
+            nome,
+            arquivo_musica,
+            descricao="salvando o novo sinal",
+            ao_concluir=lambda _: self.recarregar_programacao(),
+        )
 
     def deletar_musicas_selecionadas(self):
         rows = sorted(set(index.row() for index in self.table_widget.selectedIndexes()), reverse=True)
-        print(f"Linhas selecionadas para deletar: {rows}")
-        for row in rows:
-            hora = self.table_widget.item(row, 0).text()
-            nome = self.table_widget.item(row, 1).text()
-            musica = self.table_widget.item(row, 2).data(Qt.UserRole)
-            print(f"Deletando: dia={self.selected_day}, hora={hora}, nome={nome}, musica={musica}")
-            # Verificar se há itens similares em outros dias
-            dias_similares = self.verificar_itens_similares(hora, nome, musica)
-            print(f"Dias com itens similares: {dias_similares}")
+        log_banco.debug("Linhas selecionadas para deletar: %s", tuple(rows))
+        if not rows:
+            return
+        dia = self.selected_day
+        linhas = [
+            (
+                self.table_widget.item(row, 0).data(Qt.UserRole),
+                self.table_widget.item(row, 0).text(),
+                self.table_widget.item(row, 1).text(),
+                self.table_widget.item(row, 2).data(Qt.UserRole),
+            )
+            for row in rows
+        ]
+
+        def buscar_similares(logic):
+            return [logic.dias_com_itens_similares(dia, hora, nome, musica) for _, hora, nome, musica in linhas]
+
+        self.executar_no_banco(
+            buscar_similares,
+            descricao="verificando itens similares",
+            ao_concluir=lambda similares: self.confirmar_exclusao(dia, linhas, similares),
+        )
+
+    def confirmar_exclusao(self, dia, linhas, similares):
+        itens = []
+        similares_confirmados = []
+        for (id_linha, hora, nome, musica), dias_similares in zip(linhas, similares):
+            log_banco.debug(
+                "Deletando: dia=%s hora=%s nome=%s musica=%s similares=%s", dia, hora, nome, musica, tuple(dias_similares)
+            )
             if dias_similares:
                 # Mostrar diálogo de confirmação
                 dialog = DeleteConfirmationDialog(dias_similares, self)
-                if dialog.exec() == QDialog.Accepted:
-                    dias_para_deletar = [self.selected_day] + dialog.get_selected_days()
-                    print(f"Deletando de dias: {dias_para_deletar}")
-                    for dia in dias_para_deletar:
-                        self.logic.deletar_musica(dia, hora, nome)
-                else:
-                    print("Deletar cancelado")
+                if dialog.exec() != QDialog.Accepted:
+                    log_banco.debug("Deletar cancelado: dia=%s hora=%s nome=%s", dia, hora, nome)
                     continue
-            else:
-                self.logic.deletar_musica(self.selected_day, hora, nome)
-            self.table_widget.removeRow(row)
+                dias_para_deletar = dialog.get_selected_days()
+                log_banco.debug("Deletando de dias: %s", tuple([dia] + dias_para_deletar))
+                similares_confirmados.extend((outro_dia, hora, nome, musica) for outro_dia in dias_para_deletar)
+            itens.append((dia, id_linha))
+        if not itens:
+            return
+
+        def excluir(logic):
+            for outro_dia, hora, nome, musica in similares_confirmados:
+                itens.extend((outro_dia, id_similar) for id_similar in logic.buscar_ids(outro_dia, hora, nome, musica))
+            logic.deletar_musicas(itens)
+
+        self.executar_no_banco(excluir, descricao="excluindo sinais", ao_concluir=lambda _: self.recarregar_programacao())
 
     def play_selected_music(self):
         selected_row = self.table_widget.currentRow()
@@ -848,8 +2057,8 @@ class MusicAppUI(QMainWindow):
             self.status_label.setText("Status: Caminho do arquivo de música está vazio")
             return
 
-        self.player.setMedia(QMediaContent(QUrl.fromLocalFile(music_file)))
-        self.player.play()
+        self.reproducao_automatica = None
+        self.tocar_musica(music_file)
         self.status_label.setText("Status: Reproduzindo manualmente")
 
     def stop_playing_music(self):
@@ -858,7 +2067,10 @@ class MusicAppUI(QMainWindow):
 
     def on_player_state_changed(self, state):
         if state == QMediaPlayer.StoppedState:
+            self.reproducao_automatica = None
             self.status_label.setText("Status: Aguardando")
+            if self.audio_keepalive.ativo():
+                self.saida_ativa_timer.start(ESPERA_SAIDA_ATIVA_MS)
 
     def editar_musica(self, item):
         row = item.row()
@@ -873,8 +2085,7 @@ class MusicAppUI(QMainWindow):
         else:
             return
 
-        hora = self.table_widget.item(row, 0).text()
-        nome = self.table_widget.item(row, 1).text()
+        id_linha = self.table_widget.item(row, 0).data(Qt.UserRole)
 
         if column in [0, 1]:  # Coluna 1: Hora, Coluna 2: Nome
             if column == 0:  # Se for a coluna de hora
@@ -886,77 +2097,61 @@ class MusicAppUI(QMainWindow):
                 return
 
             nova_informacao = dialog.get_input()
-            if nova_informacao:
-                self.logic.editar_musica(self.selected_day, hora, nome, campo, nova_informacao)
-                self.show_musicas()
-                if column == 1:  # Se a hora foi alterada
-                    self.verificar_musicas_automaticas(self.selected_day, QTime.currentTime())
+            if not nova_informacao:
+                return
+            if column == 0 and not self.confirmar_sobreposicoes(
+                [self.selected_day], nova_informacao, self.table_widget.item(row, 2).data(Qt.UserRole), id_linha
+            ):
+                return
+            self.salvar_edicao(id_linha, campo, nova_informacao)
 
         elif column == 2:  # Coluna 2: Arquivo de música
-            arquivo_musica, _ = QFileDialog.getOpenFileName(self, "Selecione a nova música", "", "MP3 Files (*.mp3)")
-            if arquivo_musica:
-                self.logic.editar_musica(self.selected_day, hora, nome, campo, arquivo_musica)
-                self.show_musicas()
-
-    def verificar_musicas_automaticas(self, dia, hora_atual):
-        musicas = self.logic.get_musicas_por_dia(dia)
-        current_time_str = hora_atual.toString("HH:mm")
-        
-        for hora, nome, musica in musicas:
-            hora_musica = QTime.fromString(hora, "HH:mm")
-            if hora_musica.toString("HH:mm") == current_time_str:
-                if not self.music_played:  # Verifica se a música já foi tocada
-                    self.player.setMedia(QMediaContent(QUrl.fromLocalFile(musica)))
-                    self.player.play()
-                    self.status_label.setText(f"Status: Reproduzindo {nome} automaticamente")
-                    self.music_played = True
-                break
+            atual = ler_sequencia(self.table_widget.item(row, 2).data(Qt.UserRole))
+            arquivo_musica = self.selecionar_musica("Selecione a nova música", atual)
+            if arquivo_musica and self.confirmar_sobreposicoes(
+                [self.selected_day], self.table_widget.item(row, 0).text(), arquivo_musica, id_linha
+            ):
+                self.salvar_edicao(id_linha, campo, self.preparar_musica(arquivo_musica))
+
+    def selecionar_musica(self, titulo, atual=None):
+        """Valor para a coluna ``musica``: um arquivo, ou uma sequência quando vários são escolhidos.
+
+        Os caminhos são os escolhidos; a cópia para a biblioteca é feita por
+        ``preparar_musica`` quando o sinal é confirmado.
+        """
+        arquivos, _ = QFileDialog.getOpenFileNames(self, titulo, "", "MP3 Files (*.mp3)")
+        if not arquivos:
+            return None
+        crossfade_ms = atual["crossfade_ms"] if atual else 0
+        duracao_maxima_ms = atual["duracao_maxima_ms"] if atual else 0
+        if len(arquivos) > 1:
+            dialog = SequenciaDialog(arquivos, crossfade_ms, duracao_maxima_ms, self)
+            if dialog.exec() != QDialog.Accepted:
+                return None
+            arquivos = dialog.get_clipes()
+            crossfade_ms = dialog.crossfade_spin.value()
+            duracao_maxima_ms = dialog.duracao_spin.value() * 1000
         else:
-            self.music_played = False  # Reset para permitir que a música seja tocada no próximo horário
-
-class Player(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        # Inicializa outras partes da classe
-        self.musica_ja_tocada = False
-        self.ultimo_horario_verificado = None
-        self.timer_musica = QTimer(self)
-        self.timer_musica.setSingleShot(True)  # Tocar a música apenas uma vez por evento
-        self.table_widget.setItemDelegateForColumn(0, QStyledItemDelegate(self))
-        self.table_widget.setItemDelegateForColumn(1, QStyledItemDelegate(self))
-        self.table_widget.setItemDelegateForColumn(2, QStyledItemDelegate(self))
-        self.table_widget.setItemDelegateForColumn(3, QStyledItemDelegate(self))
-        
-    def verificar_musicas_automaticas(self, dia, hora_atual):
-        musicas = self.logic.get_musicas_por_dia(dia)
-        
-        # Reseta o sinalizador a cada novo minuto
-        if hora_atual != self.ultimo_horario_verificado:
-            self.musica_ja_tocada = False
-
-        for hora, nome, musica in musicas:
-            hora_musica = QTime.fromString(hora, "HH:mm")
-            if hora_musica.hour() == hora_atual.hour() and hora_musica.minute() == hora_atual.minute():
-                if not self.musica_ja_tocada:
-                    self.timer_musica.timeout.connect(lambda: self.tocar_musica(musica, nome))
-                    self.timer_musica.start(1000)  # Espera 1 segundo antes de tocar a música
-                    self.musica_ja_tocada = True
-                break
-
-        # Atualiza o último horário verificado
-        self.ultimo_horario_verificado = hora_atual
-
-    def tocar_musica(self, musica, nome):
-        self.player.setMedia(QMediaContent(QUrl.fromLocalFile(musica)))
-        self.player.play()
-        self.status_label.setText(f"Status: Reproduzindo {nome} automaticamente")
+            crossfade_ms = 0
+        return montar_sequencia(arquivos, crossfade_ms, duracao_maxima_ms)
+
+    def salvar_edicao(self, id_linha, campo, valor):
+        self.executar_no_banco(
+            "editar_musica_por_id",
+            self.selected_day,
+            id_linha,
+            campo,
+            valor,
+            descricao="salvando a alteração",
+            ao_concluir=lambda _: self.recarregar_programacao(),
+        )
 
 class InfoDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Informações do App")
-        self.setStyleSheet("background-color: white;")
-        self.update_manager = UpdateManager(self)
+        # A janela principal já prepara o atualizador durante a inicialização
+        self.update_manager = getattr(parent, "update_manager", None) or UpdateManager(self)
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(24, 20, 24, 20)
         self.layout.setSpacing(20)
@@ -972,14 +2167,14 @@ class InfoDialog(QDialog):
         info_font.setPointSize(10)
 
         tips_container = QFrame(self)
-        tips_container.setStyleSheet("QFrame { background-color: #f6f6f6; border: 1px solid #d4d4d4; border-radius: 8px; }")
+        tips_container.setObjectName("painelDicas")
         tips_layout = QVBoxLayout(tips_container)
         tips_layout.setContentsMargins(16, 16, 16, 16)
         tips_layout.setSpacing(10)
 
         tips_title = QLabel("Dicas:", tips_container)
         tips_title.setFont(title_font)
-        tips_title.setStyleSheet("color: #1f1f1f;")
+        tips_title.setObjectName("tituloDicas")
         tips_layout.addWidget(tips_title)
 
         tips_text = QLabel(
@@ -994,25 +2189,114 @@ class InfoDialog(QDialog):
         )
         tips_text.setFont(tips_font)
         tips_text.setWordWrap(True)
-        tips_text.setStyleSheet("color: #333333;")
+        tips_text.setObjectName("textoDicas")
         tips_layout.addWidget(tips_text)
 
         self.layout.addWidget(tips_container)
 
+        self.main_window = parent if isinstance(parent, MusicAppUI) else None
+        if self.main_window is not None:
+            self.biblioteca_checkbox = QCheckBox("Copiar músicas para a biblioteca do aplicativo", self)
+            self.biblioteca_checkbox.setFont(info_font)
+            self.biblioteca_checkbox.setToolTip(
+                "Ao adicionar um sinal, o arquivo é copiado uma única vez para a pasta "
+                f"'{PASTA_BIBLIOTECA}' ao lado do programa, evitando cópias duplicadas."
+            )
+            self.biblioteca_checkbox.setChecked(self.main_window.biblioteca_ativa())
+            self.biblioteca_checkbox.toggled.connect(self.on_biblioteca_toggled)
+            self.layout.addWidget(self.biblioteca_checkbox)
+
+            self.normalizacao_checkbox = QCheckBox("Normalizar o volume dos sinais", self)
+            self.normalizacao_checkbox.setFont(info_font)
+            self.normalizacao_checkbox.setChecked(self.main_window.normalizacao_ativa)
+            if self.main_window.variant_cache.disponivel():
+                self.normalizacao_checkbox.setToolTip(
+                    "Gera em segundo plano cópias com volume equalizado (EBU R128) de cada música."
+                )
+            else:
+                self.normalizacao_checkbox.setEnabled(False)
+                self.normalizacao_checkbox.setToolTip(
+                    "Requer o ffmpeg. Coloque ffmpeg.exe na pasta do programa ou no PATH."
+                )
+            self.normalizacao_checkbox.toggled.connect(self.main_window.definir_normalizacao)
+            self.layout.addWidget(self.normalizacao_checkbox)
+
+            self.baixo_render_checkbox = QCheckBox("Modo leve (sem sombras e transparências)", self)
+            self.baixo_render_checkbox.setFont(info_font)
+            self.baixo_render_checkbox.setToolTip("Reduz o custo de desenho da janela em computadores com vídeo integrado.")
+            self.baixo_render_checkbox.setChecked(baixo_render_ativo())
+            if baixo_render_forcado():
+                self.baixo_render_checkbox.setEnabled(False)
+                self.baixo_render_checkbox.setToolTip("Ativado pela variável de ambiente SINAL_BAIXO_RENDER=1.")
+            self.baixo_render_checkbox.toggled.connect(self.main_window.definir_baixo_render)
+            self.layout.addWidget(self.baixo_render_checkbox)
+
+            self.bandeja_checkbox = QCheckBox("Continuar na bandeja do sistema ao fechar", self)
+            self.bandeja_checkbox.setFont(info_font)
+            self.bandeja_checkbox.setChecked(self.main_window.modo_bandeja)
+            if QSystemTrayIcon.isSystemTrayAvailable():
+                self.bandeja_checkbox.setToolTip("A janela é escondida e os sinais continuam tocando no horário.")
+            else:
+                self.bandeja_checkbox.setEnabled(False)
+                self.bandeja_checkbox.setToolTip("A bandeja do sistema não está disponível.")
+            self.bandeja_checkbox.toggled.connect(self.main_window.definir_modo_bandeja)
+            self.layout.addWidget(self.bandeja_checkbox)
+
+            self.saida_ativa_checkbox = QCheckBox("Manter a saída de áudio ativa antes dos sinais", self)
+            self.saida_ativa_checkbox.setFont(info_font)
+            self.saida_ativa_checkbox.setToolTip(
+                "Evita que caixas de som USB ou Bluetooth entrem em repouso e cortem o início do sinal."
+            )
+            self.saida_ativa_checkbox.setChecked(self.main_window.manter_saida_ativa)
+            self.saida_ativa_checkbox.toggled.connect(self.main_window.definir_saida_ativa)
+            self.layout.addWidget(self.saida_ativa_checkbox)
+
+            self.calibrar_button = QPushButton(self.texto_calibracao(), self)
+            self.calibrar_button.setFont(info_font)
+            self.calibrar_button.setFixedHeight(32)
+            self.calibrar_button.setToolTip(
+                f"Mede o atraso de início do áudio em '{nome_dispositivo_saida()}'; "
+                "os sinais passam a ser disparados antes nesse tempo."
+            )
+            self.calibrar_button.clicked.connect(self.calibrar_latencia)
+            self.layout.addWidget(self.calibrar_button)
+            self.calibrador = None
+
+            self.restaurar_button = QPushButton("Restaurar programação...", self)
+            self.restaurar_button.setFont(info_font)
+            self.restaurar_button.setFixedHeight(32)
+            self.restaurar_button.setToolTip("Volta a programação para uma data e hora anteriores (Ctrl+Z desfaz a última alteração)")
+            self.restaurar_button.clicked.connect(self.restaurar_programacao)
+            self.layout.addWidget(self.restaurar_button)
+
+            self.historico_button = QPushButton("Histórico de reprodução...", self)
+            self.historico_button.setFont(info_font)
+            self.historico_button.setFixedHeight(32)
+            self.historico_button.setToolTip("Sinais perdidos, com falha ou atrasados e o atraso médio por dia")
+            self.historico_button.clicked.connect(lambda: HistoricoDialog(self.main_window, self).exec_())
+            self.layout.addWidget(self.historico_button)
+
+            self.semana_button = QPushButton("Visão da semana...", self)
+            self.semana_button.setFont(info_font)
+            self.semana_button.setFixedHeight(32)
+            self.semana_button.setToolTip("Todos os dias lado a lado; arraste sinais para outro dia para copiá-los (Ctrl+Shift+S)")
+            self.semana_button.clicked.connect(self.main_window.mostrar_semana)
+            self.layout.addWidget(self.semana_button)
+
         version_layout = QHBoxLayout()
         version_layout.setSpacing(8)
         version_layout.setAlignment(Qt.AlignCenter)
 
         self.version_label = QLabel(f"Versão {APP_VERSION}", self)
         self.version_label.setFont(info_font)
-        self.version_label.setStyleSheet("color: #333333;")
+        self.version_label.setObjectName("textoSecundario")
         version_layout.addWidget(self.version_label)
 
         self.update_button = QToolButton(self)
         self.update_button.setIcon(self.style().standardIcon(QStyle.SP_BrowserReload))
         self.update_button.setToolTip("Verificar atualizações")
         self.update_button.setAutoRaise(True)
-        self.update_button.setStyleSheet("background-color: transparent;")
+        self.update_button.setObjectName("botaoAtualizar")
         self.update_button.clicked.connect(self.check_for_updates)
         if not self.update_manager.is_available():
             self.update_button.setEnabled(False)
@@ -1026,7 +2310,7 @@ class InfoDialog(QDialog):
         self.developer_label = QLabel("Desenvolvido por Luiz Gustavo Stelo<br>ASM", self)
         self.developer_label.setAlignment(Qt.AlignCenter)
         self.developer_label.setFont(info_font)
-        self.developer_label.setStyleSheet("color: #333333;")
+        self.developer_label.setObjectName("textoSecundario")
         self.layout.addWidget(self.developer_label)
 
         button_layout = QHBoxLayout()
@@ -1034,13 +2318,75 @@ class InfoDialog(QDialog):
         self.ok_button = QPushButton("OK", self)
         self.ok_button.setFont(tips_font)
         self.ok_button.setFixedSize(90, 40)
-        self.ok_button.setStyleSheet("background-color: white; color: black; border-radius: 5px; border: 1px solid black;")
         add_drop_shadow(self.ok_button)
         self.ok_button.clicked.connect(self.accept)
         button_layout.addWidget(self.ok_button)
         button_layout.addStretch()
         self.layout.addLayout(button_layout)
 
+    def on_biblioteca_toggled(self, checked):
+        self.main_window.definir_biblioteca(checked)
+        if not checked:
+            return
+        response = QMessageBox.question(
+            self,
+            "Biblioteca de músicas",
+            "Deseja copiar também as músicas já cadastradas para a biblioteca?",
+            QMessageBox.Yes | QMessageBox.No,
+        )
+        if response == QMessageBox.Yes:
+            self.main_window.importar_musicas_para_biblioteca()
+
+    def texto_calibracao(self):
+        return f"Calibrar latência do áudio (atual: {self.main_window.agendador.latencia_ms:.0f} ms)"
+
+    def calibrar_latencia(self):
+        self.calibrar_button.setEnabled(False)
+        self.calibrar_button.setText("Calibrando o áudio...")
+        # A calibração é feita com a saída já acordada, como acontece antes de um sinal
+        self.main_window.ativar_saida_audio()
+        self.calibrador = LatencyCalibrator(parent=self)
+        self.calibrador.calibracao_concluida.connect(self.on_calibracao_concluida)
+        self.calibrador.calibracao_falhou.connect(self.on_calibracao_falhou)
+        QTimer.singleShot(1000, self.calibrador.iniciar)
+
+    def on_calibracao_concluida(self, dispositivo, latencia_ms):
+        self.main_window.definir_latencia_audio(dispositivo, latencia_ms)
+        self.finalizar_calibracao()
+        medicoes = ", ".join(f"{valor:.0f}" for valor in self.calibrador.medicoes)
+        log_player.info("Latência de áudio em '%s': %.1f ms (medições: %s)", dispositivo, latencia_ms, medicoes)
+
+    def on_calibracao_falhou(self, mensagem):
+        self.finalizar_calibracao()
+        QMessageBox.warning(self, "Calibrar Áudio", f"Não foi possível medir a latência do áudio.\n{mensagem}")
+
+    def finalizar_calibracao(self):
+        self.main_window.encerrar_saida_ativa()
+        self.calibrar_button.setEnabled(True)
+        self.calibrar_button.setText(self.texto_calibracao())
+
+    def restaurar_programacao(self):
+        dialog = RestoreDialog(self)
+        if dialog.exec() != QDialog.Accepted:
+            return
+        self.restaurar_button.setEnabled(False)
+        self.main_window.executar_no_banco(
+            "restaurar_ate",
+            dialog.get_timestamp(),
+            descricao="restaurando a programação",
+            ao_concluir=self.on_programacao_restaurada,
+            ao_falhar=self.on_restauracao_falhou,
+        )
+
+    def on_programacao_restaurada(self, _):
+        self.restaurar_button.setEnabled(True)
+        self.main_window.status_label.setText("Status: Programação restaurada (Ctrl+Z para desfazer)")
+        self.main_window.recarregar_programacao()
+
+    def on_restauracao_falhou(self, exc):
+        self.restaurar_button.setEnabled(True)
+        QMessageBox.warning(self, "Restaurar Programação", f"Não foi possível restaurar a programação.\n{exc}")
+
     def check_for_updates(self):
         if not self.update_manager.is_available():
             QMessageBox.information(
@@ -1135,11 +2481,186 @@ class InfoDialog(QDialog):
         self.accept()
         QApplication.instance().quit()
 
+class HistoricoDialog(QDialog):
+    RESULTADOS = {"perdido": "Perdido", "falhou": "Falhou", "tocado": "Atrasado"}
+
+    def __init__(self, main_window, parent=None):
+        super().__init__(parent)
+        self.main_window = main_window
+        self.setWindowTitle("Histórico de Reprodução")
+        self.resize(620, 480)
+        self.layout = QVBoxLayout(self)
+        self.layout.setContentsMargins(24, 20, 24, 20)
+        self.layout.setSpacing(12)
+
+        filtro_layout = QHBoxLayout()
+        filtro_layout.addWidget(QLabel("Mês:", self))
+        self.mes_edit = QDateEdit(QDate.currentDate(), self)
+        self.mes_edit.setDisplayFormat("MM/yyyy")
+        self.mes_edit.setMaximumDate(QDate.currentDate())
+        self.mes_edit.dateChanged.connect(self.carregar_relatorio)
+        filtro_layout.addWidget(self.mes_edit)
+        filtro_layout.addStretch()
+        self.layout.addLayout(filtro_layout)
+
+        self.resumo_label = QLabel("Carregando...", self)
+        self.resumo_label.setWordWrap(True)
+        self.layout.addWidget(self.resumo_label)
+
+        self.tabela = QTableWidget(0, 5, self)
+        self.tabela.setHorizontalHeaderLabels(["Data", "Hora", "Nome", "Resultado", "Atraso"])
+        self.tabela.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.tabela.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.layout.addWidget(self.tabela)
+
+        self.deriva_label = QLabel("", self)
+        self.deriva_label.setWordWrap(True)
+        self.layout.addWidget(self.deriva_label)
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok, self)
+        self.exportar_button = self.button_box.addButton("Exportar CSV...", QDialogButtonBox.ActionRole)
+        self.exportar_button.clicked.connect(self.exportar_csv)
+        self.button_box.accepted.connect(self.accept)
+        self.layout.addWidget(self.button_box)
+        for button in self.button_box.buttons():
+            button.setFixedHeight(40)
+            add_drop_shadow(button)
+
+        self.carregar_relatorio()
+
+    def periodo(self):
+        mes = self.mes_edit.date()
+        return intervalo_do_mes(mes.year(), mes.month())
+
+    def carregar_relatorio(self):
+        inicio, fim = self.periodo()
+        self.main_window.historico_bridge.executar(
+            "relatorio", inicio, fim, chave="relatorio", ao_concluir=self.mostrar_relatorio,
+            ao_falhar=lambda exc: self.resumo_label.setText(f"Não foi possível ler o histórico: {exc}"),
+        )
+
+    def mostrar_relatorio(self, relatorio):
+        if (relatorio["inicio"], relatorio["fim"]) != self.periodo():
+            return
+        problemas = relatorio["problemas"]
+        self.tabela.setRowCount(len(problemas))
+        for linha, (data, _, segundos, nome, resultado, atraso_ms, detalhe) in enumerate(problemas):
+            valores = [
+                QDate.fromString(data, "yyyy-MM-dd").toString("dd/MM/yyyy"),
+                hora_dos_segundos(segundos),
+                nome or "",
+                self.RESULTADOS.get(resultado, resultado),
+                "" if atraso_ms is None else f"{atraso_ms / 1000:+.1f} s",
+            ]
+            for coluna, valor in enumerate(valores):
+                item = QTableWidgetItem(valor)
+                if detalhe:
+                    item.setToolTip(detalhe)
+                self.tabela.setItem(linha, coluna, item)
+        if problemas:
+            self.resumo_label.setText(f"{len(problemas)} sinal(is) perdido(s), com falha ou atrasado(s) neste mês.")
+        else:
+            self.resumo_label.setText("Nenhum sinal perdido, com falha ou atrasado neste mês.")
+        deriva = relatorio["deriva_por_dia"]
+        partes = [
+            f"{dia.capitalize()}: {deriva[dia][0]:+.1f} ms ({deriva[dia][1]} sinais)"
+            for dia in DIAS_SEMANA
+            if dia in deriva
+        ]
+        self.deriva_label.setText("Atraso médio por dia: " + ("; ".join(partes) if partes else "sem dados"))
+
+    def exportar_csv(self):
+        inicio, fim = self.periodo()
+        caminho, _ = QFileDialog.getSaveFileName(
+            self, "Exportar histórico", f"historico_{inicio[:7]}.csv", "CSV (*.csv)"
+        )
+        if not caminho:
+            return
+        self.main_window.historico_bridge.executar(
+            "exportar_csv", caminho, inicio, fim,
+            ao_concluir=lambda quantidade: self.resumo_label.setText(f"{quantidade} registro(s) exportado(s) para {caminho}"),
+            ao_falhar=lambda exc: QMessageBox.warning(self, "Exportar histórico", f"Não foi possível exportar.\n{exc}"),
+        )
+
+
+class SemanaDialog(QDialog):
+    def __init__(self, main_window, parent=None):
+        super().__init__(parent)
+        self.main_window = main_window
+        self.setWindowTitle("Visão da Semana")
+        self.resize(760, 560)
+        self.layout = QVBoxLayout(self)
+        self.layout.setContentsMargins(24, 20, 24, 20)
+        self.layout.setSpacing(12)
+
+        self.resumo_label = QLabel("Carregando...", self)
+        self.resumo_label.setWordWrap(True)
+        self.layout.addWidget(self.resumo_label)
+
+        self.modelo = WeekModel(self)
+        self.modelo.copia_solicitada.connect(self.copiar_sinais)
+        self.tabela = QTableView(self)
+        self.tabela.setModel(self.modelo)
+        self.tabela.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # Altura fixa: medir o conteúdo de cada linha obrigaria a montar todas as células
+        self.tabela.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.tabela.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.tabela.setDragDropMode(QAbstractItemView.DragDrop)
+        self.tabela.setDefaultDropAction(Qt.CopyAction)
+        self.tabela.setDragDropOverwriteMode(True)
+        self.tabela.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabela.setWordWrap(False)
+        self.layout.addWidget(self.tabela)
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok, self)
+        self.button_box.accepted.connect(self.accept)
+        self.layout.addWidget(self.button_box)
+        for button in self.button_box.buttons():
+            button.setFixedHeight(40)
+            add_drop_shadow(button)
+
+        self.carregar()
+
+    def carregar(self):
+        self.main_window.executar_no_banco(
+            "get_semana",
+            chave="semana",
+            descricao="carregando a semana",
+            ao_concluir=self.mostrar_semana,
+            ao_falhar=lambda exc: self.resumo_label.setText(f"Não foi possível ler a programação: {exc}"),
+        )
+
+    def mostrar_semana(self, sinais):
+        self.modelo.carregar(sinais)
+        self.resumo_label.setText(
+            f"{len(sinais)} sinal(is) em {self.modelo.rowCount()} horário(s). "
+            "Arraste sinais para a coluna de outro dia para copiá-los no mesmo horário."
+        )
+
+    def copiar_sinais(self, destino, operacoes):
+        if not operacoes:
+            self.resumo_label.setText(f"{destino.capitalize()} já tem esses sinais.")
+            return
+        descricao = f"Copiar {len(operacoes)} sinal(is) para {destino}"
+        self.main_window.executar_no_banco(
+            lambda logic: logic.aplicar_lote(operacoes, descricao=descricao),
+            descricao="copiando sinais",
+            ao_concluir=lambda resumo: self.on_copia_concluida(destino, resumo),
+            ao_falhar=lambda exc: QMessageBox.warning(self, "Copiar sinais", f"Não foi possível copiar.\n{exc}"),
+        )
+
+    def on_copia_concluida(self, destino, resumo):
+        self.main_window.recarregar_programacao()
+        self.carregar()
+        self.main_window.status_label.setText(
+            f"Status: {resumo['adicionados']} sinal(is) copiado(s) para {destino}"
+        )
+
+
 class DaySelectionDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Seleção de Dias")
-        self.setStyleSheet("background-color: white;")
         self.layout = QVBoxLayout(self)
 
         self.checkboxes = {}
@@ -1155,7 +2676,6 @@ class DaySelectionDialog(QDialog):
 
         for button in self.button_box.buttons():
             button.setFixedSize(90, 40)
-            button.setStyleSheet("background-color: white; color: black; border-radius: 5px; border: 1px solid black;")
             add_drop_shadow(button)
 
     def get_selected_days(self):
@@ -1165,7 +2685,6 @@ class DeleteConfirmationDialog(QDialog):
     def __init__(self, dias_similares, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Confirmar Deletar")
-        self.setStyleSheet("background-color: white;")
         self.layout = QVBoxLayout(self)
 
         self.label = QLabel("Foram encontrados itens similares nos seguintes dias. Deseja deletar também desses dias?", self)
@@ -1184,7 +2703,6 @@ class DeleteConfirmationDialog(QDialog):
 
         for button in self.button_box.buttons():
             button.setFixedSize(90, 40)
-            button.setStyleSheet("background-color: white; color: black; border-radius: 5px; border: 1px solid black;")
             add_drop_shadow(button)
 
     def get_selected_days(self):
@@ -1198,11 +2716,31 @@ def center_window(window):
     window.move(qr.topLeft())
 
 def main():
+    configurar_registro(diretorio_aplicativo())
     app = QApplication(sys.argv)
-    logic = MusicAppLogic("dados.db")
+    aplicar_tema(app)
+    if PERFILADOR is not None:
+        if PERFILADOR.inicio > 0:
+            QTimer.singleShot(int(PERFILADOR.inicio * 1000), PERFILADOR.iniciar)
+        QTimer.singleShot(int((PERFILADOR.inicio + PERFILADOR.duracao) * 1000), PERFILADOR.concluir)
+        # Fechar o programa antes do fim da janela ainda grava o que foi medido
+        app.aboutToQuit.connect(PERFILADOR.concluir)
+    # As tabelas são criadas/migradas pela thread do banco, depois da primeira pintura
+    logic = MusicAppLogic("dados.db", inicializar=False)
     window = MusicAppUI(logic)
     center_window(window)
-    window.show()
+    if INSTANCIA is not None:
+        INSTANCIA.comando_recebido.connect(window.executar_comando)
+        INSTANCIA.escutar()
+    for comando, argumento in ler_comandos(sys.argv[1:]):
+        if comando != COMANDO_MOSTRAR:
+            QTimer.singleShot(0, lambda c=comando, a=argumento: window.executar_comando(c, a))
+    if "--bandeja" in sys.argv[1:] and QSystemTrayIcon.isSystemTrayAvailable():
+        # Inicia direto na bandeja, sem exibir a janela
+        window.configurar_bandeja(True)
+        window.iniciar_etapas()
+    else:
+        window.show()
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
@@ -0,0 +1,253 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+
+
+PASTA_VARIANTES = "Cache"
+TABELA_VARIANTES = "variantes"
+PARAMETROS_PADRAO = {
+    "alvo_lufs": -16.0,
+    "pico_maximo": -1.5,
+    "faixa_lra": 11.0,
+    "cortar_silencio": False,
+    "fade_entrada": 0.0,
+    "fade_saida": 0.0,
+    "duracao_maxima": None,
+}
+# Evita que o ffmpeg abra uma janela de console na versão compilada com --noconsole
+_FLAGS_SUBPROCESSO = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+logger = logging.getLogger("sinal.media")
+
+
+def localizar_ffmpeg(diretorio_preferido=None):
+    if diretorio_preferido:
+        for nome in ("ffmpeg.exe", "ffmpeg"):
+            candidato = os.path.join(diretorio_preferido, nome)
+            if os.path.isfile(candidato):
+                return candidato
+    return shutil.which("ffmpeg")
+
+
+def normalizar_parametros(parametros=None):
+    resultado = dict(PARAMETROS_PADRAO)
+    resultado.update({chave: valor for chave, valor in (parametros or {}).items() if chave in PARAMETROS_PADRAO})
+    return resultado
+
+
+def parametros_da_configuracao(logic):
+    """Lê da tabela ``configuracoes`` os parâmetros de normalização escolhidos pelo usuário."""
+    parametros = {"alvo_lufs": float(logic.get_config("normalizar_alvo_lufs", "-16"))}
+    for chave in ("fade_entrada", "fade_saida", "duracao_maxima"):
+        valor = logic.get_config(f"normalizar_{chave}")
+        if valor:
+            parametros[chave] = float(valor)
+    parametros["cortar_silencio"] = logic.get_config("normalizar_cortar_silencio") == "1"
+    return parametros
+
+
+def chave_variante(hash_origem, parametros):
+    conteudo = json.dumps({"hash": hash_origem, "parametros": parametros}, sort_keys=True)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()[:32]
+
+
+def _extrair_json_loudnorm(saida):
+    inicio = saida.rfind("{")
+    fim = saida.rfind("}")
+    if inicio == -1 or fim < inicio:
+        raise RuntimeError("O ffmpeg não retornou a análise de loudness.")
+    return json.loads(saida[inicio:fim + 1])
+
+
+class VariantCache:
+    """Cache em disco de versões normalizadas (EBU R128) dos arquivos de áudio.
+
+    A análise e a renderização são feitas pelo ffmpeg (filtro ``loudnorm`` em
+    duas passagens) fora do momento de tocar. Cada variante é identificada pelo
+    hash do arquivo original e pelos parâmetros de processamento, de modo que
+    alterar a música ou os parâmetros gera uma nova variante automaticamente.
+
+    Criar o cache não abre o banco: a tabela é criada na primeira conexão,
+    feita pela thread que processa as músicas, nunca pela interface.
+    """
+
+    def __init__(self, raiz, arquivo_dados, ffmpeg=None):
+        self.raiz = os.path.abspath(raiz)
+        self.arquivo_dados = arquivo_dados
+        self.ffmpeg = ffmpeg
+        self._tabela_criada = False
+
+    def disponivel(self):
+        return bool(self.ffmpeg)
+
+    def _conectar(self):
+        conn = sqlite3.connect(self.arquivo_dados, timeout=30)
+        if not self._tabela_criada:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {TABELA_VARIANTES} ("
+                "chave TEXT PRIMARY KEY, origem TEXT, hash_origem TEXT, parametros TEXT, "
+                "caminho TEXT, loudness_original REAL, criado_em REAL)"
+            )
+            conn.commit()
+            self._tabela_criada = True
+        return conn
+
+    def caminho_variante(self, chave):
+        return os.path.join(self.raiz, chave[:2], f"{chave}.mp3")
+
+    def carregar_variantes(self, midias, parametros):
+        """Retorna {caminho_original: caminho_variante} das variantes prontas para as mídias atuais."""
+        parametros = normalizar_parametros(parametros)
+        conn = self._conectar()
+        try:
+            registradas = {
+                chave: caminho
+                for chave, caminho in conn.execute(f"SELECT chave, caminho FROM {TABELA_VARIANTES}")
+            }
+        finally:
+            conn.close()
+
+        variantes = {}
+        for origem, info in midias.items():
+            if not info.get("acessivel") or not info.get("hash"):
+                continue
+            caminho = registradas.get(chave_variante(info["hash"], parametros))
+            if caminho and os.path.exists(caminho):
+                variantes[origem] = caminho
+        return variantes
+
+    def _executar_ffmpeg(self, argumentos):
+        processo = subprocess.run(
+            [self.ffmpeg, "-hide_banner", "-nostdin", *argumentos],
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            creationflags=_FLAGS_SUBPROCESSO,
+        )
+        if processo.returncode != 0:
+            raise RuntimeError(processo.stderr.strip().splitlines()[-1] if processo.stderr.strip() else "ffmpeg falhou")
+        return processo.stderr
+
+    def _filtros_preparo(self, parametros):
+        filtros = []
+        if parametros["cortar_silencio"]:
+            filtros.append("silenceremove=start_periods=1:start_threshold=-50dB")
+        if parametros["duracao_maxima"]:
+            filtros.append(f"atrim=0:{float(parametros['duracao_maxima'])}")
+        return filtros
+
+    def _filtros_fade(self, parametros):
+        # Aplicados depois do corte de silêncio e da duração máxima, sobre o áudio que vai tocar
+        filtros = ["aresample=44100"]
+        if parametros["fade_entrada"]:
+            filtros.append(f"afade=t=in:d={float(parametros['fade_entrada'])}")
+        if parametros["fade_saida"]:
+            # O fim só é conhecido depois do corte: o fade de saída é um fade de entrada no áudio invertido
+            # (o trecho fica em memória enquanto é invertido, pouco para sinais de alguns minutos)
+            filtros += ["areverse", f"afade=t=in:d={float(parametros['fade_saida'])}", "areverse"]
+        return filtros
+
+    def medir_loudness(self, caminho, parametros):
+        loudnorm = (
+            f"loudnorm=I={parametros['alvo_lufs']}:TP={parametros['pico_maximo']}:"
+            f"LRA={parametros['faixa_lra']}:print_format=json"
+        )
+        filtros = self._filtros_preparo(parametros) + [loudnorm]
+        saida = self._executar_ffmpeg(["-nostats", "-i", caminho, "-af", ",".join(filtros), "-f", "null", "-"])
+        return _extrair_json_loudnorm(saida)
+
+    def renderizar(self, caminho, hash_origem, parametros):
+        parametros = normalizar_parametros(parametros)
+        chave = chave_variante(hash_origem, parametros)
+        destino = self.caminho_variante(chave)
+        medicao = self.medir_loudness(caminho, parametros)
+
+        loudnorm = (
+            f"loudnorm=I={parametros['alvo_lufs']}:TP={parametros['pico_maximo']}:LRA={parametros['faixa_lra']}:"
+            f"measured_I={medicao['input_i']}:measured_TP={medicao['input_tp']}:"
+            f"measured_LRA={medicao['input_lra']}:measured_thresh={medicao['input_thresh']}:"
+            f"offset={medicao['target_offset']}:linear=true"
+        )
+        filtros = self._filtros_preparo(parametros) + [loudnorm] + self._filtros_fade(parametros)
+
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=os.path.dirname(destino), suffix=".mp3")
+        os.close(fd)
+        try:
+            self._executar_ffmpeg(
+                ["-y", "-i", caminho, "-vn", "-af", ",".join(filtros), "-ar", "44100",
+                 "-c:a", "libmp3lame", "-q:a", "2", temporario]
+            )
+            os.replace(temporario, destino)
+        except Exception:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+        conn = self._conectar()
+        try:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {TABELA_VARIANTES} "
+                "(chave, origem, hash_origem, parametros, caminho, loudness_original, criado_em) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    chave,
+                    caminho,
+                    hash_origem,
+                    json.dumps(parametros, sort_keys=True),
+                    destino,
+                    float(medicao["input_i"]),
+                    time.time(),
+                ),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return destino
+
+    def processar(self, midias, parametros=None, cancel_callback=None):
+        """Gera as variantes que ainda não existem e remove as obsoletas.
+
+        ``midias`` é o dicionário produzido por ``MediaIndex.carregar_todos``.
+        """
+        if not self.disponivel():
+            raise RuntimeError("ffmpeg não encontrado. Coloque ffmpeg.exe ao lado do programa ou no PATH.")
+        parametros = normalizar_parametros(parametros)
+        prontas = self.carregar_variantes(midias, parametros)
+        resumo = {"renderizadas": 0, "prontas": len(prontas), "falhas": 0}
+        for origem, info in sorted(midias.items()):
+            if cancel_callback and cancel_callback():
+                break
+            if origem in prontas or not info.get("acessivel") or not info.get("hash"):
+                continue
+            try:
+                self.renderizar(origem, info["hash"], parametros)
+                resumo["renderizadas"] += 1
+            except (OSError, RuntimeError, ValueError, KeyError) as exc:
+                resumo["falhas"] += 1
+                logger.error("Erro ao normalizar '%s': %s", origem, exc)
+        validas = {chave_variante(info["hash"], parametros) for info in midias.values() if info.get("hash")}
+        resumo["removidas"] = self.remover_obsoletas(validas)
+        return resumo
+
+    def remover_obsoletas(self, chaves_validas):
+        conn = self._conectar()
+        try:
+            registradas = conn.execute(f"SELECT chave, caminho FROM {TABELA_VARIANTES}").fetchall()
+            obsoletas = [(chave, caminho) for chave, caminho in registradas if chave not in chaves_validas]
+            for _, caminho in obsoletas:
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    pass
+            conn.executemany(f"DELETE FROM {TABELA_VARIANTES} WHERE chave=?", [(chave,) for chave, _ in obsoletas])
+            conn.commit()
+        finally:
+            conn.close()
+        return len(obsoletas)
@@ -0,0 +1,338 @@
+import logging
+import os
+import random
+import statistics
+import struct
+import tempfile
+import time
+import wave
+
+from PyQt5.QtCore import QIODevice, QObject, Qt, QTimer, QUrl, pyqtSignal
+from PyQt5.QtMultimedia import QAudio, QAudioDeviceInfo, QAudioFormat, QAudioOutput, QMediaContent, QMediaPlayer
+
+
+TAXA_AMOSTRAGEM = 44100
+CHAVE_LATENCIA = "latencia_audio:"
+
+logger = logging.getLogger("sinal.player")
+
+
+def nome_dispositivo_saida():
+    """Nome do dispositivo de saída padrão, usado como chave da calibração."""
+    return QAudioDeviceInfo.defaultOutputDevice().deviceName() or "padrão"
+
+
+class _RuidoInaudivel(QIODevice):
+    """Fonte infinita de áudio com ruído de ±1 LSB (-90 dBFS).
+
+    Alguns alto-falantes USB/Bluetooth detectam silêncio digital absoluto e
+    entram em repouso mesmo com o fluxo aberto; um ruído nesse nível é inaudível.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        amostras = [random.choice((-1, 0, 1)) for _ in range(TAXA_AMOSTRAGEM // 10)]
+        self._bloco = struct.pack(f"<{len(amostras)}h", *amostras)
+        self._posicao = 0
+
+    def readData(self, tamanho):
+        partes = []
+        restante = tamanho
+        while restante > 0:
+            parte = self._bloco[self._posicao:self._posicao + restante]
+            partes.append(parte)
+            restante -= len(parte)
+            self._posicao = (self._posicao + len(parte)) % len(self._bloco)
+        return b"".join(partes)
+
+    def writeData(self, dados):
+        return 0
+
+    def bytesAvailable(self):
+        return len(self._bloco) + super().bytesAvailable()
+
+    def isSequential(self):
+        return True
+
+
+class AudioKeepAlive(QObject):
+    """Mantém o dispositivo de saída aberto com um fluxo inaudível enquanto ativo."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._saida = None
+        self._fonte = None
+
+    def ativo(self):
+        return self._saida is not None and self._saida.state() == QAudio.ActiveState
+
+    def iniciar(self):
+        if self.ativo():
+            return
+        self.parar()
+        formato = QAudioFormat()
+        formato.setSampleRate(TAXA_AMOSTRAGEM)
+        formato.setChannelCount(1)
+        formato.setSampleSize(16)
+        formato.setCodec("audio/pcm")
+        formato.setByteOrder(QAudioFormat.LittleEndian)
+        formato.setSampleType(QAudioFormat.SignedInt)
+        dispositivo = QAudioDeviceInfo.defaultOutputDevice()
+        if dispositivo.isNull() or not dispositivo.isFormatSupported(formato):
+            logger.warning("Manter áudio ativo: formato não suportado pelo dispositivo de saída")
+            return
+        self._fonte = _RuidoInaudivel(self)
+        self._fonte.open(QIODevice.ReadOnly)
+        self._saida = QAudioOutput(dispositivo, formato, self)
+        self._saida.start(self._fonte)
+        if self._saida.error() != QAudio.NoError:
+            logger.warning("Manter áudio ativo: não foi possível abrir a saída (erro %s)", self._saida.error())
+            self.parar()
+
+    def parar(self):
+        if self._saida is not None:
+            self._saida.stop()
+            self._saida.deleteLater()
+            self._saida = None
+        if self._fonte is not None:
+            self._fonte.close()
+            self._fonte.deleteLater()
+            self._fonte = None
+
+
+def _criar_clipe_calibracao(pasta):
+    # Meio segundo de um tom baixo: o backend precisa de áudio real para avançar a posição
+    caminho = os.path.join(pasta, "calibracao.wav")
+    amostras = bytearray()
+    for indice in range(TAXA_AMOSTRAGEM // 2):
+        amostras += struct.pack("<h", 300 if (indice // 50) % 2 else -300)
+    with wave.open(caminho, "wb") as arquivo:
+        arquivo.setnchannels(1)
+        arquivo.setsampwidth(2)
+        arquivo.setframerate(TAXA_AMOSTRAGEM)
+        arquivo.writeframes(bytes(amostras))
+    return caminho
+
+
+class LatencyCalibrator(QObject):
+    """Mede a latência de início de reprodução no dispositivo de saída atual.
+
+    Para cada rodada, mede o tempo entre ``play()`` e a primeira posição
+    informada pelo ``QMediaPlayer``, descontando a própria posição. O resultado
+    é a mediana das rodadas, em milissegundos.
+    """
+
+    calibracao_concluida = pyqtSignal(str, float)
+    calibracao_falhou = pyqtSignal(str)
+
+    def __init__(self, rodadas=5, parent=None):
+        super().__init__(parent)
+        self.rodadas = rodadas
+        self.medicoes = []
+        self.dispositivo = nome_dispositivo_saida()
+        self._pasta = tempfile.mkdtemp(prefix="sinal_calibracao_")
+        self._clipe = QMediaContent(QUrl.fromLocalFile(_criar_clipe_calibracao(self._pasta)))
+        self._player = QMediaPlayer(self)
+        self._player.setNotifyInterval(5)
+        self._player.positionChanged.connect(self._on_posicao)
+        self._player.error.connect(self._on_erro)
+        self._inicio = None
+        self._limite = QTimer(self)
+        self._limite.setSingleShot(True)
+        self._limite.timeout.connect(lambda: self._falhar("O áudio não começou a tocar em 5 segundos."))
+
+    def iniciar(self):
+        self._proxima_rodada()
+
+    def _proxima_rodada(self):
+        if len(self.medicoes) >= self.rodadas:
+            self._encerrar()
+            self.calibracao_concluida.emit(self.dispositivo, statistics.median(self.medicoes))
+            return
+        self._player.stop()
+        self._player.setMedia(self._clipe)
+        self._inicio = time.perf_counter()
+        self._player.play()
+        self._limite.start(5000)
+
+    def _on_posicao(self, posicao):
+        if self._inicio is None or posicao <= 0:
+            return
+        decorrido = (time.perf_counter() - self._inicio) * 1000
+        self._inicio = None
+        self._limite.stop()
+        self.medicoes.append(max(decorrido - posicao, 0.0))
+        self._player.stop()
+        QTimer.singleShot(300, self._proxima_rodada)
+
+    def _on_erro(self, *_):
+        self._falhar(self._player.errorString() or "Erro ao reproduzir o áudio de calibração.")
+
+    def _falhar(self, mensagem):
+        self._encerrar()
+        self.calibracao_falhou.emit(mensagem)
+
+    def _encerrar(self):
+        self._inicio = None
+        self._limite.stop()
+        self._player.stop()
+        self._player.setMedia(QMediaContent())
+        try:
+            os.remove(os.path.join(self._pasta, "calibracao.wav"))
+            os.rmdir(self._pasta)
+        except OSError:
+            pass
+
+
+class SequencePlayer(QObject):
+    """Toca uma sequência de clipes sem intervalo entre eles.
+
+    Dois ``QMediaPlayer`` se alternam: enquanto um toca, o próximo clipe já foi
+    carregado e pausado no outro, então a troca é apenas um ``play()``. Com
+    ``crossfade_ms`` o próximo clipe começa antes do fim do atual e os volumes
+    são cruzados; ``duracao_maxima_ms`` interrompe a sequência inteira.
+    """
+
+    stateChanged = pyqtSignal(int)
+    falhou = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._players = [QMediaPlayer(self), QMediaPlayer(self)]
+        for player in self._players:
+            player.setNotifyInterval(50)
+            player.positionChanged.connect(lambda posicao, p=player: self._on_posicao(p, posicao))
+            player.mediaStatusChanged.connect(lambda status, p=player: self._on_status(p, status))
+        self._clipes = []
+        self._indice = 0
+        self._atual = 0
+        self._crossfade_ms = 0
+        self._proximo_pronto = False
+        self._saindo = None
+        self._inicio_fade = 0.0
+        self._estado = QMediaPlayer.StoppedState
+        self._fade = QTimer(self)
+        self._fade.setInterval(20)
+        self._fade.timeout.connect(self._passo_fade)
+        self._limite = QTimer(self)
+        self._limite.setSingleShot(True)
+        self._limite.setTimerType(Qt.PreciseTimer)
+        self._limite.timeout.connect(self.stop)
+
+    def state(self):
+        return self._estado
+
+    def tocar(self, clipes, crossfade_ms=0, duracao_maxima_ms=0):
+        self._interromper()
+        self._clipes = list(clipes)
+        if not self._clipes:
+            self._definir_estado(QMediaPlayer.StoppedState)
+            return
+        self._indice = 0
+        self._atual = 0
+        self._crossfade_ms = crossfade_ms
+        primeiro = self._players[0]
+        primeiro.setVolume(100)
+        primeiro.setMedia(QMediaContent(QUrl.fromLocalFile(self._clipes[0])))
+        primeiro.play()
+        self._preparar_proximo()
+        if duracao_maxima_ms > 0:
+            self._limite.start(duracao_maxima_ms)
+        self._definir_estado(QMediaPlayer.PlayingState)
+
+    def stop(self):
+        self._interromper()
+        self._definir_estado(QMediaPlayer.StoppedState)
+
+    def _interromper(self):
+        self._fade.stop()
+        self._limite.stop()
+        self._saindo = None
+        self._proximo_pronto = False
+        for player in self._players:
+            player.stop()
+
+    def _definir_estado(self, estado):
+        if estado != self._estado:
+            self._estado = estado
+            self.stateChanged.emit(estado)
+
+    def _preparar_proximo(self):
+        # Pausar logo após carregar faz o backend decodificar o início do clipe sem tocá-lo
+        if self._indice + 1 >= len(self._clipes):
+            self._proximo_pronto = False
+            return
+        proximo = self._players[1 - self._atual]
+        proximo.setVolume(0 if self._crossfade_ms else 100)
+        proximo.setMedia(QMediaContent(QUrl.fromLocalFile(self._clipes[self._indice + 1])))
+        proximo.pause()
+        self._proximo_pronto = True
+
+    def _avancar(self):
+        anterior = self._players[self._atual]
+        self._atual = 1 - self._atual
+        self._indice += 1
+        self._proximo_pronto = False
+        self._players[self._atual].play()
+        if self._crossfade_ms and anterior.state() == QMediaPlayer.PlayingState:
+            self._saindo = anterior
+            self._inicio_fade = time.perf_counter()
+            self._fade.start()
+        else:
+            anterior.stop()
+            self._players[self._atual].setVolume(100)
+            self._preparar_proximo()
+
+    def _passo_fade(self):
+        fracao = min((time.perf_counter() - self._inicio_fade) * 1000 / self._crossfade_ms, 1.0)
+        self._players[self._atual].setVolume(int(100 * fracao))
+        if self._saindo is not None:
+            self._saindo.setVolume(int(100 * (1 - fracao)))
+        if fracao >= 1.0:
+            self._concluir_fade()
+
+    def _concluir_fade(self):
+        self._fade.stop()
+        if self._saindo is not None:
+            self._saindo.stop()
+            self._saindo = None
+        self._players[self._atual].setVolume(100)
+        # O player que saiu fica livre para pré-carregar o clipe seguinte
+        self._preparar_proximo()
+
+    def _on_posicao(self, player, posicao):
+        if player is not self._players[self._atual] or not self._crossfade_ms or not self._proximo_pronto:
+            return
+        duracao = player.duration()
+        if duracao > 0 and posicao >= duracao - self._crossfade_ms:
+            self._avancar()
+
+    def _on_status(self, player, status):
+        if status not in (QMediaPlayer.EndOfMedia, QMediaPlayer.InvalidMedia):
+            return
+        if player is self._saindo:
+            self._concluir_fade()
+            return
+        if player is not self._players[self._atual]:
+            if status == QMediaPlayer.InvalidMedia and self._proximo_pronto:
+                # O clipe pré-carregado não abre e o play() não geraria outro status quando
+                # a sequência chegasse nele: sai da sequência agora e o seguinte é carregado
+                self._falhar_clipe(self._indice + 1)
+                del self._clipes[self._indice + 1]
+                self._preparar_proximo()
+            return
+        if self._estado != QMediaPlayer.PlayingState:
+            return
+        if status == QMediaPlayer.InvalidMedia:
+            self._falhar_clipe(self._indice)
+        if self._fade.isActive():
+            # Clipe mais curto que o crossfade: encerra a transição anterior antes de seguir
+            self._concluir_fade()
+        if self._proximo_pronto:
+            self._avancar()
+        else:
+            self.stop()
+
+    def _falhar_clipe(self, indice):
+        logger.error("Clipe inválido na sequência: %s", self._clipes[indice])
+        self.falhou.emit(self._clipes[indice])
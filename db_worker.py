@@ -0,0 +1,96 @@
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+from app_logic import MusicAppLogic
+
+
+class _Requisicao:
+    __slots__ = ("funcao", "args", "kwargs", "chave", "future")
+
+    def __init__(self, funcao, args, kwargs, chave):
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        self.chave = chave
+        self.future = Future()
+
+
+class DatabaseWorker:
+    """Executa as chamadas ao banco em uma única thread dedicada.
+
+    ``submeter`` devolve imediatamente um ``concurrent.futures.Future``. Pedidos
+    com a mesma ``chave`` ainda na fila são substituídos pelo mais recente (o
+    anterior é cancelado), de modo que cliques rápidos geram apenas a última
+    consulta. As requisições são processadas na ordem de chegada.
+
+    ``fabrica`` cria, já na thread do worker, o objeto que recebe as chamadas
+    (por padrão o ``MusicAppLogic`` do banco da programação).
+    """
+
+    def __init__(self, arquivo_dados, fabrica=MusicAppLogic, nome="SinalDatabaseWorker"):
+        self.arquivo_dados = arquivo_dados
+        self.fabrica = fabrica
+        self.logic = None
+        self._fila = deque()
+        self._pendentes = {}
+        self._condicao = threading.Condition()
+        self._ativo = True
+        self._thread = threading.Thread(target=self._executar, name=nome, daemon=True)
+        self._thread.start()
+
+    def submeter(self, funcao, *args, chave=None, **kwargs):
+        """Agenda ``funcao`` (nome de um método do objeto da ``fabrica`` ou callable que o recebe)."""
+        requisicao = _Requisicao(funcao, args, kwargs, chave)
+        with self._condicao:
+            if not self._ativo:
+                requisicao.future.set_exception(RuntimeError("O acesso ao banco de dados foi encerrado."))
+                return requisicao.future
+            if chave is not None:
+                anterior = self._pendentes.get(chave)
+                if anterior is not None:
+                    anterior.future.cancel()
+                    self._fila.remove(anterior)
+                self._pendentes[chave] = requisicao
+            self._fila.append(requisicao)
+            self._condicao.notify()
+        return requisicao.future
+
+    def pendentes(self):
+        with self._condicao:
+            return len(self._fila)
+
+    def parar(self, timeout=None):
+        with self._condicao:
+            self._ativo = False
+            for requisicao in self._fila:
+                requisicao.future.cancel()
+            self._fila.clear()
+            self._pendentes.clear()
+            self._condicao.notify()
+        self._thread.join(timeout)
+
+    def _executar(self):
+        # A thread é a dona do objeto: nenhuma outra thread da interface usa esta instância
+        self.logic = self.fabrica(self.arquivo_dados)
+        while True:
+            with self._condicao:
+                while self._ativo and not self._fila:
+                    self._condicao.wait()
+                if not self._ativo:
+                    return
+                requisicao = self._fila.popleft()
+                if requisicao.chave is not None and self._pendentes.get(requisicao.chave) is requisicao:
+                    del self._pendentes[requisicao.chave]
+
+            if not requisicao.future.set_running_or_notify_cancel():
+                continue
+            try:
+                if isinstance(requisicao.funcao, str):
+                    resultado = getattr(self.logic, requisicao.funcao)(*requisicao.args, **requisicao.kwargs)
+                else:
+                    resultado = requisicao.funcao(self.logic, *requisicao.args, **requisicao.kwargs)
+            except BaseException as exc:
+                requisicao.future.set_exception(exc)
+            else:
+                requisicao.future.set_result(resultado)
@@ -0,0 +1,294 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+
+TABELA_MIDIAS = "midias"
+TAMANHO_BLOCO_HASH = 1024 * 1024
+
+# Tabelas de bitrate (kbps) do MPEG Layer III indexadas pelo campo de 4 bits do cabeçalho.
+_BITRATES_MPEG1_L3 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0)
+_BITRATES_MPEG2_L3 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0)
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG 1
+    2: (22050, 24000, 16000),  # MPEG 2
+    0: (11025, 12000, 8000),   # MPEG 2.5
+}
+
+
+def calcular_hash(caminho, progresso=None):
+    """SHA-256 do conteúdo; ``progresso(bytes)`` é chamado a cada bloco lido."""
+    digest = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        while True:
+            bloco = arquivo.read(TAMANHO_BLOCO_HASH)
+            if not bloco:
+                break
+            digest.update(bloco)
+            if progresso is not None:
+                progresso(len(bloco))
+    return digest.hexdigest()
+
+
+def aquecer_arquivos(caminhos, cancel_callback=None):
+    """Lê os arquivos por inteiro para que já estejam no cache do sistema na hora de tocar.
+
+    Retorna quantos arquivos puderam ser lidos.
+    """
+    lidos = 0
+    for caminho in caminhos:
+        if cancel_callback and cancel_callback():
+            break
+        try:
+            with open(caminho, "rb") as arquivo:
+                while arquivo.read(TAMANHO_BLOCO_HASH):
+                    pass
+            lidos += 1
+        except OSError:
+            pass
+    return lidos
+
+
+def _inicio_audio(arquivo):
+    cabecalho = arquivo.read(10)
+    if len(cabecalho) == 10 and cabecalho[:3] == b"ID3":
+        tamanho = (
+            (cabecalho[6] & 0x7F) << 21
+            | (cabecalho[7] & 0x7F) << 14
+            | (cabecalho[8] & 0x7F) << 7
+            | (cabecalho[9] & 0x7F)
+        )
+        rodape = 10 if cabecalho[5] & 0x10 else 0
+        return 10 + tamanho + rodape
+    return 0
+
+
+def _ler_cabecalho_frame(dados, posicao):
+    if posicao + 4 > len(dados):
+        return None
+    b1, b2, b3 = dados[posicao + 1], dados[posicao + 2], dados[posicao + 3]
+    if dados[posicao] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    versao = (b1 >> 3) & 0x03
+    camada = (b1 >> 1) & 0x03
+    indice_bitrate = (b2 >> 4) & 0x0F
+    indice_sample_rate = (b2 >> 2) & 0x03
+    if versao == 1 or camada != 1 or indice_bitrate in (0, 15) or indice_sample_rate == 3:
+        return None
+    mpeg1 = versao == 3
+    bitrate = (_BITRATES_MPEG1_L3 if mpeg1 else _BITRATES_MPEG2_L3)[indice_bitrate] * 1000
+    sample_rate = _SAMPLE_RATES[versao][indice_sample_rate]
+    return {
+        "mpeg1": mpeg1,
+        "bitrate": bitrate,
+        "sample_rate": sample_rate,
+        "amostras_por_frame": 1152 if mpeg1 else 576,
+        "mono": (b3 >> 6) & 0x03 == 3,
+    }
+
+
+def estimar_duracao_mp3(caminho):
+    """Calcula a duração em segundos lendo apenas os cabeçalhos do MP3.
+
+    Usa o cabeçalho Xing/Info ou VBRI quando existe e, caso contrário, estima pela
+    taxa de bits do primeiro frame (arquivos CBR). Retorna None se o arquivo não
+    parecer um MP3 válido.
+    """
+    tamanho_arquivo = os.path.getsize(caminho)
+    with open(caminho, "rb") as arquivo:
+        inicio = _inicio_audio(arquivo)
+        arquivo.seek(inicio)
+        dados = arquivo.read(64 * 1024)
+        arquivo.seek(max(tamanho_arquivo - 128, 0))
+        possui_id3v1 = arquivo.read(3) == b"TAG"
+
+    for posicao in range(len(dados) - 3):
+        frame = _ler_cabecalho_frame(dados, posicao)
+        if frame:
+            break
+    else:
+        return None
+
+    if frame["mpeg1"]:
+        deslocamento_xing = 17 if frame["mono"] else 32
+    else:
+        deslocamento_xing = 9 if frame["mono"] else 17
+    xing = posicao + 4 + deslocamento_xing
+    if dados[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = int.from_bytes(dados[xing + 4:xing + 8], "big")
+        campo_frames = dados[xing + 8:xing + 12]
+        # Arquivo cortado no meio do cabeçalho: sem o total de frames, a duração é desconhecida
+        if len(campo_frames) < 4:
+            return None
+        if flags & 0x01:
+            return int.from_bytes(campo_frames, "big") * frame["amostras_por_frame"] / frame["sample_rate"]
+
+    vbri = posicao + 4 + 32
+    if dados[vbri:vbri + 4] == b"VBRI":
+        campo_frames = dados[vbri + 14:vbri + 18]
+        if len(campo_frames) < 4:
+            return None
+        return int.from_bytes(campo_frames, "big") * frame["amostras_por_frame"] / frame["sample_rate"]
+
+    bytes_audio = tamanho_arquivo - inicio - posicao - (128 if possui_id3v1 else 0)
+    return max(bytes_audio, 0) * 8 / frame["bitrate"]
+
+
+def formatar_duracao(segundos):
+    if segundos is None:
+        return ""
+    total = int(round(segundos))
+    return f"{total // 60}:{total % 60:02d}"
+
+
+class MediaIndex:
+    """Índice dos arquivos de áudio referenciados pela programação.
+
+    Guarda tamanho, data de modificação, duração, hash do conteúdo e se o arquivo
+    está acessível em uma tabela auxiliar no mesmo banco da programação. Pode ser
+    usado fora da thread da interface, pois cada chamada abre a própria conexão.
+    """
+
+    def __init__(self, arquivo_dados):
+        self.arquivo_dados = arquivo_dados
+        self.criar_tabela()
+
+    def _conectar(self):
+        return sqlite3.connect(self.arquivo_dados, timeout=30)
+
+    def criar_tabela(self):
+        conn = self._conectar()
+        try:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {TABELA_MIDIAS} ("
+                "caminho TEXT PRIMARY KEY, tamanho INTEGER, mtime REAL, duracao REAL, "
+                "hash TEXT, acessivel INTEGER NOT NULL DEFAULT 0, verificado_em REAL)"
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def carregar_todos(self):
+        conn = self._conectar()
+        try:
+            linhas = conn.execute(
+                f"SELECT caminho, tamanho, mtime, duracao, hash, acessivel, verificado_em FROM {TABELA_MIDIAS}"
+            ).fetchall()
+        finally:
+            conn.close()
+        return {linha[0]: self._linha_para_info(linha) for linha in linhas}
+
+    def info(self, caminho):
+        conn = self._conectar()
+        try:
+            linha = conn.execute(
+                f"SELECT caminho, tamanho, mtime, duracao, hash, acessivel, verificado_em FROM {TABELA_MIDIAS} WHERE caminho=?",
+                (caminho,),
+            ).fetchone()
+        finally:
+            conn.close()
+        return self._linha_para_info(linha) if linha else None
+
+    @staticmethod
+    def _linha_para_info(linha):
+        return {
+            "caminho": linha[0],
+            "tamanho": linha[1],
+            "mtime": linha[2],
+            "duracao": linha[3],
+            "hash": linha[4],
+            "acessivel": bool(linha[5]),
+            "verificado_em": linha[6],
+        }
+
+    def atualizar(self, caminhos, cancel_callback=None):
+        """Reindexa os caminhos informados de forma incremental.
+
+        Arquivos cujo tamanho e mtime não mudaram desde a última verificação não
+        são relidos. Retorna um resumo com a quantidade de arquivos analisados,
+        ignorados e inacessíveis.
+        """
+        existentes = self.carregar_todos()
+        resumo = {"analisados": 0, "inalterados": 0, "inacessiveis": 0}
+        agora = time.time()
+        conn = self._conectar()
+        try:
+            for caminho in sorted(set(caminhos)):
+                if cancel_callback and cancel_callback():
+                    break
+                anterior = existentes.get(caminho)
+                try:
+                    estado = os.stat(caminho)
+                except OSError:
+                    resumo["inacessiveis"] += 1
+                    self._gravar(conn, caminho, anterior, acessivel=False, verificado_em=agora)
+                    continue
+
+                if (
+                    anterior
+                    and anterior["acessivel"]
+                    and anterior["tamanho"] == estado.st_size
+                    and anterior["mtime"] == estado.st_mtime
+                ):
+                    resumo["inalterados"] += 1
+                    continue
+
+                try:
+                    hash_conteudo = calcular_hash(caminho)
+                    try:
+                        duracao = estimar_duracao_mp3(caminho)
+                    except (OSError, ValueError, IndexError):
+                        duracao = None
+                except OSError:
+                    resumo["inacessiveis"] += 1
+                    self._gravar(conn, caminho, anterior, acessivel=False, verificado_em=agora)
+                    continue
+
+                resumo["analisados"] += 1
+                self._gravar(
+                    conn,
+                    caminho,
+                    {
+                        "tamanho": estado.st_size,
+                        "mtime": estado.st_mtime,
+                        "duracao": duracao,
+                        "hash": hash_conteudo,
+                    },
+                    acessivel=True,
+                    verificado_em=agora,
+                )
+                conn.commit()
+            conn.commit()
+        finally:
+            conn.close()
+        return resumo
+
+    @staticmethod
+    def _gravar(conn, caminho, dados, acessivel, verificado_em):
+        dados = dados or {}
+        conn.execute(
+            f"INSERT OR REPLACE INTO {TABELA_MIDIAS} "
+            "(caminho, tamanho, mtime, duracao, hash, acessivel, verificado_em) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                caminho,
+                dados.get("tamanho"),
+                dados.get("mtime"),
+                dados.get("duracao"),
+                dados.get("hash"),
+                1 if acessivel else 0,
+                verificado_em,
+            ),
+        )
+
+    def remover_nao_referenciados(self, caminhos):
+        referenciados = set(caminhos)
+        conn = self._conectar()
+        try:
+            registrados = [linha[0] for linha in conn.execute(f"SELECT caminho FROM {TABELA_MIDIAS}")]
+            obsoletos = [(caminho,) for caminho in registrados if caminho not in referenciados]
+            conn.executemany(f"DELETE FROM {TABELA_MIDIAS} WHERE caminho=?", obsoletos)
+            conn.commit()
+        finally:
+            conn.close()
+        return len(obsoletos)
@@ -0,0 +1,144 @@
+import os
+import tempfile
+import threading
+import time
+
+from media_index import TAMANHO_BLOCO_HASH, calcular_hash
+
+
+PASTA_BIBLIOTECA = "Biblioteca"
+
+
+class MediaLibrary:
+    """Biblioteca de áudio gerenciada pelo aplicativo e endereçada por conteúdo.
+
+    Cada arquivo importado é copiado uma única vez para
+    ``<raiz>/<hash[:2]>/<hash><extensão>``. Arquivos idênticos vindos de pastas
+    diferentes passam a apontar para a mesma cópia local.
+    """
+
+    def __init__(self, raiz):
+        self.raiz = os.path.abspath(raiz)
+        # Momento da última importação de cada cópia nesta sessão: a limpeza roda
+        # em outra thread e não deve apagar um arquivo que acabou de ser entregue
+        self._importados = {}
+        self._trava = threading.Lock()
+
+    def caminho_para_hash(self, hash_conteudo, extensao=".mp3"):
+        return os.path.join(self.raiz, hash_conteudo[:2], f"{hash_conteudo}{extensao.lower()}")
+
+    def pertence(self, caminho):
+        try:
+            return os.path.commonpath([self.raiz, os.path.abspath(caminho)]) == self.raiz
+        except ValueError:
+            # Caminhos em unidades diferentes no Windows
+            return False
+
+    def importar(self, caminho_origem, progresso=None):
+        """Copia o arquivo para a biblioteca (se ainda não estiver lá) e retorna o novo caminho.
+
+        ``progresso(feito, total)`` recebe o andamento em bytes: o arquivo é lido
+        uma vez para o hash e outra para a cópia, então ``total`` é o dobro do tamanho.
+        """
+        if self.pertence(caminho_origem):
+            return os.path.abspath(caminho_origem)
+
+        tamanho = os.path.getsize(caminho_origem)
+        andamento = [0]
+
+        def avancar(quantidade):
+            if progresso is not None:
+                andamento[0] += quantidade
+                progresso(andamento[0], 2 * tamanho)
+
+        hash_conteudo = calcular_hash(caminho_origem, avancar)
+        extensao = os.path.splitext(caminho_origem)[1] or ".mp3"
+        destino = self.caminho_para_hash(hash_conteudo, extensao)
+        if os.path.exists(destino) and os.path.getsize(destino) == tamanho:
+            self._registrar_importacao(destino)
+            return destino
+
+        pasta_destino = os.path.dirname(destino)
+        os.makedirs(pasta_destino, exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=pasta_destino, suffix=".tmp")
+        os.close(fd)
+        try:
+            with open(caminho_origem, "rb") as origem, open(temporario, "wb") as copia:
+                while True:
+                    bloco = origem.read(TAMANHO_BLOCO_HASH)
+                    if not bloco:
+                        break
+                    copia.write(bloco)
+                    avancar(len(bloco))
+            os.replace(temporario, destino)
+        except Exception:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+        self._registrar_importacao(destino)
+        return destino
+
+    def _registrar_importacao(self, destino):
+        # A data de modificação também é renovada para proteger a cópia de uma
+        # limpeza feita depois de reiniciar o aplicativo
+        agora = time.time()
+        try:
+            os.utime(destino, (agora, agora))
+        except OSError:
+            pass
+        with self._trava:
+            self._importados[os.path.normcase(destino)] = agora
+
+    def _importado_depois(self, caminho, limite):
+        with self._trava:
+            importado = self._importados.get(os.path.normcase(caminho))
+        if importado is not None and importado > limite:
+            return True
+        return os.path.getmtime(caminho) > limite
+
+    def importar_referencias(self, logic, cancel_callback=None):
+        """Move para a biblioteca todas as músicas já cadastradas na programação.
+
+        Retorna um resumo com a quantidade de arquivos importados, já presentes e
+        inacessíveis. As linhas da programação passam a apontar para a cópia local
+        em um único lote, desfeito de uma vez (inclusive se a importação for
+        interrompida, para os arquivos já copiados).
+        """
+        resumo = {"importados": 0, "ja_na_biblioteca": 0, "inacessiveis": 0}
+        substituicoes = []
+        for caminho in logic.listar_musicas_referenciadas():
+            if cancel_callback and cancel_callback():
+                break
+            if self.pertence(caminho):
+                resumo["ja_na_biblioteca"] += 1
+                continue
+            try:
+                destino = self.importar(caminho)
+            except OSError:
+                resumo["inacessiveis"] += 1
+                continue
+            substituicoes.append({"operacao": "substituir_musica", "antiga": caminho, "nova": destino})
+            resumo["importados"] += 1
+        if substituicoes:
+            logic.aplicar_lote(substituicoes, descricao="Mover músicas para a biblioteca")
+        return resumo
+
+    def remover_nao_referenciados(self, caminhos_referenciados, idade_minima=3600):
+        # Arquivos recém-copiados ainda podem estar a caminho de uma linha da programação
+        limite = time.time() - idade_minima
+        referenciados = {os.path.normcase(os.path.abspath(caminho)) for caminho in caminhos_referenciados}
+        removidos = 0
+        if not os.path.isdir(self.raiz):
+            return removidos
+        for pasta, _, arquivos in os.walk(self.raiz):
+            for nome in arquivos:
+                caminho = os.path.join(pasta, nome)
+                if os.path.normcase(caminho) not in referenciados:
+                    try:
+                        if self._importado_depois(caminho, limite):
+                            continue
+                        os.remove(caminho)
+                        removidos += 1
+                    except OSError:
+                        pass
+        return removidos
@@ -0,0 +1,248 @@
+import csv
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from app_logic import DIAS_SEMANA, hora_dos_segundos
+from agendador import instante_do_horario
+
+
+SUFIXO_REPRODUCOES = "_reproducoes.db"
+TABELA_REPRODUCOES = "reproducoes"
+TAMANHO_LOTE = 50
+LIMITE_ATRASO_MS = 1000  # acima disso o sinal conta como atrasado nos relatórios
+
+RESULTADO_TOCADO = "tocado"
+RESULTADO_FALHOU = "falhou"
+RESULTADO_PERDIDO = "perdido"
+
+
+def caminho_reproducoes(arquivo_dados):
+    """Banco do histórico de reprodução, separado do banco da programação e ao lado dele."""
+    return os.path.splitext(os.path.abspath(arquivo_dados))[0] + SUFIXO_REPRODUCOES
+
+
+def intervalo_do_mes(ano, mes):
+    """Datas ``YYYY-MM-DD`` do primeiro e do último dia do mês."""
+    inicio = date(ano, mes, 1)
+    fim = date(ano + mes // 12, mes % 12 + 1, 1) - timedelta(days=1)
+    return inicio.isoformat(), fim.isoformat()
+
+
+class PlaybackHistory:
+    """Registro somente de inclusão dos sinais tocados, perdidos ou com falha.
+
+    Pensado para ser usado por uma única thread (o ``DatabaseWorker`` do
+    histórico). ``registrar`` apenas acumula o evento; as inclusões são gravadas
+    em lote por ``descarregar`` (ao completar ``TAMANHO_LOTE`` eventos, antes de
+    cada consulta e periodicamente pela interface). Os relatórios usam o índice
+    por data, então um ano de dados é consultado em poucos milissegundos.
+    """
+
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        self._pendentes = []
+        self._conn = sqlite3.connect(arquivo)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {TABELA_REPRODUCOES} ("
+                "id INTEGER PRIMARY KEY, data TEXT NOT NULL, dia TEXT NOT NULL, segundos INTEGER NOT NULL, "
+                "momento REAL NOT NULL, nome TEXT, musica TEXT, atraso_ms REAL, resultado TEXT NOT NULL, detalhe TEXT)"
+            )
+            # Índice de cobertura: os relatórios não precisam ler as linhas da tabela
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{TABELA_REPRODUCOES}_data ON {TABELA_REPRODUCOES} "
+                "(data, segundos, resultado, atraso_ms, dia)"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS estado (chave TEXT PRIMARY KEY, valor TEXT)")
+        # Os ids são distribuídos aqui para que ``registrar`` os conheça antes da gravação em lote
+        self._proximo_id = self._conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {TABELA_REPRODUCOES}").fetchone()[0]
+
+    def fechar(self):
+        self.descarregar()
+        self._conn.close()
+
+    def _novo_id(self):
+        id_registro = self._proximo_id
+        self._proximo_id += 1
+        return id_registro
+
+    def registrar(self, data, dia, segundos, momento, nome, musica, atraso_ms, resultado, detalhe=None):
+        """Acumula o evento e retorna o id que ele terá no histórico."""
+        id_registro = self._novo_id()
+        self._pendentes.append((id_registro, data, dia, segundos, momento, nome, musica, atraso_ms, resultado, detalhe))
+        if len(self._pendentes) >= TAMANHO_LOTE:
+            self.descarregar()
+        return id_registro
+
+    def _inserir(self, linhas):
+        self._conn.executemany(
+            f"INSERT INTO {TABELA_REPRODUCOES} "
+            "(id, data, dia, segundos, momento, nome, musica, atraso_ms, resultado, detalhe) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            linhas,
+        )
+
+    def descarregar(self):
+        """Grava os eventos acumulados em uma única transação e retorna quantos foram gravados."""
+        if not self._pendentes:
+            return 0
+        pendentes, self._pendentes = self._pendentes, []
+        with self._conn:
+            self._inserir(pendentes)
+        return len(pendentes)
+
+    def marcar_falha(self, id_registro, detalhe):
+        """Troca para falha o resultado do sinal tocado registrado com ``id_registro``."""
+        self.descarregar()
+        with self._conn:
+            self._conn.execute(
+                f"UPDATE {TABELA_REPRODUCOES} SET resultado=?, detalhe=? WHERE id=? AND resultado=?",
+                (RESULTADO_FALHOU, detalhe, id_registro, RESULTADO_TOCADO),
+            )
+
+    def _estado(self, chave, padrao=None):
+        linha = self._conn.execute("SELECT valor FROM estado WHERE chave=?", (chave,)).fetchone()
+        return linha[0] if linha else padrao
+
+    def registrar_perdidos(self, agenda, ate, dia_local=None):
+        """Registra como perdidos os sinais da ``agenda`` entre a última verificação e ``ate`` sem registro.
+
+        ``agenda`` é ``{dia: [(segundos, hora, nome, musica), ...]}``, a programação
+        atual. Só um dia local é verificado, ``dia_local`` ou, por padrão, o de
+        ``ate``: em dias anteriores a programação podia ser outra, e
+        reconstruí-los com a atual inventaria perdas ou esconderia as
+        verdadeiras. Na virada do dia a interface passa o dia que terminou e a
+        meia-noite como ``ate``. Na primeira execução só marca o início do
+        histórico.
+        """
+        self.descarregar()
+        dia_local = dia_local or date.fromtimestamp(ate)
+        inicio_do_dia = time.mktime((dia_local.year, dia_local.month, dia_local.day, 0, 0, 0, 0, 0, -1))
+        verificado_ate = self._estado("verificado_ate")
+        desde = ate if verificado_ate is None else max(float(verificado_ate), inicio_do_dia)
+        perdidos = []
+        tabela = DIAS_SEMANA[dia_local.weekday()] if dia_local.weekday() < len(DIAS_SEMANA) else None
+        if desde < ate and tabela is not None and agenda.get(tabela):
+            data = dia_local.isoformat()
+            registrados = {
+                segundos
+                for (segundos,) in self._conn.execute(f"SELECT segundos FROM {TABELA_REPRODUCOES} WHERE data=?", (data,))
+            }
+            for segundos, _, nome, musica in agenda[tabela]:
+                instante = instante_do_horario(segundos, inicio_do_dia)
+                if desde <= instante < ate and segundos not in registrados:
+                    perdidos.append(
+                        (self._novo_id(), data, tabela, segundos, instante, nome, musica, None, RESULTADO_PERDIDO, None)
+                    )
+        with self._conn:
+            self._inserir(perdidos)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO estado (chave, valor) VALUES ('verificado_ate', ?)", (repr(max(ate, desde)),)
+            )
+        return len(perdidos)
+
+    def problemas(self, inicio, fim, limite_atraso_ms=LIMITE_ATRASO_MS):
+        """Sinais perdidos, com falha ou atrasados entre as datas ``inicio`` e ``fim`` (inclusive)."""
+        self.descarregar()
+        return self._conn.execute(
+            f"SELECT data, dia, segundos, nome, resultado, atraso_ms, detalhe FROM {TABELA_REPRODUCOES} "
+            "WHERE data BETWEEN ? AND ? AND (resultado != ? OR atraso_ms > ?) ORDER BY data, segundos",
+            (inicio, fim, RESULTADO_TOCADO, limite_atraso_ms),
+        ).fetchall()
+
+    def deriva_por_dia(self, inicio, fim):
+        """{dia: (atraso médio em ms, sinais tocados)} entre as datas ``inicio`` e ``fim``."""
+        self.descarregar()
+        linhas = self._conn.execute(
+            f"SELECT dia, AVG(atraso_ms), COUNT(*) FROM {TABELA_REPRODUCOES} "
+            "WHERE data BETWEEN ? AND ? AND resultado=? GROUP BY dia",
+            (inicio, fim, RESULTADO_TOCADO),
+        ).fetchall()
+        return {dia: (media, quantidade) for dia, media, quantidade in linhas}
+
+    def relatorio(self, inicio, fim):
+        return {
+            "inicio": inicio,
+            "fim": fim,
+            "problemas": self.problemas(inicio, fim),
+            "deriva_por_dia": self.deriva_por_dia(inicio, fim),
+        }
+
+    def exportar_csv(self, caminho, inicio, fim):
+        """Exporta todos os registros do período; retorna a quantidade de linhas."""
+        self.descarregar()
+        cursor = self._conn.execute(
+            f"SELECT data, dia, segundos, momento, nome, musica, atraso_ms, resultado, detalhe "
+            f"FROM {TABELA_REPRODUCOES} WHERE data BETWEEN ? AND ? ORDER BY data, segundos",
+            (inicio, fim),
+        )
+        quantidade = 0
+        # utf-8-sig para o Excel reconhecer os acentos
+        with open(caminho, "w", newline="", encoding="utf-8-sig") as arquivo:
+            escritor = csv.writer(arquivo, delimiter=";")
+            escritor.writerow(["data", "dia", "hora", "momento", "nome", "musica", "atraso_ms", "resultado", "detalhe"])
+            for data, dia, segundos, momento, nome, musica, atraso_ms, resultado, detalhe in cursor:
+                escritor.writerow([
+                    data,
+                    dia,
+                    hora_dos_segundos(segundos),
+                    datetime.fromtimestamp(momento).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+                    nome,
+                    musica,
+                    "" if atraso_ms is None else f"{atraso_ms:.1f}",
+                    resultado,
+                    detalhe or "",
+                ])
+                quantidade += 1
+        return quantidade
+
+
+def medir_relatorios(sinais_por_dia=60):
+    """Gera um ano de histórico sintético e mede o tempo dos relatórios."""
+    import random
+
+    pasta = tempfile.mkdtemp(prefix="sinal_reproducoes_")
+    historico = PlaybackHistory(os.path.join(pasta, "bench" + SUFIXO_REPRODUCOES))
+    hoje = date.today()
+    inicio_geracao = time.perf_counter()
+    dia_local = hoje - timedelta(days=365)
+    while dia_local <= hoje:
+        if dia_local.weekday() < len(DIAS_SEMANA):
+            for indice in range(sinais_por_dia):
+                segundos = 7 * 3600 + indice * 600
+                resultado = RESULTADO_PERDIDO if random.random() < 0.01 else RESULTADO_TOCADO
+                historico.registrar(
+                    dia_local.isoformat(), DIAS_SEMANA[dia_local.weekday()], segundos, time.time(), f"Sinal {indice}",
+                    "/sinal.mp3", None if resultado == RESULTADO_PERDIDO else random.gauss(3, 20), resultado,
+                )
+        dia_local += timedelta(days=1)
+    historico.descarregar()
+    geracao = time.perf_counter() - inicio_geracao
+    total = historico._conn.execute(f"SELECT COUNT(*) FROM {TABELA_REPRODUCOES}").fetchone()[0]
+
+    resultados = {"linhas": total, "geracao_s": geracao}
+    mes_inicio, mes_fim = intervalo_do_mes(hoje.year, hoje.month)
+    ano_inicio = (hoje - timedelta(days=365)).isoformat()
+    for nome, funcao in (
+        ("problemas do mês", lambda: historico.problemas(mes_inicio, mes_fim)),
+        ("deriva por dia (mês)", lambda: historico.deriva_por_dia(mes_inicio, mes_fim)),
+        ("problemas do ano", lambda: historico.problemas(ano_inicio, hoje.isoformat())),
+        ("deriva por dia (ano)", lambda: historico.deriva_por_dia(ano_inicio, hoje.isoformat())),
+    ):
+        comeco = time.perf_counter()
+        for _ in range(10):
+            funcao()
+        resultados[nome] = (time.perf_counter() - comeco) * 100  # ms por execução
+    historico.fechar()
+    return resultados
+
+
+if __name__ == "__main__":
+    for nome, valor in medir_relatorios(int(sys.argv[1]) if len(sys.argv) > 1 else 60).items():
+        print(f"{nome}: {valor:.3f}" if isinstance(valor, float) else f"{nome}: {valor}")
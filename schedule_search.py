@@ -0,0 +1,123 @@
+import os
+import re
+import unicodedata
+
+from app_logic import DIAS_SEMANA, ler_sequencia
+
+
+_PALAVRA = re.compile(r"[^\W_]+")
+TAMANHO_PREFIXO = 3  # prefixos indexados diretamente; termos mais longos são conferidos palavra a palavra
+
+
+def palavras(texto):
+    """Palavras de ``texto`` em minúsculas e sem acentos: ``"Hino_Nacional.mp3"`` vira ``["hino", "nacional", "mp3"]``."""
+    texto = str(texto or "").lower()
+    if not texto.isascii():
+        texto = "".join(letra for letra in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(letra))
+    return _PALAVRA.findall(texto)
+
+
+def palavras_do_sinal(nome, musica):
+    """Palavras do nome do sinal e dos nomes dos arquivos (sem a pasta) que ele toca."""
+    resultado = set(palavras(nome))
+    for clipe in ler_sequencia(musica)["clipes"]:
+        resultado.update(palavras(os.path.basename(clipe)))
+    return resultado
+
+
+def _prefixos(palavras_sinal):
+    return {palavra[:tamanho] for palavra in palavras_sinal for tamanho in range(1, TAMANHO_PREFIXO + 1)}
+
+
+class ScheduleSearch:
+    """Índice invertido em memória dos sinais de todos os dias.
+
+    Cada palavra da busca é tratada como prefixo ("hin" encontra "hino"). O
+    índice guarda, por dia, os ids dos sinais com cada prefixo de até
+    ``TAMANHO_PREFIXO`` letras; termos mais longos partem desse conjunto (ou
+    do resultado do termo uma letra mais curto, o caso comum ao digitar) e
+    conferem as palavras de cada candidato. Uma busca com várias palavras
+    retorna os sinais que têm todas elas.
+
+    O índice acompanha o banco pelo registro de alterações: ``versao`` é a
+    última alteração aplicada (-1 enquanto o índice não foi carregado) e
+    ``aplicar_alteracoes`` recebe o que veio de ``alteracoes_desde``.
+    """
+
+    def __init__(self, linhas_por_dia=None, versao=-1):
+        self.versao = versao
+        self._palavras = {dia: {} for dia in DIAS_SEMANA}  # dia -> id -> palavras do sinal
+        self._prefixos = {}  # prefixo curto -> dia -> ids
+        self._termos = {}  # resultados recentes por termo, descartados a cada alteração
+        for dia, linhas in (linhas_por_dia or {}).items():
+            palavras_do_dia = self._palavras.setdefault(dia, {})
+            prefixos_do_dia = {}
+            for id_linha, _, nome, musica in linhas:
+                novas = palavras_do_dia[id_linha] = palavras_do_sinal(nome, musica)
+                for prefixo in _prefixos(novas):
+                    ids = prefixos_do_dia.get(prefixo)
+                    if ids is None:
+                        prefixos_do_dia[prefixo] = {id_linha}
+                    else:
+                        ids.add(id_linha)
+            for prefixo, ids in prefixos_do_dia.items():
+                self._prefixos.setdefault(prefixo, {})[dia] = ids
+
+    def __len__(self):
+        return sum(len(ids) for ids in self._palavras.values())
+
+    def _indexar(self, dia, id_linha, nome, musica):
+        self._remover(dia, id_linha)
+        novas = palavras_do_sinal(nome, musica)
+        self._palavras.setdefault(dia, {})[id_linha] = novas
+        for prefixo in _prefixos(novas):
+            self._prefixos.setdefault(prefixo, {}).setdefault(dia, set()).add(id_linha)
+        self._termos.clear()
+
+    def _remover(self, dia, id_linha):
+        antigas = self._palavras.get(dia, {}).pop(id_linha, None)
+        if antigas is None:
+            return
+        for prefixo in _prefixos(antigas):
+            self._prefixos[prefixo][dia].discard(id_linha)
+        self._termos.clear()
+
+    def aplicar_alteracoes(self, alteracoes):
+        """Aplica as alterações do registro (em ordem de versão) ainda não vistas pelo índice."""
+        for alteracao in alteracoes:
+            if alteracao["versao"] <= self.versao:
+                continue
+            if alteracao["operacao"] == "delete":
+                self._remover(alteracao["dia"], alteracao["id"])
+            else:
+                self._indexar(alteracao["dia"], alteracao["id"], alteracao["nome"], alteracao["musica"])
+            self.versao = alteracao["versao"]
+
+    def _buscar_termo(self, termo):
+        """``{dia: ids}`` dos sinais com alguma palavra que começa com ``termo``."""
+        if len(termo) <= TAMANHO_PREFIXO:
+            return self._prefixos.get(termo, {})
+        encontrados = self._termos.get(termo)
+        if encontrados is None:
+            candidatos = self._termos.get(termo[:-1]) or self._prefixos.get(termo[:TAMANHO_PREFIXO], {})
+            encontrados = {}
+            for dia, ids in candidatos.items():
+                palavras_do_dia = self._palavras[dia]
+                encontrados[dia] = {
+                    id_linha for id_linha in ids
+                    if any(palavra.startswith(termo) for palavra in palavras_do_dia[id_linha])
+                }
+            self._termos[termo] = encontrados
+        return encontrados
+
+    def buscar(self, texto):
+        """``{dia: ids}`` dos sinais que contêm todas as palavras de ``texto``, ou None se não houver palavras."""
+        termos = palavras(texto)
+        if not termos:
+            return None
+        resultados = [self._buscar_termo(termo) for termo in set(termos)]
+        encontrados = {}
+        for dia in self._palavras:
+            conjuntos = sorted((resultado.get(dia, set()) for resultado in resultados), key=len)
+            encontrados[dia] = conjuntos[0].intersection(*conjuntos[1:])
+        return encontrados
@@ -0,0 +1,195 @@
+"""Perfil de desempenho ativado por opção de linha de comando ou variável de ambiente.
+
+    Sinal.exe --perfil                 cProfile nos primeiros 30 segundos
+    Sinal.exe --perfil=120             cProfile nos primeiros 120 segundos
+    Sinal.exe --perfil=3600+300        cProfile de 1 h até 1 h e 5 min de execução
+    Sinal.exe --perfil=60 --perfil-amostragem
+                                       amostragem das pilhas de todas as threads
+
+As mesmas opções valem pelas variáveis ``SINAL_PERFIL`` (janela) e
+``SINAL_PERFIL_MODO=amostragem``. Os arquivos ficam ao lado do programa:
+``perfil_<data>.pstats`` (cProfile) ou ``perfil_<data>.folded`` (pilhas
+agrupadas para flame graphs), sempre acompanhados de ``perfil_<data>.txt``
+com as funções mais pesadas. Só usa a biblioteca padrão, então é importado
+antes do Qt e funciona no executável do PyInstaller.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+
+OPCAO_PERFIL = "--perfil"
+OPCAO_AMOSTRAGEM = "--perfil-amostragem"
+VARIAVEL_PERFIL = "SINAL_PERFIL"
+VARIAVEL_MODO = "SINAL_PERFIL_MODO"
+DURACAO_PADRAO_S = 30.0
+INTERVALO_AMOSTRAGEM_S = 0.01
+FUNCOES_NO_RESUMO = 25
+
+logger = logging.getLogger("sinal.diagnostics")
+
+
+def ler_janela(texto):
+    """``"DURACAO"`` ou ``"INICIO+DURACAO"`` em segundos; retorna ``(inicio, duracao)``."""
+    texto = (texto or "").strip()
+    if not texto:
+        return 0.0, DURACAO_PADRAO_S
+    inicio, _, duracao = texto.rpartition("+")
+    try:
+        inicio = float(inicio) if inicio else 0.0
+        duracao = float(duracao)
+    except ValueError:
+        raise ValueError(f"Janela de perfil inválida: {texto!r} (use SEGUNDOS ou INICIO+SEGUNDOS)")
+    if inicio < 0 or duracao <= 0:
+        raise ValueError(f"Janela de perfil inválida: {texto!r}")
+    return inicio, duracao
+
+
+def criar_perfilador(argv, ambiente, pasta):
+    """``SessionProfiler`` pedido em ``argv``/``ambiente`` ou ``None`` se o perfil estiver desligado."""
+    janela = None
+    amostragem = ambiente.get(VARIAVEL_MODO, "").strip().lower() == "amostragem"
+    for argumento in argv:
+        if argumento == OPCAO_PERFIL:
+            janela = ""
+        elif argumento.startswith(OPCAO_PERFIL + "="):
+            janela = argumento.split("=", 1)[1]
+        elif argumento == OPCAO_AMOSTRAGEM:
+            amostragem = True
+    if janela is None:
+        janela = ambiente.get(VARIAVEL_PERFIL)
+        if janela is None and not amostragem:
+            return None
+    try:
+        inicio, duracao = ler_janela(janela)
+    except ValueError as e:
+        logger.warning("%s", e)
+        return None
+    return SessionProfiler(pasta, inicio, duracao, amostragem)
+
+
+class _Amostrador:
+    """Amostra periodicamente as pilhas Python de todas as threads (exceto a própria)."""
+
+    def __init__(self, intervalo=INTERVALO_AMOSTRAGEM_S):
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self.amostras = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="SinalPerfilAmostragem", daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+
+    def _executar(self):
+        proprio = threading.get_ident()
+        nomes = {}
+        while not self._parar.wait(self.intervalo):
+            if len(nomes) != threading.active_count():
+                nomes = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, quadro in sys._current_frames().items():
+                if ident == proprio:
+                    continue
+                funcoes = []
+                while quadro is not None:
+                    codigo = quadro.f_code
+                    funcoes.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})")
+                    quadro = quadro.f_back
+                funcoes.append(nomes.get(ident, str(ident)))
+                self.pilhas[";".join(reversed(funcoes))] += 1
+            self.amostras += 1
+
+    def resumo(self):
+        proprias = Counter()
+        inclusivas = Counter()
+        for pilha, quantidade in self.pilhas.items():
+            funcoes = pilha.split(";")[1:]
+            if funcoes:
+                proprias[funcoes[-1]] += quantidade
+            for funcao in set(funcoes):
+                inclusivas[funcao] += quantidade
+        linhas = [f"{self.amostras} amostras a cada {self.intervalo * 1000:.0f} ms", "", "Tempo próprio (amostras):"]
+        linhas += [f"{quantidade:8d}  {funcao}" for funcao, quantidade in proprias.most_common(FUNCOES_NO_RESUMO)]
+        linhas += ["", "Tempo acumulado (amostras):"]
+        linhas += [f"{quantidade:8d}  {funcao}" for funcao, quantidade in inclusivas.most_common(FUNCOES_NO_RESUMO)]
+        return "\n".join(linhas)
+
+
+class SessionProfiler:
+    """Liga o perfil entre ``inicio`` e ``inicio + duracao`` segundos de execução.
+
+    ``iniciar`` e ``concluir`` devem ser chamados pela thread principal (o
+    cProfile só mede a thread que o ativou); o chamador decide quando, por
+    exemplo com timers do Qt. ``concluir`` pode ser chamado mais de uma vez.
+    """
+
+    def __init__(self, pasta, inicio=0.0, duracao=DURACAO_PADRAO_S, amostragem=False):
+        self.pasta = pasta
+        self.inicio = inicio
+        self.duracao = duracao
+        self.amostragem = amostragem
+        self.arquivos = []
+        self._perfil = None
+        self._amostrador = None
+        self._comeco = None
+        self._concluido = False
+
+    def iniciar(self):
+        if self._comeco is not None or self._concluido:
+            return
+        self._comeco = time.perf_counter()
+        if self.amostragem:
+            self._amostrador = _Amostrador()
+            self._amostrador.iniciar()
+        else:
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+
+    def concluir(self):
+        """Encerra o perfil e grava os arquivos; retorna a lista de arquivos gravados."""
+        if self._concluido:
+            return self.arquivos
+        self._concluido = True
+        if self._comeco is None:
+            return self.arquivos
+        decorrido = time.perf_counter() - self._comeco
+        base = os.path.join(self.pasta, time.strftime("perfil_%Y%m%d_%H%M%S"))
+        cabecalho = (
+            f"Perfil {'por amostragem' if self.amostragem else 'cProfile'} de {decorrido:.1f} s, "
+            f"a partir de {self.inicio:.0f} s de execução\n\n"
+        )
+        try:
+            if self._amostrador is not None:
+                self._amostrador.parar()
+                with open(base + ".folded", "w", encoding="utf-8") as arquivo:
+                    for pilha, quantidade in self._amostrador.pilhas.most_common():
+                        arquivo.write(f"{pilha} {quantidade}\n")
+                self.arquivos.append(base + ".folded")
+                resumo = self._amostrador.resumo()
+            else:
+                self._perfil.disable()
+                self._perfil.dump_stats(base + ".pstats")
+                self.arquivos.append(base + ".pstats")
+                saida = io.StringIO()
+                estatisticas = pstats.Stats(self._perfil, stream=saida).strip_dirs()
+                estatisticas.sort_stats(pstats.SortKey.TIME).print_stats(FUNCOES_NO_RESUMO)
+                estatisticas.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(FUNCOES_NO_RESUMO)
+                resumo = saida.getvalue()
+            with open(base + ".txt", "w", encoding="utf-8") as arquivo:
+                arquivo.write(cabecalho + resumo)
+            self.arquivos.append(base + ".txt")
+        except OSError as e:
+            logger.error("Erro ao gravar o perfil de desempenho: %s", e)
+        logger.info("Perfil de desempenho gravado: %s", ", ".join(self.arquivos))
+        return self.arquivos
@@ -0,0 +1,188 @@
+"""Simulador de tempo acelerado do agendador de sinais.
+
+Executa o mesmo núcleo usado pelo aplicativo (``AgendadorSinais`` e
+``plano_de_espera``) com um relógio virtual e um player falso: cada despertar
+do timer vira um salto do relógio, então uma semana ou um ano inteiro de uma
+programação grande roda em segundos. Não depende do Qt nem de áudio, então
+também roda em servidores de integração contínua.
+
+    python simulador.py --dias 365 --sinais-por-dia 200
+    python simulador.py --dias 30 --fuso America/Sao_Paulo --inicio 2018-10-20
+
+O código de saída é 1 se algum sinal não tocou ou tocou mais de uma vez.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from app_logic import DIAS_SEMANA, SinalProgramado, hora_dos_segundos
+from agendador import (
+    AgendadorSinais,
+    RelogioVirtual,
+    SnapshotProgramacao,
+    dia_da_semana,
+    plano_de_espera,
+    proxima_meia_noite,
+)
+
+
+class PlayerFalso:
+    """Registra as reproduções no relógio virtual em vez de tocar áudio."""
+
+    def __init__(self, relogio):
+        self.relogio = relogio
+        self.reproducoes = []
+
+    def tocar(self, musica):
+        self.reproducoes.append((self.relogio.agora(), musica))
+
+
+def agenda_sintetica(sinais_por_dia, semente=0):
+    """{dia: [SinalProgramado, ...]} com horários aleatórios e os extremos do dia."""
+    sorteio = random.Random(semente)
+    semana = {}
+    for dia in DIAS_SEMANA:
+        horarios = {0, 86399}
+        while len(horarios) < min(sinais_por_dia, 86400):
+            horarios.add(sorteio.randrange(86400))
+        semana[dia] = [
+            SinalProgramado(f"{dia}{indice}", dia, hora_dos_segundos(segundos), f"Sinal {indice}", f"/sinais/{dia}_{indice}.mp3")
+            for indice, segundos in enumerate(sorted(horarios))
+        ]
+    return semana
+
+
+def espera_do_timer(espera_ms, preciso):
+    """Espera efetiva de um ``QTimer``: o ``VeryCoarseTimer`` arredonda para segundos inteiros."""
+    if preciso:
+        return espera_ms
+    return max(round(espera_ms / 1000), 1) * 1000
+
+
+def simular(semana, inicio, dias, latencia_ms=0.0, antecedencia_ms=0):
+    """Simula ``dias`` dias a partir da meia-noite local de ``inicio`` (``date``).
+
+    Retorna um dicionário com os sinais esperados, os disparos, as falhas de
+    contagem e o custo de CPU do agendador.
+    """
+    comeco = time.mktime((inicio.year, inicio.month, inicio.day, 0, 0, 0, 0, 0, -1))
+    final = inicio + timedelta(days=dias)
+    fim = time.mktime((final.year, final.month, final.day, 0, 0, 0, 0, 0, -1))
+
+    relogio = RelogioVirtual(comeco)
+    agendador = AgendadorSinais(relogio)
+    agendador.latencia_ms = latencia_ms
+    agendador.trocar_snapshot(SnapshotProgramacao(semana))
+    player = PlayerFalso(relogio)
+    disparos = Counter()
+    maior_erro_ms = 0.0
+    despertares = 0
+    estado = {"data": None}
+
+    def virar_dia():
+        dia = dia_da_semana(relogio.agora())
+        estado["data"] = time.strftime("%Y-%m-%d", time.localtime(relogio.agora()))
+        agendador.trocar_dia(dia)
+
+    cpu_inicio = time.process_time()
+    real_inicio = time.perf_counter()
+    virar_dia()
+    meia_noite = proxima_meia_noite(relogio.agora())
+    while True:
+        # Mesmo caminho do aplicativo: arma o timer para o próximo sinal ou para a virada do dia
+        acordar = meia_noite
+        proximo = agendador.proximo_sinal()
+        if proximo is not None:
+            disparo = agendador.momento_disparo(proximo[1])
+            espera_ms, preciso = plano_de_espera((disparo - relogio.agora()) * 1000, antecedencia_ms)
+            acordar = min(acordar, relogio.agora() + espera_do_timer(espera_ms, preciso) / 1000)
+        if acordar >= fim:
+            break
+        relogio.definir(max(acordar, relogio.agora()))
+        despertares += 1
+        if relogio.agora() >= meia_noite:
+            virar_dia()
+            meia_noite = proxima_meia_noite(relogio.agora())
+            continue
+        vencido = agendador.sinal_vencido()
+        if vencido is not None:
+            sinal, instante = vencido
+            player.tocar(sinal.musica)
+            disparos[(estado["data"], sinal.id)] += 1
+            maior_erro_ms = max(maior_erro_ms, abs(relogio.agora() - agendador.momento_disparo(instante)) * 1000)
+    cpu = time.process_time() - cpu_inicio
+    real = time.perf_counter() - real_inicio
+
+    esperados = Counter()
+    dia_local = inicio
+    while dia_local < final:
+        if dia_local.weekday() < len(DIAS_SEMANA):
+            for sinal in semana.get(DIAS_SEMANA[dia_local.weekday()], []):
+                esperados[(dia_local.isoformat(), sinal.id)] += 1
+        dia_local += timedelta(days=1)
+
+    return {
+        "dias": dias,
+        "esperados": sum(esperados.values()),
+        "disparados": len(player.reproducoes),
+        "faltando": sorted(esperados - disparos),
+        "repetidos": sorted(chave for chave, quantidade in disparos.items() if quantidade > 1),
+        "inesperados": sorted(set(disparos) - set(esperados)),
+        "despertares": despertares,
+        "maior_erro_ms": maior_erro_ms,
+        "cpu_s": cpu,
+        "cpu_por_dia_ms": cpu * 1000 / dias,
+        "tempo_real_s": real,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simula o agendador de sinais com o tempo acelerado.")
+    parser.add_argument("--dias", type=int, default=7)
+    parser.add_argument("--sinais-por-dia", type=int, default=200)
+    parser.add_argument("--inicio", type=date.fromisoformat, default=date.today(), help="Data inicial (AAAA-MM-DD)")
+    parser.add_argument("--latencia-ms", type=float, default=0.0, help="Latência calibrada do áudio")
+    parser.add_argument("--antecedencia-ms", type=int, default=0, help="Antecedência da saída de áudio ativa")
+    parser.add_argument("--fuso", help="Fuso horário (ex.: America/Sao_Paulo) para testar o horário de verão")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.fuso:
+        os.environ["TZ"] = args.fuso
+        time.tzset()
+
+    semana = agenda_sintetica(args.sinais_por_dia, args.semente)
+    horas = {sinal.id: sinal.hora for sinais in semana.values() for sinal in sinais}
+    resultado = simular(
+        semana,
+        args.inicio,
+        args.dias,
+        latencia_ms=args.latencia_ms,
+        antecedencia_ms=args.antecedencia_ms,
+    )
+    print(f"Dias simulados: {resultado['dias']} a partir de {args.inicio.isoformat()}")
+    print(f"Sinais esperados: {resultado['esperados']}, disparados: {resultado['disparados']}")
+    print(f"Despertares do timer: {resultado['despertares']}")
+    print(f"Maior erro de disparo: {resultado['maior_erro_ms']:.3f} ms")
+    print(f"CPU do agendador: {resultado['cpu_s']:.3f} s ({resultado['cpu_por_dia_ms']:.2f} ms por dia simulado)")
+    print(f"Tempo real: {resultado['tempo_real_s']:.2f} s")
+    falhas = 0
+    for titulo in ("faltando", "repetidos", "inesperados"):
+        itens = resultado[titulo]
+        if itens:
+            falhas += len(itens)
+            exemplos = ", ".join(f"{data} {horas[id_sinal]} ({id_sinal})" for data, id_sinal in itens[:5])
+            print(f"Sinais {titulo}: {len(itens)} (ex.: {exemplos})")
+    if falhas:
+        return 1
+    print("OK: cada sinal tocou exatamente uma vez")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
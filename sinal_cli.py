@@ -0,0 +1,209 @@
+"""Gerenciamento da programação pela linha de comando, sem Qt.
+
+    python sinal_cli.py listar segunda --json
+    python sinal_cli.py adicionar segunda,quarta 07:30 "Entrada" Musicas/entrada.mp3
+    python sinal_cli.py remover segunda 3f2a...
+    python sinal_cli.py editar segunda 3f2a... --hora 07:35
+    python sinal_cli.py copiar-dia segunda sexta --substituir
+    python sinal_cli.py validar
+    python sinal_cli.py lote alteracoes.json
+
+Cada comando que altera a programação é uma única transação e uma única ação
+de desfazer no aplicativo. As músicas são gravadas com o caminho absoluto, como
+faz a interface. Só ``adicionar`` e ``lote`` criam o banco quando ele não existe. ``lote`` lê uma lista JSON de operações no formato
+de ``MusicAppLogic.aplicar_lote`` (ou ``-`` para a entrada padrão). Códigos de
+saída: 0 sucesso, 1 problemas encontrados por ``validar``, 2 erro.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+from app_logic import DIAS_SEMANA, MusicAppLogic, ler_sequencia, montar_sequencia
+from agendador import IndiceIntervalos, intervalo_do_sinal
+
+
+ARQUIVO_DADOS_PADRAO = "dados.db"
+COMANDOS_QUE_CRIAM_O_BANCO = ("adicionar", "lote")
+
+
+def ler_dias(texto):
+    """``"segunda,quarta"`` ou ``"todos"`` em uma lista de dias."""
+    if texto == "todos":
+        return list(DIAS_SEMANA)
+    return [dia.strip().lower() for dia in texto.split(",") if dia.strip()]
+
+
+def listar(logic, dias):
+    programacao = {}
+    with logic.transacao() as cursor:
+        for dia in dias:
+            linhas = cursor.execute(
+                f"SELECT id, hora, nome, musica FROM {logic.validar_dia(dia)} "
+                "ORDER BY segundos IS NULL, segundos, hora"
+            ).fetchall()
+            programacao[dia] = [
+                {"id": id_linha, "hora": hora, "nome": nome, "musica": musica}
+                for id_linha, hora, nome, musica in linhas
+            ]
+    return programacao
+
+
+def carregar_duracoes(logic):
+    """{caminho: {"duracao": segundos}} do índice de mídias do aplicativo, se existir."""
+    with logic.transacao() as cursor:
+        if cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='midias'").fetchone() is None:
+            return {}
+        return {caminho: {"duracao": duracao} for caminho, duracao in cursor.execute("SELECT caminho, duracao FROM midias")}
+
+
+def validar(logic, verificar_arquivos=True):
+    """Lista de problemas: hora inválida, arquivo inexistente e sinais que tocariam ao mesmo tempo."""
+    problemas = []
+    midias = carregar_duracoes(logic)
+    for dia, linhas in listar(logic, DIAS_SEMANA).items():
+        intervalos = []
+        rotulos = {}
+        for linha in linhas:
+            rotulos[linha["id"]] = linha
+            intervalo = intervalo_do_sinal(linha["hora"], linha["musica"], midias)
+            if intervalo is None:
+                problemas.append({"dia": dia, **linha, "problema": f"Hora inválida: {linha['hora']!r}"})
+                continue
+            intervalos.append((intervalo[0], intervalo[1], linha["id"]))
+            clipes = ler_sequencia(linha["musica"])["clipes"]
+            if not clipes:
+                problemas.append({"dia": dia, **linha, "problema": "Música não informada"})
+            elif verificar_arquivos:
+                for clipe in clipes:
+                    if not os.path.isfile(clipe):
+                        problemas.append({"dia": dia, **linha, "problema": f"Arquivo não encontrado: {clipe}"})
+        for id_linha, outros in IndiceIntervalos(intervalos).conflitos().items():
+            descricao = ", ".join(f"{rotulos[outro]['hora']} {rotulos[outro]['nome']}" for _, _, outro in outros)
+            problemas.append({"dia": dia, **rotulos[id_linha], "problema": f"Toca ao mesmo tempo que: {descricao}"})
+    return problemas
+
+
+def ler_operacoes(caminho):
+    if caminho == "-":
+        texto = sys.stdin.read()
+    else:
+        with open(caminho, "r", encoding="utf-8") as arquivo:
+            texto = arquivo.read()
+    operacoes = json.loads(texto)
+    if not isinstance(operacoes, list):
+        raise ValueError("O lote deve ser uma lista JSON de operações")
+    return operacoes
+
+
+def imprimir(resultado, como_json):
+    if como_json:
+        json.dump(resultado, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+        return
+    if "programacao" in resultado:
+        for dia, linhas in resultado["programacao"].items():
+            print(f"{dia}:")
+            for linha in linhas:
+                print(f"  {linha['hora']:>8}  {linha['nome']}  {linha['musica']}  [{linha['id']}]")
+    elif "problemas" in resultado:
+        for problema in resultado["problemas"]:
+            print(f"{problema['dia']} {problema['hora']} {problema['nome']}: {problema['problema']}")
+        print(f"{len(resultado['problemas'])} problema(s) encontrado(s)")
+    else:
+        print(
+            f"{resultado['adicionados']} adicionado(s), {resultado['editados']} editado(s), "
+            f"{resultado['removidos']} removido(s)"
+        )
+        for id_linha in resultado["ids"]:
+            print(f"  {id_linha}")
+
+
+def main(argv=None):
+    comum = argparse.ArgumentParser(add_help=False)
+    comum.add_argument("--banco", default=ARQUIVO_DADOS_PADRAO, help="Banco da programação (padrão: dados.db)")
+    comum.add_argument("--json", action="store_true", help="Saída em JSON para automação")
+
+    parser = argparse.ArgumentParser(description="Gerencia a programação do Sinal sem abrir a interface.")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    listar_parser = subparsers.add_parser("listar", parents=[comum], help="Mostra os sinais de um ou mais dias")
+    listar_parser.add_argument("dias", nargs="*", default=list(DIAS_SEMANA))
+
+    adicionar = subparsers.add_parser("adicionar", parents=[comum], help="Adiciona um sinal em um ou mais dias")
+    adicionar.add_argument("dias", type=ler_dias, help="Dias separados por vírgula ou 'todos'")
+    adicionar.add_argument("hora", help="HH:MM ou HH:MM:SS")
+    adicionar.add_argument("nome")
+    adicionar.add_argument("musicas", nargs="+", help="Um arquivo ou vários (sequência)")
+    adicionar.add_argument("--crossfade-ms", type=int, default=0)
+    adicionar.add_argument("--duracao-maxima-ms", type=int, default=0)
+
+    remover = subparsers.add_parser("remover", parents=[comum], help="Remove sinais pelo id")
+    remover.add_argument("dia")
+    remover.add_argument("ids", nargs="+")
+
+    editar = subparsers.add_parser("editar", parents=[comum], help="Altera a hora, o nome ou a música de um sinal")
+    editar.add_argument("dia")
+    editar.add_argument("id")
+    editar.add_argument("--hora")
+    editar.add_argument("--nome")
+    editar.add_argument("--musica")
+
+    copiar = subparsers.add_parser("copiar-dia", parents=[comum], help="Copia os sinais de um dia para outro")
+    copiar.add_argument("origem")
+    copiar.add_argument("destino")
+    copiar.add_argument("--substituir", action="store_true", help="Remove antes os sinais do dia de destino")
+
+    validar_parser = subparsers.add_parser("validar", parents=[comum], help="Procura problemas na programação")
+    validar_parser.add_argument("--sem-arquivos", action="store_true", help="Não verifica se as músicas existem")
+
+    lote = subparsers.add_parser("lote", parents=[comum], help="Aplica uma lista JSON de operações de uma vez")
+    lote.add_argument("arquivo", help="Arquivo JSON ou '-' para a entrada padrão")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.comando not in COMANDOS_QUE_CRIAM_O_BANCO and not os.path.isfile(args.banco):
+            # Um --banco digitado errado não deve virar um banco novo e vazio
+            raise FileNotFoundError(f"Banco de dados não encontrado: {args.banco}")
+        logic = MusicAppLogic(args.banco)
+        if args.comando == "listar":
+            resultado = {"programacao": listar(logic, [dia.lower() for dia in args.dias])}
+        elif args.comando == "validar":
+            resultado = {"problemas": validar(logic, verificar_arquivos=not args.sem_arquivos)}
+        else:
+            if args.comando == "adicionar":
+                musica = montar_sequencia(
+                    [os.path.abspath(clipe) for clipe in args.musicas], args.crossfade_ms, args.duracao_maxima_ms
+                )
+                operacoes = [
+                    {"operacao": "adicionar", "dias": args.dias, "hora": args.hora, "nome": args.nome, "musica": musica}
+                ]
+            elif args.comando == "remover":
+                operacoes = [{"operacao": "remover", "dia": args.dia, "id": id_linha} for id_linha in args.ids]
+            elif args.comando == "editar":
+                campos = {campo: getattr(args, campo) for campo in ("hora", "nome", "musica") if getattr(args, campo)}
+                if "musica" in campos:
+                    campos["musica"] = os.path.abspath(campos["musica"])
+                operacoes = [{"operacao": "editar", "dia": args.dia, "id": args.id, **campos}]
+            elif args.comando == "copiar-dia":
+                operacoes = [
+                    {"operacao": "copiar_dia", "origem": args.origem, "destino": args.destino,
+                     "substituir": args.substituir}
+                ]
+            else:
+                operacoes = ler_operacoes(args.arquivo)
+            resultado = logic.aplicar_lote(operacoes, descricao=f"Linha de comando: {args.comando}")
+    except (OSError, ValueError, sqlite3.Error) as e:
+        if args.json:
+            imprimir({"erro": str(e)}, True)
+        else:
+            print(f"Erro: {e}", file=sys.stderr)
+        return 2
+    imprimir(resultado, args.json)
+    return 1 if resultado.get("problemas") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
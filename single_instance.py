@@ -0,0 +1,137 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+from PyQt5.QtCore import QLockFile, QObject, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+
+ARQUIVO_DADOS_PADRAO = "dados.db"
+TEMPO_LIMITE_REPASSE_MS = 1000
+ESPERA_INSTANCIA_S = 5.0  # tempo para a instância que está abrindo começar a aceitar comandos
+
+COMANDO_MOSTRAR = "mostrar"
+COMANDO_RECARREGAR = "recarregar"
+COMANDO_IMPORTAR = "importar"
+
+logger = logging.getLogger("sinal.startup")
+
+
+def nome_da_instancia(arquivo_dados=ARQUIVO_DADOS_PADRAO):
+    """Nome do canal local: um por usuário e por banco de dados."""
+    usuario = os.environ.get("USERNAME") or os.environ.get("USER") or ""
+    chave = f"{usuario}|{os.path.normcase(os.path.abspath(arquivo_dados))}"
+    return "Sinal-" + hashlib.sha1(chave.encode("utf-8")).hexdigest()[:16]
+
+
+def ler_comandos(argv):
+    """Comandos ``[(comando, argumento), ...]`` pedidos na linha de comando.
+
+    ``--recarregar`` relê a programação; ``--importar=ARQUIVO`` ou um arquivo
+    solto (ex.: "Abrir com" do Explorer) inicia o cadastro de um sinal com
+    aquela música. Sem comandos a janela é mostrada, exceto com ``--bandeja``.
+    """
+    comandos = []
+    for argumento in argv:
+        if argumento == "--recarregar":
+            comandos.append((COMANDO_RECARREGAR, ""))
+        elif argumento.startswith("--importar="):
+            comandos.append((COMANDO_IMPORTAR, os.path.abspath(argumento.split("=", 1)[1])))
+        elif not argumento.startswith("-"):
+            comandos.append((COMANDO_IMPORTAR, os.path.abspath(argumento)))
+    if not comandos and "--bandeja" not in argv:
+        comandos.append((COMANDO_MOSTRAR, ""))
+    return comandos
+
+
+class SingleInstance(QObject):
+    """Trava de instância única com um canal local para receber comandos.
+
+    A trava é um ``QLockFile`` na pasta temporária (liberada pelo sistema se o
+    processo terminar); o canal é um ``QLocalServer`` com o mesmo nome, aberto
+    por ``escutar`` depois que o ``QApplication`` existe. Cada comando é uma
+    linha JSON ``[comando, argumento]`` respondida com ``ok``.
+    """
+
+    comando_recebido = pyqtSignal(str, str)
+
+    def __init__(self, nome):
+        super().__init__()
+        self.nome = nome
+        self._trava = QLockFile(os.path.join(tempfile.gettempdir(), nome + ".lock"))
+        # Só o processo dono define se a trava está ativa, não a idade do arquivo
+        self._trava.setStaleLockTime(0)
+        self._servidor = None
+
+    def assumir(self):
+        return self._trava.tryLock(0)
+
+    def repassar(self, comandos, timeout_ms=TEMPO_LIMITE_REPASSE_MS):
+        """Envia os comandos para a instância em execução; ``False`` se nenhuma estiver escutando."""
+        socket = QLocalSocket()
+        socket.connectToServer(self.nome)
+        if not socket.waitForConnected(timeout_ms):
+            return False
+        for comando, argumento in comandos:
+            socket.write(json.dumps([comando, argumento]).encode("utf-8") + b"\n")
+        socket.flush()
+        respostas = 0
+        while respostas < len(comandos) and socket.waitForReadyRead(timeout_ms):
+            while socket.canReadLine():
+                socket.readLine()
+                respostas += 1
+        socket.disconnectFromServer()
+        return respostas == len(comandos)
+
+    def escutar(self):
+        self._servidor = QLocalServer(self)
+        # Com a trava na mão, um canal com este nome só pode ter sobrado de um processo encerrado
+        QLocalServer.removeServer(self.nome)
+        self._servidor.setSocketOptions(QLocalServer.UserAccessOption)
+        self._servidor.newConnection.connect(self._on_conexao)
+        if not self._servidor.listen(self.nome):
+            logger.error("Não foi possível abrir o canal de instância única: %s", self._servidor.errorString())
+
+    def _on_conexao(self):
+        while self._servidor.hasPendingConnections():
+            socket = self._servidor.nextPendingConnection()
+            socket.readyRead.connect(lambda s=socket: self._ler(s))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _ler(self, socket):
+        while socket.canReadLine():
+            linha = bytes(socket.readLine()).decode("utf-8", errors="replace")
+            try:
+                comando, argumento = json.loads(linha)
+            except (ValueError, TypeError):
+                logger.warning("Comando inválido recebido de outra instância: %r", linha)
+                continue
+            finally:
+                socket.write(b"ok\n")
+            logger.info("Comando recebido de outra instância: %s %s", comando, argumento)
+            self.comando_recebido.emit(str(comando), str(argumento))
+
+
+def garantir_instancia_unica(argv, arquivo_dados=ARQUIVO_DADOS_PADRAO):
+    """Retorna a ``SingleInstance`` dona da trava ou ``None`` se este processo deve encerrar.
+
+    Se já houver uma instância, os comandos de ``argv`` são repassados a ela.
+    Só usa o QtCore e o QtNetwork: nada de widgets nem banco de dados.
+    """
+    instancia = SingleInstance(nome_da_instancia(arquivo_dados))
+    comandos = ler_comandos(argv)
+    prazo = time.monotonic() + ESPERA_INSTANCIA_S
+    while True:
+        if instancia.repassar(comandos):
+            return None
+        if instancia.assumir():
+            return instancia
+        if time.monotonic() > prazo:
+            # A dona da trava está viva mas não responde: abrir outra instância dobraria os sinais
+            logger.warning("Outra instância do Sinal está em execução e não respondeu")
+            return None
+        # Outra instância acabou de pegar a trava e ainda está abrindo o canal
+        time.sleep(0.05)
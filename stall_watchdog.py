@@ -0,0 +1,110 @@
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+from PyQt5.QtCore import QCoreApplication, QThread, pyqtSignal
+
+
+ARQUIVO_DIAGNOSTICO = "diagnostico.log"
+INTERVALO_VERIFICACAO_MS = 250
+LIMITE_TRAVAMENTO_MS = 500
+TAMANHO_MAXIMO_DIAGNOSTICO = 1024 * 1024  # o log anterior é mantido como diagnostico.log.1
+PILHAS_POR_TRAVAMENTO = 3
+
+logger = logging.getLogger("sinal.diagnostics")
+
+
+class StallWatchdog(QThread):
+    """Mede quanto tempo o laço de eventos da thread principal demora a responder.
+
+    A cada ``INTERVALO_VERIFICACAO_MS`` a thread envia um ``ping`` (sinal
+    enfileirado) e confere se o anterior já foi respondido. Enquanto a resposta
+    passar de ``limite_ms``, a pilha Python da thread principal é amostrada com
+    ``sys._current_frames``; quando o laço volta a responder, o travamento é
+    gravado no ``arquivo`` com as pilhas mais frequentes. Sem travamentos o
+    custo é apenas um sinal a cada verificação.
+    """
+
+    ping = pyqtSignal()
+    travamento_detectado = pyqtSignal(float, float, str)  # duração, maior do dia (ms) e horário
+
+    def __init__(self, arquivo, limite_ms=LIMITE_TRAVAMENTO_MS, intervalo_ms=INTERVALO_VERIFICACAO_MS, parent=None):
+        super().__init__(parent)
+        self.arquivo = arquivo
+        self.limite_ms = limite_ms
+        self.intervalo_ms = intervalo_ms
+        self.maior_hoje_ms = 0.0
+        self.horario_maior = None
+        self._data = None
+        self._id_principal = threading.main_thread().ident
+        self._parar = threading.Event()
+        self._enviado = None
+        self._resposta = None
+        # O objeto vive na thread principal, então o ping é atendido pelo laço de eventos dela
+        self.ping.connect(self._responder)
+        if QCoreApplication.instance() is not None:
+            # Encerrar o aplicativo sem fechar a janela não pode destruir a thread em execução
+            QCoreApplication.instance().aboutToQuit.connect(self.parar)
+
+    def _responder(self):
+        self._resposta = time.perf_counter()
+
+    def parar(self, timeout_ms=1000):
+        self._parar.set()
+        self.wait(timeout_ms)
+
+    def run(self):
+        amostras = Counter()
+        while not self._parar.wait(self.intervalo_ms / 1000):
+            agora = time.perf_counter()
+            if self._enviado is not None:
+                resposta = self._resposta
+                if resposta is None:
+                    if (agora - self._enviado) * 1000 >= self.limite_ms:
+                        amostras[self._pilha_principal()] += 1
+                    continue
+                duracao_ms = (resposta - self._enviado) * 1000
+                if duracao_ms >= self.limite_ms:
+                    self._registrar(duracao_ms, amostras)
+                amostras = Counter()
+            # Só há um ping pendente por vez, então a resposta sempre é a do último enviado
+            self._resposta = None
+            self._enviado = agora
+            self.ping.emit()
+
+    def _pilha_principal(self):
+        quadro = sys._current_frames().get(self._id_principal)
+        if quadro is None:
+            return "(pilha indisponível)"
+        return "".join(traceback.format_stack(quadro))
+
+    def _registrar(self, duracao_ms, amostras):
+        hoje = time.strftime("%Y-%m-%d")
+        if hoje != self._data:
+            self._data = hoje
+            self.maior_hoje_ms = 0.0
+        horario = time.strftime("%H:%M:%S")
+        if duracao_ms > self.maior_hoje_ms:
+            self.maior_hoje_ms = duracao_ms
+            self.horario_maior = horario
+        total = sum(amostras.values())
+        linhas = [
+            f"{hoje} {horario} Travamento da thread principal: {duracao_ms:.0f} ms "
+            f"({total} amostras, maior hoje: {self.maior_hoje_ms:.0f} ms)"
+        ]
+        for pilha, quantidade in amostras.most_common(PILHAS_POR_TRAVAMENTO):
+            linhas.append(f"  {quantidade} de {total} amostras:")
+            linhas.extend("    " + linha for linha in pilha.rstrip().splitlines())
+        try:
+            if os.path.exists(self.arquivo) and os.path.getsize(self.arquivo) > TAMANHO_MAXIMO_DIAGNOSTICO:
+                os.replace(self.arquivo, self.arquivo + ".1")
+            with open(self.arquivo, "a", encoding="utf-8") as arquivo:
+                arquivo.write("\n".join(linhas) + "\n\n")
+        except OSError as e:
+            logger.error("Erro ao gravar o diagnóstico de travamento: %s", e)
+        logger.warning("Travamento da thread principal: %.0f ms (maior hoje: %.0f ms)", duracao_ms, self.maior_hoje_ms)
+        self.travamento_detectado.emit(duracao_ms, self.maior_hoje_ms, self.horario_maior)
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import Future
+
+
+SUFIXO_INSTANTANEO = "_instantaneo.json"
+
+
+def caminho_instantaneo(arquivo_dados):
+    """Arquivo com a última programação conhecida, ao lado do banco."""
+    return os.path.splitext(os.path.abspath(arquivo_dados))[0] + SUFIXO_INSTANTANEO
+
+
+def carregar_instantaneo(caminho):
+    """Lê a cópia da programação salva na última execução (``None`` se não existir ou estiver corrompida)."""
+    try:
+        with open(caminho, "r", encoding="utf-8") as arquivo:
+            dados = json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(dados, dict) or not isinstance(dados.get("linhas"), dict):
+        return None
+    return dados
+
+
+def salvar_instantaneo(caminho, programacao):
+    """Grava ``programacao`` (formato de ``exportar_programacao``) com substituição atômica."""
+    pasta = os.path.dirname(caminho)
+    fd, temporario = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as arquivo:
+            json.dump(programacao, arquivo, ensure_ascii=False)
+        os.replace(temporario, caminho)
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+class StartupStages:
+    """Sequência de etapas executadas depois que a janela já foi exibida.
+
+    Cada etapa é executada por ``executar_proxima`` (o chamador decide quando,
+    normalmente pelo laço de eventos). Se a função da etapa devolver um
+    ``Future``, o tempo é contado até a conclusão do trabalho em segundo plano.
+    """
+
+    def __init__(self, inicio=None, registrar=print):
+        self.inicio = time.perf_counter() if inicio is None else inicio
+        self.registrar = registrar
+        self._etapas = []
+        self.tempos = {}
+
+    def adicionar(self, nome, funcao):
+        self._etapas.append((nome, funcao))
+
+    def marcar(self, nome):
+        """Registra um marco medido desde o início do processo."""
+        decorrido = (time.perf_counter() - self.inicio) * 1000
+        self.tempos[nome] = decorrido
+        self.registrar(f"Inicialização: {nome} em {decorrido:.1f} ms desde o início")
+
+    def pendentes(self):
+        return len(self._etapas)
+
+    def executar_proxima(self):
+        """Executa a próxima etapa e retorna ``True`` se ainda restarem etapas."""
+        if not self._etapas:
+            return False
+        nome, funcao = self._etapas.pop(0)
+        comeco = time.perf_counter()
+        try:
+            resultado = funcao()
+        except Exception as exc:
+            self.registrar(f"Inicialização: etapa '{nome}' falhou: {exc}")
+            return bool(self._etapas)
+        if isinstance(resultado, Future):
+            resultado.add_done_callback(lambda _: self._concluir(nome, comeco))
+        else:
+            self._concluir(nome, comeco)
+        return bool(self._etapas)
+
+    def _concluir(self, nome, comeco):
+        duracao = (time.perf_counter() - comeco) * 1000
+        self.tempos[nome] = duracao
+        self.registrar(f"Inicialização: etapa '{nome}' concluída em {duracao:.1f} ms")
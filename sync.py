@@ -0,0 +1,251 @@
+import argparse
+import hmac
+import json
+import os
+import tempfile
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app_logic import MusicAppLogic
+
+
+PORTA_PADRAO = 8765
+ARQUIVO_PASTA_SYNC = "sinal_sync.json"
+USER_AGENT = "Sinal-Sync"
+HOST_PADRAO = "127.0.0.1"
+CABECALHO_TOKEN = "X-Sinal-Token"
+HOSTS_LOCAIS = ("127.0.0.1", "localhost", "::1")
+
+
+def montar_resposta(logic, desde):
+    """Resposta enviada a um cliente que já possui a versão ``desde`` da programação."""
+    alteracoes = logic.alteracoes_desde(desde)
+    if alteracoes is None:
+        programacao = logic.exportar_programacao()
+        return {"versao": programacao["versao"], "programacao": programacao}
+    versao = alteracoes[-1]["versao"] if alteracoes else logic.versao_atual()
+    return {"versao": versao, "alteracoes": alteracoes}
+
+
+def aplicar_resposta(logic, resposta):
+    """Aplica no banco local a resposta do servidor e retorna quantas linhas mudaram."""
+    if "programacao" in resposta:
+        return logic.substituir_programacao(resposta["programacao"])
+    alteracoes = resposta.get("alteracoes", [])
+    if alteracoes or resposta["versao"] != logic.versao_remota():
+        return logic.aplicar_alteracoes_remotas(alteracoes, resposta["versao"])
+    return 0
+
+
+class _SyncRequestHandler(BaseHTTPRequestHandler):
+    server_version = "SinalSync/1.0"
+
+    def do_GET(self):
+        if not self._autorizado():
+            self.send_error(403, "Token de sincronização inválido")
+            return
+        url = urllib.parse.urlparse(self.path)
+        if url.path == "/versao":
+            self._responder({"versao": self.server.logic.versao_atual()})
+            return
+        if url.path == "/alteracoes":
+            parametros = urllib.parse.parse_qs(url.query)
+            try:
+                desde = int(parametros.get("desde", ["-1"])[0])
+            except ValueError:
+                self.send_error(400, "Parâmetro 'desde' inválido")
+                return
+            self._responder(montar_resposta(self.server.logic, desde))
+            return
+        self.send_error(404)
+
+    def _autorizado(self):
+        token = self.server.token
+        if not token:
+            return True
+        recebido = self.headers.get(CABECALHO_TOKEN, "")
+        return hmac.compare_digest(recebido.encode("utf-8"), token.encode("utf-8"))
+
+    def _responder(self, dados):
+        corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SyncServer:
+    """Servidor HTTP que publica a programação desta estação para as demais.
+
+    Sem ``token`` só atende esta máquina; para aceitar outras estações da rede, todas
+    precisam enviar o mesmo token no cabeçalho ``X-Sinal-Token``.
+    """
+
+    def __init__(self, arquivo_dados, host=HOST_PADRAO, porta=PORTA_PADRAO, token=None):
+        if not token and host not in HOSTS_LOCAIS:
+            raise ValueError("Defina um token de sincronização para atender outras estações da rede")
+        self.httpd = ThreadingHTTPServer((host, porta), _SyncRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.token = token or ""
+        # Só abre a porta: o banco é preparado (e migrado) por ``servir``, na thread do servidor
+        self.httpd.logic = MusicAppLogic(arquivo_dados, inicializar=False)
+        self._thread = None
+
+    @property
+    def porta(self):
+        return self.httpd.server_address[1]
+
+    def servir(self):
+        """Prepara as tabelas e atende as estações até ``parar``, bloqueando a thread atual."""
+        self.httpd.logic.criar_tabelas()
+        self.httpd.serve_forever()
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self.servir, name="SinalSyncServer", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class HttpSyncClient:
+    def __init__(self, logic, url_servidor, token=None, timeout=10):
+        self.logic = logic
+        self.url_servidor = url_servidor.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def sincronizar(self):
+        desde = self.logic.versao_remota()
+        url = f"{self.url_servidor}/alteracoes?{urllib.parse.urlencode({'desde': desde})}"
+        cabecalhos = {"User-Agent": USER_AGENT}
+        if self.token:
+            cabecalhos[CABECALHO_TOKEN] = self.token
+        request = urllib.request.Request(url, headers=cabecalhos, method="GET")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                resposta = json.loads(response.read().decode("utf-8"))
+        except (urllib.error.URLError, OSError) as exc:
+            raise RuntimeError(f"Não foi possível contatar o servidor de sincronização: {exc}") from exc
+        return aplicar_resposta(self.logic, resposta)
+
+
+def exportar_para_pasta(logic, pasta):
+    """Publica a programação em uma pasta compartilhada (substituição atômica do arquivo)."""
+    programacao = logic.exportar_programacao()
+    base = logic.versao_base()
+    dados = {
+        "versao": programacao["versao"],
+        "base": base,
+        "programacao": programacao,
+        "alteracoes": logic.listar_alteracoes(base),
+    }
+    os.makedirs(pasta, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as arquivo:
+            json.dump(dados, arquivo, ensure_ascii=False)
+        os.replace(temporario, os.path.join(pasta, ARQUIVO_PASTA_SYNC))
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return dados["versao"]
+
+
+class PastaSyncClient:
+    def __init__(self, logic, pasta):
+        self.logic = logic
+        self.caminho = os.path.join(pasta, ARQUIVO_PASTA_SYNC)
+
+    def sincronizar(self):
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as arquivo:
+                dados = json.load(arquivo)
+        except (OSError, json.JSONDecodeError) as exc:
+            raise RuntimeError(f"Não foi possível ler {self.caminho}: {exc}") from exc
+
+        desde = self.logic.versao_remota()
+        if dados["versao"] == desde:
+            return 0
+        # Cliente à frente da pasta: o banco do servidor foi recriado ou restaurado
+        if desde < 0 or desde < dados["base"] or desde > dados["versao"]:
+            return aplicar_resposta(self.logic, {"versao": dados["versao"], "programacao": dados["programacao"]})
+        alteracoes = [alteracao for alteracao in dados["alteracoes"] if alteracao["versao"] > desde]
+        return aplicar_resposta(self.logic, {"versao": dados["versao"], "alteracoes": alteracoes})
+
+
+def criar_cliente(logic, origem, token=None):
+    if origem.startswith(("http://", "https://")):
+        return HttpSyncClient(logic, origem, token)
+    return PastaSyncClient(logic, origem)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sincronização da programação do Sinal entre estações.")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    servir = subparsers.add_parser("servir", help="Publica a programação via HTTP")
+    servir.add_argument("banco")
+    servir.add_argument("--host", default=HOST_PADRAO, help="Use 0.0.0.0 (com --token) para atender a rede")
+    servir.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    servir.add_argument("--token", help="Token exigido das estações clientes")
+
+    puxar = subparsers.add_parser("puxar", help="Recebe as alterações de um servidor ou pasta")
+    puxar.add_argument("banco")
+    puxar.add_argument("origem", help="URL do servidor (http://host:porta) ou pasta compartilhada")
+    puxar.add_argument("--token", help="Token definido no servidor")
+
+    exportar = subparsers.add_parser("exportar", help="Publica a programação em uma pasta compartilhada")
+    exportar.add_argument("banco")
+    exportar.add_argument("pasta")
+
+    configurar = subparsers.add_parser("configurar", help="Define o modo de sincronização usado pelo aplicativo")
+    configurar.add_argument("banco")
+    configurar.add_argument("--modo", choices=["servidor", "cliente", "desativado"], required=True)
+    configurar.add_argument("--origem", help="URL do servidor ou pasta compartilhada (modo cliente)")
+    configurar.add_argument("--porta", type=int, help="Porta HTTP (modo servidor)")
+    configurar.add_argument("--pasta", help="Pasta compartilhada para exportar (modo servidor)")
+    configurar.add_argument("--token", help="Token compartilhado entre o servidor e os clientes")
+
+    args = parser.parse_args(argv)
+    logic = MusicAppLogic(args.banco)
+
+    if args.comando == "servir":
+        servidor = SyncServer(args.banco, args.host, args.porta, args.token)
+        print(f"Servindo a programação de {args.banco} em http://{args.host}:{servidor.porta}")
+        try:
+            servidor.servir()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.httpd.server_close()
+    elif args.comando == "puxar":
+        alteradas = criar_cliente(logic, args.origem, args.token).sincronizar()
+        print(f"{alteradas} alteração(ões) aplicada(s). Versão remota: {logic.versao_remota()}")
+    elif args.comando == "exportar":
+        versao = exportar_para_pasta(logic, args.pasta)
+        print(f"Programação exportada para {args.pasta} (versão {versao})")
+    elif args.comando == "configurar":
+        logic.set_config("sync_modo", "" if args.modo == "desativado" else args.modo)
+        if args.origem is not None:
+            logic.set_config("sync_origem", args.origem)
+        if args.porta is not None:
+            logic.set_config("sync_porta", args.porta)
+        if args.pasta is not None:
+            logic.set_config("sync_pasta", args.pasta)
+        if args.token is not None:
+            logic.set_config("sync_token", args.token)
+        print("Configuração de sincronização salva.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import sys
+import time
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from app_logic import MusicAppLogic  # noqa: E402
+
+
+@pytest.fixture
+def logic(tmp_path):
+    return MusicAppLogic(str(tmp_path / "dados.db"))
+
+
+@pytest.fixture
+def qapp():
+    pytest.importorskip("PyQt5.QtWidgets", exc_type=ImportError)
+    from PyQt5.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication(["teste", "-platform", "offscreen"])
+
+
+@pytest.fixture
+def janela(qapp, logic, tmp_path, monkeypatch):
+    """Janela principal de verdade (sem exibir), com o banco em ``tmp_path``."""
+    # O som do aplicativo depende do QtMultimedia, que precisa das bibliotecas de áudio do sistema
+    pytest.importorskip("PyQt5.QtMultimedia", exc_type=ImportError)
+    import app_ui
+
+    monkeypatch.chdir(tmp_path)
+    janela = app_ui.MusicAppUI(logic)
+    yield janela
+    janela.close()
+
+
+@pytest.fixture
+def fuso():
+    """Troca o fuso horário local durante o teste."""
+    anterior = os.environ.get("TZ")
+
+    def definir(nome):
+        os.environ["TZ"] = nome
+        time.tzset()
+
+    yield definir
+    if anterior is None:
+        os.environ.pop("TZ", None)
+    else:
+        os.environ["TZ"] = anterior
+    time.tzset()
+
+
+def processar_eventos(qapp, condicao, tempo_limite=5):
+    """Processa os eventos do Qt até ``condicao()`` ser verdadeira (ou o tempo acabar)."""
+    fim = time.monotonic() + tempo_limite
+    while not condicao() and time.monotonic() < fim:
+        qapp.processEvents()
+        time.sleep(0.001)
+    return condicao()
+
+
+def contar(arquivo_dados, tabela):
+    conn = sqlite3.connect(arquivo_dados)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+    finally:
+        conn.close()
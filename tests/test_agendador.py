@@ -0,0 +1,157 @@
+import time
+
+import pytest
+
+from app_logic import SinalProgramado
+from agendador import (
+    AgendadorSinais,
+    DetectorAjusteRelogio,
+    IndiceIntervalos,
+    RelogioVirtual,
+    SnapshotProgramacao,
+    dia_da_semana,
+    proxima_meia_noite,
+)
+
+
+def instante(ano, mes, dia, hora=0, minuto=0, segundo=0):
+    return time.mktime((ano, mes, dia, hora, minuto, segundo, 0, 0, -1))
+
+
+def agendador_com(sinais, agora, dia="segunda"):
+    agendador = AgendadorSinais(RelogioVirtual(agora))
+    agendador.trocar_snapshot(SnapshotProgramacao({dia: sinais}, versao=1))
+    agendador.trocar_dia(dia)
+    return agendador
+
+
+def tocar_ate(agendador, fim):
+    """Avança o relógio de sinal em sinal até ``fim`` e retorna os ids tocados."""
+    tocados = []
+    while True:
+        proximo = agendador.proximo_sinal()
+        if proximo is None or proximo[1] > fim:
+            return tocados
+        agendador.relogio.definir(max(proximo[1], agendador.relogio.agora()))
+        sinal, _ = agendador.sinal_vencido()
+        tocados.append(sinal.id)
+
+
+def test_snapshot_ordena_por_segundos_e_ignora_horas_invalidas():
+    sinais = [
+        SinalProgramado("c", "segunda", "10:00", "C", "c.mp3"),
+        SinalProgramado("x", "segunda", "25:99", "Inválido", "x.mp3"),
+        SinalProgramado("a", "segunda", "7:05", "A", "a.mp3"),
+        SinalProgramado("b", "terça", "09:00:30", "B", "b.mp3"),
+    ]
+    snapshot = SnapshotProgramacao.da_semana(sinais, versao=3)
+    assert [sinal.id for sinal in snapshot.agenda("segunda")] == ["a", "c"]
+    assert [sinal.segundos for sinal in snapshot.agenda("terça")] == [9 * 3600 + 30]
+    assert snapshot.agenda("sexta") == ()
+
+
+def test_snapshot_mais_antigo_e_recusado():
+    agendador = AgendadorSinais(RelogioVirtual(0))
+    assert agendador.trocar_snapshot(SnapshotProgramacao(versao=5))
+    assert not agendador.trocar_snapshot(SnapshotProgramacao(versao=4))
+    assert agendador.snapshot.versao == 5
+
+
+def test_sinais_no_mesmo_segundo_tocam_todos(fuso):
+    fuso("UTC")
+    sinais = [
+        SinalProgramado("1", "segunda", "08:00", "Campainha", "a.mp3"),
+        SinalProgramado("2", "segunda", "08:00", "Aviso", "b.mp3"),
+        SinalProgramado("3", "segunda", "08:00:01", "Música", "c.mp3"),
+    ]
+    agendador = agendador_com(sinais, instante(2026, 10, 19, 7, 59))
+    assert sorted(tocar_ate(agendador, instante(2026, 10, 19, 9))) == ["1", "2", "3"]
+    assert agendador.proximo_sinal() is None
+
+
+def test_janela_de_atraso_e_virada_da_meia_noite(fuso):
+    fuso("UTC")
+    sinais = [
+        SinalProgramado("meia-noite", "segunda", "00:00", "A", "a.mp3"),
+        SinalProgramado("cedo", "segunda", "06:00", "B", "b.mp3"),
+    ]
+    # 30 s depois da meia-noite a janela de atraso começa ontem, e o sinal das 00:00 ainda vale
+    agendador = agendador_com(sinais, instante(2026, 10, 19, 0, 0, 30))
+    assert agendador.proximo_sinal()[0].id == "meia-noite"
+    # Passada a janela, o próximo é o das 06:00
+    agendador.relogio.definir(instante(2026, 10, 19, 0, 1, 1))
+    assert agendador.proximo_sinal()[0].id == "cedo"
+
+
+def test_sinal_movido_depois_de_tocar_toca_de_novo(fuso):
+    fuso("UTC")
+    sinal = SinalProgramado("1", "segunda", "08:00", "A", "a.mp3")
+    agendador = agendador_com([sinal], instante(2026, 10, 19, 8))
+    assert agendador.sinal_vencido()[0] is sinal
+    movido = SinalProgramado("1", "segunda", "08:30", "A", "a.mp3")
+    agendador.trocar_snapshot(SnapshotProgramacao({"segunda": [movido]}, versao=2))
+    assert agendador.proximo_sinal()[0] is movido
+
+
+@pytest.mark.parametrize("data", [(2026, 3, 29), (2026, 10, 25)])
+def test_dias_de_mudanca_de_horario(fuso, data):
+    fuso("Europe/Berlin")
+    horas = ["00:30", "01:59:59", "02:00", "02:30", "02:59:59", "03:00", "03:30", "23:59:59"]
+    sinais = [SinalProgramado(hora, "domingo", hora, hora, "a.mp3") for hora in horas]
+    agendador = agendador_com(sinais, instante(*data), dia="domingo")
+    tocados = tocar_ate(agendador, instante(*data, 23, 59, 59) + 1)
+    assert sorted(tocados) == sorted(horas)
+    assert len(tocados) == len(set(tocados))
+
+
+def test_dia_da_semana(fuso):
+    fuso("UTC")
+    assert dia_da_semana(instante(2026, 10, 19, 23, 59, 59)) == "segunda"
+    assert dia_da_semana(instante(2026, 10, 23, 12)) == "sexta"
+    assert dia_da_semana(instante(2026, 10, 24, 12)) is None
+
+
+@pytest.mark.parametrize("zona, data, horas", [
+    ("UTC", (2026, 10, 19), 24),
+    ("Europe/Berlin", (2026, 3, 29), 23),
+    ("Europe/Berlin", (2026, 10, 25), 25),
+])
+def test_proxima_meia_noite_respeita_o_horario_de_verao(fuso, zona, data, horas):
+    fuso(zona)
+    meia_noite = instante(*data)
+    assert proxima_meia_noite(meia_noite) - meia_noite == horas * 3600
+    # De qualquer ponto do dia, inclusive do último segundo, a virada é a mesma
+    assert proxima_meia_noite(meia_noite + horas * 3600 - 1) == meia_noite + horas * 3600
+    # O dia seguinte volta a ter 24 horas
+    assert proxima_meia_noite(meia_noite + horas * 3600) == meia_noite + (horas + 24) * 3600
+
+
+def test_meia_noite_inexistente(fuso):
+    # Em 2018 o horário de verão de São Paulo começou às 00:00: o dia 4 começou à 01:00
+    fuso("America/Sao_Paulo")
+    virada = proxima_meia_noite(instante(2018, 11, 3, 12))
+    assert time.localtime(virada)[:5] == (2018, 11, 4, 1, 0)
+    assert virada - instante(2018, 11, 3, 12) == 12 * 3600
+
+
+def test_detector_de_ajuste_do_relogio(monkeypatch):
+    detector = DetectorAjusteRelogio(tolerancia=2.0)
+    assert detector.verificar() == 0.0
+    parede = time.time()
+    monkeypatch.setattr(time, "time", lambda: parede + 3600)
+    assert detector.verificar() == pytest.approx(3600, abs=1)
+    # A referência é reiniciada a cada verificação
+    assert detector.verificar() == 0.0
+
+
+def test_indice_intervalos():
+    indice = IndiceIntervalos([(0, 60, "a"), (30, 90, "b"), (200, 210, "c")])
+    assert indice.colide(80, 100)
+    assert not indice.colide(90, 200)
+    assert [chave for _, _, chave in indice.sobreposicoes(50, 205, ignorar="a")] == ["b", "c"]
+    indice.adicionar(205, 300, "d")
+    assert len(indice) == 4
+    conflitos = indice.conflitos()
+    assert sorted(conflitos) == ["a", "b", "c", "d"]
+    assert [chave for _, _, chave in conflitos["c"]] == ["d"]
+    assert not IndiceIntervalos([(0, 10, "a"), (10, 20, "b")]).conflitos()
@@ -0,0 +1,126 @@
+import logging
+import queue
+import threading
+
+import pytest
+
+import app_logging
+from app_logging import ARQUIVO_LOG, SUBSISTEMAS, VARIAVEL_NIVEIS, _FilaSemFormatacao, configurar_registro, ler_niveis
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    (None, {}),
+    ("", {}),
+    ("DEBUG", {subsistema: logging.DEBUG for subsistema in SUBSISTEMAS}),
+    ("scheduler=debug, storage=WARNING", {"scheduler": logging.DEBUG, "storage": logging.WARNING}),
+    # O último valor de cada subsistema prevalece; níveis desconhecidos são ignorados
+    ("warning,player=DEBUG,sync=ALTO", {**{s: logging.WARNING for s in SUBSISTEMAS}, "player": logging.DEBUG}),
+])
+def test_ler_niveis(texto, esperado):
+    assert ler_niveis(texto) == esperado
+
+
+@pytest.fixture
+def registro(monkeypatch, tmp_path):
+    """Chama ``configurar_registro`` e desfaz a configuração global do logging no fim do teste."""
+    raiz = logging.getLogger("sinal")
+    anteriores = (list(raiz.handlers), raiz.level, raiz.propagate)
+    niveis = {subsistema: logging.getLogger(f"sinal.{subsistema}").level for subsistema in SUBSISTEMAS}
+    monkeypatch.setattr(logging, "_srcfile", logging._srcfile)
+    monkeypatch.setattr(logging, "logProcesses", logging.logProcesses)
+    monkeypatch.setattr(logging, "logMultiprocessing", logging.logMultiprocessing)
+    monkeypatch.delenv(VARIAVEL_NIVEIS, raising=False)
+    ao_sair = []
+    monkeypatch.setattr(app_logging.atexit, "register", ao_sair.append)
+    ouvintes = []
+
+    def configurar(niveis=None):
+        ouvintes.append(configurar_registro(str(tmp_path), niveis))
+        return ouvintes[-1]
+
+    yield configurar
+    for ouvinte in ouvintes:
+        if ouvinte._thread is not None:
+            ouvinte.stop()
+        for destino in ouvinte.handlers:
+            destino.close()
+    assert ao_sair == [ouvinte.stop for ouvinte in ouvintes]
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    for handler in anteriores[0]:
+        raiz.addHandler(handler)
+    raiz.setLevel(anteriores[1])
+    raiz.propagate = anteriores[2]
+    for subsistema, nivel in niveis.items():
+        logging.getLogger(f"sinal.{subsistema}").setLevel(nivel)
+
+
+def linhas_do_log(tmp_path):
+    return (tmp_path / ARQUIVO_LOG).read_text(encoding="utf-8").splitlines()
+
+
+def test_arquivo_e_console_com_niveis_por_subsistema(registro, tmp_path, capsys):
+    ouvinte = registro({"scheduler": logging.DEBUG, "storage": logging.WARNING})
+    logging.getLogger("sinal.scheduler").debug("Próximo sinal em %d ms", 1500)
+    logging.getLogger("sinal.storage").info("não aparece")
+    logging.getLogger("sinal.player").debug("não aparece")
+
+    def outra_thread():
+        logging.getLogger("sinal.player").info("Tocando %s", "sino.mp3")
+
+    thread = threading.Thread(target=outra_thread, name="Disparo")
+    thread.start()
+    thread.join()
+    ouvinte.stop()
+    registro_console = capsys.readouterr().err
+
+    linhas = linhas_do_log(tmp_path)
+    assert [linha.split(" ", 2)[2] for linha in linhas] == [
+        "DEBUG   sinal.scheduler [MainThread] Próximo sinal em 1500 ms",
+        "INFO    sinal.player [Disparo] Tocando sino.mp3",
+    ]
+    assert registro_console.splitlines() == linhas
+    # Os registros do aplicativo não chegam ao logger raiz
+    assert not logging.getLogger("sinal").propagate
+
+
+def test_niveis_pela_variavel_de_ambiente(registro, tmp_path, monkeypatch):
+    monkeypatch.setenv(VARIAVEL_NIVEIS, "sync=ERROR")
+    ouvinte = registro()
+    logging.getLogger("sinal.sync").warning("não aparece")
+    logging.getLogger("sinal.sync").error("Servidor indisponível")
+    ouvinte.stop()
+    [linha] = linhas_do_log(tmp_path)
+    assert linha.endswith("ERROR   sinal.sync [MainThread] Servidor indisponível")
+
+
+def test_sem_console_grava_so_no_arquivo(registro, tmp_path, monkeypatch):
+    # Executável sem console (PyInstaller --noconsole): sys.stderr é None
+    monkeypatch.setattr(app_logging.sys, "stderr", None)
+    ouvinte = registro()
+    assert [type(destino).__name__ for destino in ouvinte.handlers] == ["RotatingFileHandler"]
+    logging.getLogger("sinal.startup").info("Janela exibida")
+    ouvinte.stop()
+    assert linhas_do_log(tmp_path)[0].endswith("Janela exibida")
+
+
+def test_rotacao_por_tamanho(registro, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_logging, "TAMANHO_MAXIMO_LOG", 500)
+    monkeypatch.setattr(app_logging, "ARQUIVOS_ANTIGOS_LOG", 2)
+    monkeypatch.setattr(app_logging.sys, "stderr", None)
+    ouvinte = registro()
+    for numero in range(50):
+        logging.getLogger("sinal.media").info("Arquivo %03d indexado", numero)
+    ouvinte.stop()
+    assert sorted(arquivo.name for arquivo in tmp_path.iterdir()) == [ARQUIVO_LOG, ARQUIVO_LOG + ".1", ARQUIVO_LOG + ".2"]
+    assert linhas_do_log(tmp_path)[-1].endswith("Arquivo 049 indexado")
+
+
+def test_fila_nao_formata_na_thread_que_registra():
+    fila = queue.SimpleQueue()
+    logger = logging.Logger("teste_fila")
+    logger.addHandler(_FilaSemFormatacao(fila))
+    logger.warning("Sinal %s atrasado %d ms", "08:00", 12)
+    registro = fila.get_nowait()
+    assert registro.msg == "Sinal %s atrasado %d ms" and registro.args == ("08:00", 12)
+    assert not hasattr(registro, "message")
@@ -0,0 +1,99 @@
+import os
+import sqlite3
+
+from audio_cache import VariantCache, chave_variante, normalizar_parametros
+
+
+def test_criar_o_cache_nao_abre_o_banco(tmp_path):
+    banco = str(tmp_path / "dados.db")
+    cache = VariantCache(str(tmp_path / "Cache"), banco)
+    # A interface cria o cache na inicialização: nenhuma conexão até a thread de processamento usá-lo
+    assert not os.path.exists(banco)
+
+    assert cache.carregar_variantes({"a.mp3": {"acessivel": True, "hash": "abc"}}, {}) == {}
+    conn = sqlite3.connect(banco)
+    assert conn.execute("SELECT COUNT(*) FROM variantes").fetchone() == (0,)
+    conn.close()
+
+
+def test_chave_muda_com_os_parametros():
+    padrao = normalizar_parametros()
+    assert chave_variante("abc", padrao) == chave_variante("abc", normalizar_parametros({"desconhecido": 1}))
+    assert chave_variante("abc", padrao) != chave_variante("abc", normalizar_parametros({"alvo_lufs": -14.0}))
+
+
+MEDICAO = (
+    '[Parsed_loudnorm_0 @ 0x1] \n{\n "input_i" : "-23.1", "input_tp" : "-4.0", "input_lra" : "5.2", '
+    '"input_thresh" : "-33.5", "target_offset" : "0.4"\n}\n'
+)
+
+
+class FfmpegFalso(VariantCache):
+    """Registra os comandos do ffmpeg em vez de executá-los; a renderização só cria o arquivo de saída."""
+
+    def __init__(self, *args, falhar=(), **kwargs):
+        super().__init__(*args, ffmpeg="ffmpeg", **kwargs)
+        self.comandos = []
+        self.falhar = set(falhar)
+
+    def _executar_ffmpeg(self, argumentos):
+        self.comandos.append(argumentos)
+        entrada = argumentos[argumentos.index("-i") + 1]
+        if entrada in self.falhar:
+            raise RuntimeError("Invalid data found when processing input")
+        if argumentos[-3:] == ["-f", "null", "-"]:
+            return MEDICAO
+        with open(argumentos[-1], "wb") as saida:
+            saida.write(b"mp3")
+        return ""
+
+
+def filtros(comando):
+    return comando[comando.index("-af") + 1].split(",")
+
+
+def test_fade_de_saida_e_aplicado_depois_do_corte(tmp_path):
+    cache = FfmpegFalso(str(tmp_path / "Cache"), str(tmp_path / "dados.db"))
+    parametros = {"cortar_silencio": True, "duracao_maxima": 20, "fade_entrada": 0.5, "fade_saida": 2}
+    destino = cache.renderizar("sino.mp3", "abc", parametros)
+    assert os.path.isfile(destino)
+
+    medicao, renderizacao = cache.comandos
+    assert filtros(medicao) == [
+        "silenceremove=start_periods=1:start_threshold=-50dB",
+        "atrim=0:20.0",
+        "loudnorm=I=-16.0:TP=-1.5:LRA=11.0:print_format=json",
+    ]
+    cadeia = filtros(renderizacao)
+    assert cadeia[:2] == filtros(medicao)[:2]
+    assert cadeia[2].startswith("loudnorm=I=-16.0:TP=-1.5:LRA=11.0:measured_I=-23.1:measured_TP=-4.0:")
+    assert cadeia[2].endswith(":offset=0.4:linear=true")
+    # O fim do fade de saída acompanha o áudio já cortado, sem depender da duração do original
+    assert cadeia[3:] == ["aresample=44100", "afade=t=in:d=0.5", "areverse", "afade=t=in:d=2.0", "areverse"]
+    assert renderizacao[-1] != destino and os.path.dirname(renderizacao[-1]) == os.path.dirname(destino)
+
+
+def test_processar_gera_o_que_falta_e_remove_as_obsoletas(tmp_path):
+    cache = FfmpegFalso(str(tmp_path / "Cache"), str(tmp_path / "dados.db"), falhar={"quebrado.mp3"})
+    midias = {
+        "a.mp3": {"acessivel": True, "hash": "aaa"},
+        "b.mp3": {"acessivel": True, "hash": "bbb"},
+        "quebrado.mp3": {"acessivel": True, "hash": "ccc"},
+        "sumiu.mp3": {"acessivel": False, "hash": "ddd"},
+    }
+    resumo = cache.processar(midias)
+    assert resumo == {"renderizadas": 2, "prontas": 0, "falhas": 1, "removidas": 0}
+    antigas = cache.carregar_variantes(midias, {})
+    assert sorted(antigas) == ["a.mp3", "b.mp3"]
+
+    # Na segunda vez só a música que falhou é tentada de novo
+    cache.comandos.clear()
+    assert cache.processar(midias)["renderizadas"] == 0
+    assert [comando[comando.index("-i") + 1] for comando in cache.comandos] == ["quebrado.mp3"]
+
+    # Novos parâmetros e uma música fora da programação: as variantes antigas são apagadas
+    del midias["b.mp3"]
+    resumo = cache.processar(midias, {"alvo_lufs": -14.0})
+    assert resumo == {"renderizadas": 1, "prontas": 0, "falhas": 1, "removidas": 2}
+    assert not any(os.path.exists(caminho) for caminho in antigas.values())
+    assert list(cache.carregar_variantes(midias, {"alvo_lufs": -14.0})) == ["a.mp3"]
@@ -0,0 +1,152 @@
+import pytest
+
+pytest.importorskip("PyQt5.QtMultimedia", exc_type=ImportError)
+
+from PyQt5.QtMultimedia import QMediaPlayer  # noqa: E402
+
+import audio_output  # noqa: E402
+from audio_output import SequencePlayer  # noqa: E402
+from conftest import processar_eventos  # noqa: E402
+
+
+def clipe_carregado(player):
+    return player.media().canonicalUrl().toLocalFile()
+
+
+@pytest.fixture
+def sequencia(qapp):
+    sequencia = SequencePlayer()
+    sequencia.estados = []
+    sequencia.falhas = []
+    sequencia.stateChanged.connect(sequencia.estados.append)
+    sequencia.falhou.connect(sequencia.falhas.append)
+    yield sequencia
+    sequencia.stop()
+
+
+def terminar(sequencia, status=QMediaPlayer.EndOfMedia):
+    """Simula o fim (ou a falha) do clipe que está tocando."""
+    player = sequencia._players[sequencia._atual]
+    player.mediaStatusChanged.emit(status)
+
+
+def test_clipe_invalido_no_pre_carregamento_e_pulado(sequencia):
+    sequencia.tocar(["/a.mp3", "/quebrado.mp3", "/c.mp3"])
+    ocioso = sequencia._players[1]
+    assert clipe_carregado(ocioso) == "/quebrado.mp3"
+
+    # O backend avisa a falha enquanto o clipe ainda está só pré-carregado
+    ocioso.mediaStatusChanged.emit(QMediaPlayer.InvalidMedia)
+    assert sequencia.falhas == ["/quebrado.mp3"]
+    assert clipe_carregado(ocioso) == "/c.mp3"
+
+    terminar(sequencia)
+    assert sequencia._players[sequencia._atual] is ocioso
+    terminar(sequencia)
+    assert sequencia.state() == QMediaPlayer.StoppedState
+    assert sequencia.estados == [QMediaPlayer.PlayingState, QMediaPlayer.StoppedState]
+
+
+def test_ultimo_clipe_invalido_encerra_a_sequencia(sequencia):
+    sequencia.tocar(["/a.mp3", "/quebrado.mp3"], crossfade_ms=500)
+    sequencia._players[1].mediaStatusChanged.emit(QMediaPlayer.InvalidMedia)
+    assert sequencia.falhas == ["/quebrado.mp3"]
+
+    terminar(sequencia)
+    assert sequencia.state() == QMediaPlayer.StoppedState
+    assert sequencia.estados == [QMediaPlayer.PlayingState, QMediaPlayer.StoppedState]
+
+
+class PlayerFalso(QMediaPlayer):
+    """Player sem backend de áudio: o teste decide a posição e o fim de cada clipe."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.clipe = None
+        self.estado = QMediaPlayer.StoppedState
+        self.volume_atual = 100
+
+    def setNotifyInterval(self, intervalo):
+        pass
+
+    def setMedia(self, conteudo):
+        self.clipe = conteudo.canonicalUrl().toLocalFile()
+
+    def play(self):
+        self.estado = QMediaPlayer.PlayingState
+
+    def pause(self):
+        self.estado = QMediaPlayer.PausedState
+
+    def stop(self):
+        self.estado = QMediaPlayer.StoppedState
+
+    def state(self):
+        return self.estado
+
+    def duration(self):
+        return 1000
+
+    def setVolume(self, volume):
+        self.volume_atual = volume
+
+    def volume(self):
+        return self.volume_atual
+
+
+@pytest.fixture
+def falsa(qapp, monkeypatch):
+    monkeypatch.setattr(audio_output, "QMediaPlayer", PlayerFalso)
+    sequencia = SequencePlayer()
+    sequencia.estados = []
+    sequencia.stateChanged.connect(sequencia.estados.append)
+    yield sequencia
+    sequencia.stop()
+
+
+def situacao(sequencia):
+    """(clipe, estado, volume) de cada um dos dois players."""
+    return [(player.clipe, player.estado, player.volume_atual) for player in sequencia._players]
+
+
+def test_sem_intervalo_o_proximo_clipe_ja_esta_carregado(falsa):
+    falsa.tocar(["/a.mp3", "/b.mp3", "/c.mp3"])
+    assert situacao(falsa) == [("/a.mp3", QMediaPlayer.PlayingState, 100), ("/b.mp3", QMediaPlayer.PausedState, 100)]
+
+    terminar(falsa)
+    # A troca é só um play() no player que já tinha o clipe; o outro pré-carrega o seguinte
+    assert situacao(falsa) == [("/c.mp3", QMediaPlayer.PausedState, 100), ("/b.mp3", QMediaPlayer.PlayingState, 100)]
+    terminar(falsa)
+    assert falsa._players[falsa._atual].clipe == "/c.mp3" and not falsa._proximo_pronto
+    terminar(falsa)
+    assert falsa.estados == [QMediaPlayer.PlayingState, QMediaPlayer.StoppedState]
+
+
+def test_crossfade_cruza_os_volumes(falsa, qapp):
+    falsa.tocar(["/a.mp3", "/b.mp3"], crossfade_ms=200)
+    primeiro, segundo = falsa._players
+    assert segundo.volume_atual == 0
+
+    primeiro.positionChanged.emit(700)
+    assert segundo.estado == QMediaPlayer.PausedState
+    # A 200 ms do fim o próximo clipe começa, mudo, com os dois tocando juntos
+    primeiro.positionChanged.emit(800)
+    assert primeiro.estado == segundo.estado == QMediaPlayer.PlayingState
+    assert processar_eventos(qapp, lambda: 0 < segundo.volume_atual < 100 and 0 < primeiro.volume_atual < 100)
+
+    assert processar_eventos(qapp, lambda: not falsa._fade.isActive())
+    assert primeiro.estado == QMediaPlayer.StoppedState and segundo.volume_atual == 100
+    terminar(falsa)
+    assert falsa.estados == [QMediaPlayer.PlayingState, QMediaPlayer.StoppedState]
+
+
+def test_duracao_maxima_interrompe_a_sequencia(falsa, qapp):
+    falsa.tocar(["/a.mp3", "/b.mp3"], duracao_maxima_ms=50)
+    assert falsa.state() == QMediaPlayer.PlayingState
+    assert processar_eventos(qapp, lambda: falsa.state() == QMediaPlayer.StoppedState)
+    assert [player.estado for player in falsa._players] == [QMediaPlayer.StoppedState] * 2
+
+
+def test_sequencia_vazia_nao_toca(falsa):
+    falsa.tocar([])
+    assert falsa.estados == [] and falsa.state() == QMediaPlayer.StoppedState
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from agendador import SnapshotProgramacao
+from app_logic import SinalProgramado
+
+
+def hora_local(instante):
+    return time.strftime("%H:%M:%S", time.localtime(instante))
+
+
+@pytest.fixture
+def janela_bandeja(janela, monkeypatch):
+    import app_ui
+
+    # O ambiente de teste não tem bandeja do sistema; o ícone é criado mesmo assim
+    monkeypatch.setattr(app_ui.QSystemTrayIcon, "isSystemTrayAvailable", staticmethod(lambda: True))
+    janela.tocados = []
+    monkeypatch.setattr(janela, "tocar_musica", janela.tocados.append)
+    yield janela
+    # Como pelo menu "Sair": o fechamento de verdade, que encerra as threads
+    janela.saindo = True
+
+
+def programar(janela, *sinais):
+    janela.agendador.trocar_snapshot(SnapshotProgramacao({"segunda": list(sinais)}, versao=100))
+    janela.agendador.trocar_dia("segunda")
+    janela.agendar_proximo_sinal()
+
+
+def test_fechar_no_modo_bandeja_so_esconde_a_janela(janela_bandeja):
+    janela = janela_bandeja
+    janela.show()
+    assert janela.timer.isActive()
+    janela.configurar_bandeja(True)
+    assert janela.modo_bandeja and janela.bandeja.isVisible()
+
+    assert not janela.close()
+    assert janela.isHidden()
+    # Oculta, a janela não repinta o relógio; os sinais seguem pelo timer próprio
+    assert not janela.timer.isActive()
+
+    janela.restaurar_da_bandeja()
+    assert janela.isVisible() and janela.timer.isActive()
+
+    janela.configurar_bandeja(False)
+    assert not janela.bandeja.isVisible()
+    assert janela.close()
+
+
+def test_timer_do_proximo_sinal_e_dica_da_bandeja(janela_bandeja):
+    janela = janela_bandeja
+    agora = time.time()
+    if time.localtime(agora + 300).tm_yday != time.localtime(agora).tm_yday:
+        pytest.skip("perto da meia-noite o sinal cairia no dia seguinte")
+    janela.configurar_bandeja(True)
+    programar(janela)
+    assert not janela.sinal_timer.isActive()
+    assert janela.bandeja.toolTip() == "Sinal - nenhum sinal restante hoje"
+
+    hora = hora_local(agora + 120)
+    programar(janela, SinalProgramado("1", "segunda", hora, "Recreio", "/m/recreio.mp3"))
+    assert janela.bandeja.toolTip() == f"Sinal - próximo: {hora} Recreio"
+    # Espera longa com timer econômico, acordando antes do prazo para a aproximação final
+    assert janela.sinal_timer.isActive()
+    assert 100 * 1000 < janela.sinal_timer.remainingTime() <= 120 * 1000
+
+    # Acordar antes da hora não toca nada: o timer é apenas rearmado
+    janela.disparar_sinal_agendado()
+    assert janela.tocados == [] and janela.sinal_timer.isActive()
+
+
+def test_sinal_vencido_toca_e_rearma_para_o_seguinte(janela_bandeja):
+    janela = janela_bandeja
+    agora = time.time()
+    if time.localtime(agora + 300).tm_yday != time.localtime(agora).tm_yday:
+        pytest.skip("perto da meia-noite o sinal cairia no dia seguinte")
+    programar(
+        janela,
+        SinalProgramado("1", "segunda", hora_local(agora), "Entrada", "/m/entrada.mp3"),
+        SinalProgramado("2", "segunda", hora_local(agora + 180), "Saída", "/m/saida.mp3"),
+    )
+    janela.disparar_sinal_agendado()
+    assert janela.tocados == ["/m/entrada.mp3"]
+    assert janela.agendador.proximo_sinal()[0].id == "2"
+    assert janela.sinal_timer.isActive()
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from conftest import processar_eventos
+from db_worker import DatabaseWorker
+
+
+class Lento:
+    """Objeto da fábrica do worker: ``esperar`` segura a thread até o teste liberar."""
+
+    def __init__(self, arquivo_dados):
+        self.liberar = threading.Event()
+        self.chamadas = []
+
+    def esperar(self):
+        self.liberar.wait(5)
+
+    def consultar(self, valor):
+        self.chamadas.append(valor)
+        return valor
+
+
+@pytest.fixture
+def worker():
+    worker = DatabaseWorker(":memory:", fabrica=Lento, nome="TesteWorker")
+    yield worker
+    if worker.logic is not None:
+        worker.logic.liberar.set()
+    worker.parar(timeout=5)
+
+
+def aguardar_logic(worker):
+    while worker.logic is None:
+        time.sleep(0.001)
+    return worker.logic
+
+
+def test_pedidos_com_a_mesma_chave_sao_substituidos(worker):
+    ocupado = worker.submeter("esperar")
+    primeiro = worker.submeter("consultar", 1, chave="dia")
+    segundo = worker.submeter("consultar", 2, chave="dia")
+    outro = worker.submeter("consultar", 3, chave="busca")
+    assert primeiro.cancelled()
+    aguardar_logic(worker).liberar.set()
+    assert segundo.result(5) == 2
+    assert outro.result(5) == 3
+    ocupado.result(5)
+    assert worker.logic.chamadas == [2, 3]
+
+
+def test_excecao_chega_pelo_future(worker):
+    future = worker.submeter(lambda logic: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        future.result(5)
+
+
+def test_status_de_espera_nao_fica_preso_quando_o_pedido_e_substituido(janela, qapp):
+    liberar = threading.Event()
+    janela.executar_no_banco(lambda logic: liberar.wait(5))
+    antes = janela.status_label.text()
+    lento = janela.executar_no_banco("get_linhas_por_dia", "segunda", chave="dia", descricao="lendo o dia")
+    # O aviso de banco lento do primeiro pedido já apareceu quando o usuário clica em outro dia
+    janela.avisar_banco_lento(lento, "lendo o dia")
+    assert "Aguardando o banco de dados" in janela.status_label.text()
+    rapido = janela.executar_no_banco("get_linhas_por_dia", "terça", chave="dia", descricao="lendo o dia")
+    assert lento.cancelled()
+
+    liberar.set()
+    assert rapido.result(5) == []
+    assert processar_eventos(qapp, lambda: not janela.consultas_lentas)
+    assert janela.status_label.text() == antes
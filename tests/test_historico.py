@@ -0,0 +1,72 @@
+import app_logic
+from conftest import contar
+
+
+def linhas(logic, dia="segunda"):
+    return sorted((hora, nome, musica) for _, hora, nome, musica in logic.get_linhas_por_dia(dia))
+
+
+def test_desfazer_e_refazer(logic):
+    id_linha = logic.adicionar_musica("segunda", "7:05", "Entrada", "entrada.mp3")
+    logic.editar_musica_por_id("segunda", id_linha, "nome", "Entrada 1")
+    assert linhas(logic) == [("07:05", "Entrada 1", "entrada.mp3")]
+
+    assert logic.desfazer() == "Editar nome"
+    assert linhas(logic) == [("07:05", "Entrada", "entrada.mp3")]
+    assert logic.desfazer() == "Adicionar 'Entrada'"
+    assert linhas(logic) == []
+    assert logic.desfazer() is None
+
+    assert logic.refazer() == "Adicionar 'Entrada'"
+    assert logic.refazer() == "Editar nome"
+    assert linhas(logic) == [("07:05", "Entrada 1", "entrada.mp3")]
+    assert logic.refazer() is None
+
+
+def test_lote_e_uma_unica_acao(logic):
+    logic.aplicar_lote(
+        [
+            {"operacao": "adicionar", "dias": ["segunda", "terça"], "hora": "08:00", "nome": "A", "musica": "a.mp3"},
+            {"operacao": "adicionar", "dia": "segunda", "hora": "09:00", "nome": "B", "musica": "b.mp3"},
+        ],
+        descricao="Importar",
+    )
+    assert logic.desfazer() == "Importar"
+    assert linhas(logic, "segunda") == linhas(logic, "terça") == []
+
+
+def test_edicao_sem_efeito_nao_entra_no_historico(logic):
+    id_linha = logic.adicionar_musica("segunda", "07:00", "Entrada", "entrada.mp3")
+    logic.editar_musica_por_id("segunda", id_linha, "nome", "Outro")
+    logic.desfazer()
+    diario = contar(logic.arquivo_dados, "alteracoes")
+    grupos = contar(logic.arquivo_dados, "grupos_alteracoes")
+
+    # Mesmo valor: nada é gravado e o refazer continua disponível
+    logic.editar_musica_por_id("segunda", id_linha, "nome", "Entrada")
+    logic.editar_musica_por_id("segunda", id_linha, "hora", "7:00")
+    assert contar(logic.arquivo_dados, "alteracoes") == diario
+    assert contar(logic.arquivo_dados, "grupos_alteracoes") == grupos
+    assert logic.descricao_refazer() == "Editar nome"
+    assert logic.versao_atual() == diario
+
+
+def test_registro_de_alteracoes_para_sincronizacao(logic):
+    assert logic.alteracoes_desde(-1) is None
+    versao = logic.versao_atual()
+    id_linha = logic.adicionar_musica("quarta", "10:00", "Recreio", "recreio.mp3")
+    logic.deletar_musicas([("quarta", id_linha)])
+    alteracoes = logic.alteracoes_desde(versao)
+    assert [(a["operacao"], a["id"]) for a in alteracoes] == [("insert", id_linha), ("delete", id_linha)]
+    assert logic.alteracoes_desde(alteracoes[-1]["versao"]) == []
+
+
+def test_restaurar_ate(logic, monkeypatch):
+    monkeypatch.setattr(app_logic.time, "time", lambda: 100.0)
+    logic.adicionar_musica("segunda", "07:00", "Entrada", "entrada.mp3")
+    monkeypatch.setattr(app_logic.time, "time", lambda: 200.0)
+    logic.adicionar_musica("segunda", "08:00", "Aula", "aula.mp3")
+    assert logic.restaurar_ate(150.0) == 1
+    assert linhas(logic) == [("07:00", "Entrada", "entrada.mp3")]
+    assert logic.desfazer() == "Restaurar programação"
+    assert len(linhas(logic)) == 2
@@ -0,0 +1,95 @@
+import sqlite3
+
+import pytest
+
+from agendador import MARGEM_TIMER_PRECISO_MS, plano_de_espera
+from app_logic import MusicAppLogic, hora_dos_segundos, segundos_da_hora
+
+
+@pytest.mark.parametrize("hora, segundos", [
+    ("00:00", 0),
+    ("7:05", 7 * 3600 + 5 * 60),
+    ("08:00:30", 8 * 3600 + 30),
+    ("23:59:59", 86399),
+    ("24:00", None),
+    ("08:60", None),
+    ("08:00:60", None),
+    ("08", None),
+    ("08:00:00:00", None),
+    ("oito", None),
+    (None, None),
+])
+def test_segundos_da_hora(hora, segundos):
+    assert segundos_da_hora(hora) == segundos
+
+
+def test_hora_dos_segundos():
+    assert hora_dos_segundos(8 * 3600) == "08:00"
+    assert hora_dos_segundos(8 * 3600 + 30) == "08:00:30"
+    assert hora_dos_segundos(86399) == "23:59:59"
+
+
+def test_banco_antigo_ganha_a_coluna_segundos(tmp_path):
+    caminho = str(tmp_path / "antigo.db")
+    conn = sqlite3.connect(caminho)
+    conn.execute("CREATE TABLE segunda (hora TEXT, nome TEXT, musica TEXT)")
+    conn.executemany("INSERT INTO segunda VALUES (?, ?, ?)", [
+        ("12:00", "Almoço", "almoco.mp3"), ("7:05", "Entrada", "entrada.mp3"), ("sem hora", "Quebrado", "x.mp3"),
+    ])
+    conn.commit()
+    conn.close()
+
+    logic = MusicAppLogic(caminho)
+    # A hora gravada não é reescrita; linhas com hora inválida ficam fora da agenda
+    assert logic.get_agenda_por_dia("segunda") == [
+        (7 * 3600 + 5 * 60, "7:05", "Entrada", "entrada.mp3"),
+        (12 * 3600, "12:00", "Almoço", "almoco.mp3"),
+    ]
+    assert len(logic.get_linhas_por_dia("segunda")) == 3
+
+
+def test_gravacoes_mantem_hora_e_segundos_juntos(logic):
+    id_linha = logic.adicionar_musicas(["terça"], "08:00:00", "Entrada", "entrada.mp3")["terça"]
+    logic.adicionar_musica("terça", "07:59:30", "Aviso", "aviso.mp3")
+    assert [(segundos, hora) for segundos, hora, _, _ in logic.get_agenda_por_dia("terça")] == [
+        (7 * 3600 + 59 * 60 + 30, "07:59:30"), (8 * 3600, "08:00"),
+    ]
+    logic.editar_musica_por_id("terça", id_linha, "hora", "06:00:15")
+    assert logic.get_agenda_por_dia("terça")[0][:3] == (6 * 3600 + 15, "06:00:15", "Entrada")
+
+
+@pytest.mark.parametrize("restante_ms, antecedencia_ms, esperado", [
+    # Espera longa: timer econômico acordando meia margem antes do prazo
+    (60000, 0, (60000 - MARGEM_TIMER_PRECISO_MS // 2, False)),
+    # Com a saída de áudio preparada antes, acorda na antecedência
+    (60000, 20000, (40000, False)),
+    (60000, 59000, (1000, False)),
+    # Aproximação final: timer preciso até o prazo, arredondado para cima
+    (MARGEM_TIMER_PRECISO_MS, 0, (MARGEM_TIMER_PRECISO_MS, True)),
+    (10.2, 0, (11, True)),
+    (-5, 0, (0, True)),
+])
+def test_plano_de_espera(restante_ms, antecedencia_ms, esperado):
+    assert plano_de_espera(restante_ms, antecedencia_ms) == esperado
+
+
+def test_dialogo_de_hora_com_segundos(qapp):
+    pytest.importorskip("PyQt5.QtMultimedia", exc_type=ImportError)
+    from PyQt5.QtCore import QTime
+
+    from app_ui import HoraInputDialog
+
+    dialogo = HoraInputDialog()
+    assert dialogo.time_edit.time().second() == 0
+    dialogo.time_edit.setTime(QTime(8, 0, 30))
+    assert dialogo.get_selected_time() == "08:00:30"
+    dialogo.time_edit.setTime(QTime(8, 0))
+    assert dialogo.get_selected_time() == "08:00"
+
+
+def test_erro_do_disparo_na_dica_do_status(janela):
+    janela.registrar_erro_disparo("08:00:30", 2.14)
+    janela.registrar_erro_disparo("08:01", -0.5)
+    assert janela.status_label.toolTip() == (
+        "Último sinal automático: 08:01, erro de -0.5 ms (maior erro nesta execução: 2.1 ms)"
+    )
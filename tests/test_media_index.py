@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from conftest import RAIZ
+from media_index import MediaIndex, aquecer_arquivos, estimar_duracao_mp3
+
+# MPEG 1 Layer III, 128 kbps, 44,1 kHz, estéreo
+FRAME_MPEG1 = bytes([0xFF, 0xFB, 0x90, 0x00])
+# MPEG 2 Layer III, 64 kbps, 22,05 kHz, mono
+FRAME_MPEG2_MONO = bytes([0xFF, 0xF3, 0x80, 0xC0])
+
+
+def gravar(pasta, nome, conteudo):
+    caminho = os.path.join(pasta, nome)
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(conteudo)
+    return caminho
+
+
+def id3v2(tamanho, rodape=False):
+    """Tag ID3v2.4 com ``tamanho`` bytes de conteúdo (synchsafe) e um falso sincronismo dentro dela."""
+    synchsafe = bytes((tamanho >> deslocamento) & 0x7F for deslocamento in (21, 14, 7, 0))
+    conteudo = (b"\xff\xfb\x10\x00" + b"\x00" * tamanho)[:tamanho]
+    tag = b"ID3\x04\x00" + bytes([0x10 if rodape else 0]) + synchsafe + conteudo
+    return tag + (b"3DI" + b"\x00" * 7 if rodape else b"")
+
+
+def test_cbr_pela_taxa_de_bits(tmp_path):
+    # 10 s a 128 kbps = 160000 bytes de áudio; a tag ID3v1 do fim não conta
+    audio = FRAME_MPEG1 + b"\x00" * (160000 - 4)
+    caminho = gravar(str(tmp_path), "cbr.mp3", audio + b"TAG" + b"\x00" * 125)
+    assert estimar_duracao_mp3(caminho) == pytest.approx(10.0)
+
+
+@pytest.mark.parametrize("rodape", [False, True])
+def test_tag_id3v2_no_inicio_e_ignorada(tmp_path, rodape):
+    audio = FRAME_MPEG1 + b"\x00" * (80000 - 4)
+    caminho = gravar(str(tmp_path), "id3.mp3", id3v2(2000, rodape) + audio)
+    assert estimar_duracao_mp3(caminho) == pytest.approx(5.0)
+
+
+def test_vbr_pelo_cabecalho_xing(tmp_path):
+    # Cabeçalho Xing com o total de frames: 1000 * 1152 amostras / 44100 Hz
+    frame = FRAME_MPEG1 + b"\x00" * 32 + b"Xing" + (1).to_bytes(4, "big") + (1000).to_bytes(4, "big")
+    caminho = gravar(str(tmp_path), "vbr.mp3", id3v2(300) + frame + b"\x00" * 5000)
+    assert estimar_duracao_mp3(caminho) == pytest.approx(1000 * 1152 / 44100)
+
+
+def test_info_em_mpeg2_mono(tmp_path):
+    frame = FRAME_MPEG2_MONO + b"\x00" * 9 + b"Info" + (1).to_bytes(4, "big") + (500).to_bytes(4, "big")
+    caminho = gravar(str(tmp_path), "mono.mp3", frame + b"\x00" * 2000)
+    assert estimar_duracao_mp3(caminho) == pytest.approx(500 * 576 / 22050)
+
+
+def test_vbr_pelo_cabecalho_vbri(tmp_path):
+    frame = FRAME_MPEG1 + b"\x00" * 32 + b"VBRI" + b"\x00" * 10 + (2000).to_bytes(4, "big")
+    caminho = gravar(str(tmp_path), "vbri.mp3", frame + b"\x00" * 5000)
+    assert estimar_duracao_mp3(caminho) == pytest.approx(2000 * 1152 / 44100)
+
+
+@pytest.mark.parametrize("conteudo", [
+    b"",
+    b"nao e um mp3" * 100,
+    FRAME_MPEG1[:3],
+    # Sincronismo com bitrate inválido (índice 15) e camada II
+    b"\xff\xfb\xf0\x00" + b"\x00" * 100,
+    b"\xff\xfd\x90\x00" + b"\x00" * 100,
+    # Tag ID3v2 que diz ser maior que o arquivo
+    id3v2(100)[:50],
+    # Cortado no meio do cabeçalho Xing
+    FRAME_MPEG1 + b"\x00" * 32 + b"Xing" + (1).to_bytes(4, "big") + b"\x00",
+])
+def test_arquivo_invalido_ou_cortado(tmp_path, conteudo):
+    assert estimar_duracao_mp3(gravar(str(tmp_path), "ruim.mp3", conteudo)) is None
+
+
+def test_musicas_de_exemplo(tmp_path):
+    caminho = os.path.join(RAIZ, "Musicas", "Musica (1).mp3")
+    assert estimar_duracao_mp3(caminho) == pytest.approx(36.7, abs=0.1)
+
+    indice = MediaIndex(str(tmp_path / "dados.db"))
+    sumiu = str(tmp_path / "sumiu.mp3")
+    assert indice.atualizar([caminho, sumiu]) == {"analisados": 1, "inalterados": 0, "inacessiveis": 1}
+    midias = indice.carregar_todos()
+    assert midias[caminho]["acessivel"] and midias[caminho]["duracao"] == pytest.approx(36.7, abs=0.1)
+    assert not midias[sumiu]["acessivel"]
+    # Tamanho e data de modificação iguais: o arquivo não é relido
+    assert indice.atualizar([caminho])["inalterados"] == 1
+
+
+def test_aquecer_arquivos(tmp_path):
+    caminhos = [gravar(str(tmp_path), nome, b"\x00" * 200000) for nome in ("a.mp3", "b.mp3")]
+    assert aquecer_arquivos([caminhos[0], str(tmp_path / "sumiu.mp3"), caminhos[1]]) == 2
+    assert aquecer_arquivos(caminhos, cancel_callback=lambda: True) == 0
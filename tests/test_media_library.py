@@ -0,0 +1,62 @@
+import os
+import time
+
+from app_logic import montar_sequencia, ler_sequencia
+from media_library import MediaLibrary
+
+
+def criar_arquivo(pasta, nome, conteudo):
+    caminho = os.path.join(pasta, nome)
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(conteudo)
+    return caminho
+
+
+def test_arquivos_iguais_viram_uma_copia_com_progresso(tmp_path):
+    biblioteca = MediaLibrary(str(tmp_path / "Biblioteca"))
+    original = criar_arquivo(str(tmp_path), "sino.mp3", b"x" * 3000)
+    copia = criar_arquivo(str(tmp_path), "sino (1).mp3", b"x" * 3000)
+    andamento = []
+    destino = biblioteca.importar(original, progresso=lambda feito, total: andamento.append((feito, total)))
+    assert biblioteca.importar(copia) == destino
+    assert biblioteca.pertence(destino) and biblioteca.importar(destino) == destino
+    assert andamento[-1] == (6000, 6000)
+
+
+def test_migracao_e_desfeita_de_uma_vez(tmp_path, logic):
+    pasta = str(tmp_path)
+    entrada = criar_arquivo(pasta, "entrada.mp3", b"entrada")
+    aviso = criar_arquivo(pasta, "aviso.mp3", b"aviso")
+    logic.adicionar_musicas(["segunda", "terça"], "07:00", "Entrada", entrada)
+    logic.adicionar_musica("quarta", "10:00", "Aviso", montar_sequencia([aviso, entrada], 200))
+    logic.adicionar_musica("quinta", "11:00", "Sumiu", os.path.join(pasta, "sumiu.mp3"))
+    antes = {dia: logic.get_linhas_por_dia(dia) for dia in ("segunda", "terça", "quarta", "quinta")}
+
+    biblioteca = MediaLibrary(os.path.join(pasta, "Biblioteca"))
+    resumo = biblioteca.importar_referencias(logic)
+    assert resumo == {"importados": 2, "ja_na_biblioteca": 0, "inacessiveis": 1}
+    [(_, _, _, sequencia)] = logic.get_linhas_por_dia("quarta")
+    assert all(biblioteca.pertence(clipe) for clipe in ler_sequencia(sequencia)["clipes"])
+    assert ler_sequencia(sequencia)["crossfade_ms"] == 200
+
+    assert logic.desfazer() == "Mover músicas para a biblioteca"
+    assert {dia: logic.get_linhas_por_dia(dia) for dia in antes} == antes
+    assert logic.descricao_desfazer() == "Adicionar 'Sumiu'"
+
+
+def test_copia_recente_sobrevive_a_limpeza(tmp_path):
+    biblioteca = MediaLibrary(str(tmp_path / "Biblioteca"))
+    antigo = time.time() - 30 * 86400
+    original = criar_arquivo(str(tmp_path), "antigo.mp3", b"antigo")
+    os.utime(original, (antigo, antigo))
+    destino = biblioteca.importar(original)
+    assert biblioteca.remover_nao_referenciados([]) == 0
+    assert os.path.exists(destino)
+
+    # Uma cópia antiga que volta a ser importada também fica protegida
+    os.utime(destino, (antigo, antigo))
+    assert MediaLibrary(biblioteca.raiz).remover_nao_referenciados([]) == 1
+    destino = biblioteca.importar(original)
+    os.utime(destino, (antigo, antigo))
+    assert biblioteca.remover_nao_referenciados([]) == 0
+    assert MediaLibrary(biblioteca.raiz).remover_nao_referenciados([]) == 1
@@ -0,0 +1,66 @@
+import time
+from datetime import date
+
+from playback_history import RESULTADO_FALHOU, RESULTADO_PERDIDO, RESULTADO_TOCADO, PlaybackHistory
+
+
+def instante(ano, mes, dia, hora, minuto=0):
+    return time.mktime((ano, mes, dia, hora, minuto, 0, 0, 0, -1))
+
+
+def perdidos(historico):
+    return historico._conn.execute(
+        "SELECT data, segundos FROM reproducoes WHERE resultado=? ORDER BY data, segundos", (RESULTADO_PERDIDO,)
+    ).fetchall()
+
+
+def test_so_o_dia_atual_e_reconstruido_com_a_programacao_atual(tmp_path):
+    historico = PlaybackHistory(str(tmp_path / "reproducoes.db"))
+    agenda = {dia: [(8 * 3600, "08:00", "Entrada", "a.mp3"), (12 * 3600, "12:00", "Almoço", "b.mp3")]
+              for dia in ("segunda", "terça", "quarta")}
+    # Primeira execução (segunda, 19/10/2026): só marca o início
+    assert historico.registrar_perdidos(agenda, instante(2026, 10, 19, 7)) == 0
+
+    # Programa fechado até quarta às 10h: segunda e terça tinham outra programação e não são inventadas
+    historico.registrar("2026-10-21", "quarta", 8 * 3600, instante(2026, 10, 21, 8), "Entrada", "a.mp3", 3.0,
+                        RESULTADO_TOCADO)
+    assert historico.registrar_perdidos(agenda, instante(2026, 10, 21, 10)) == 0
+    assert historico.registrar_perdidos(agenda, instante(2026, 10, 21, 13)) == 1
+    assert perdidos(historico) == [("2026-10-21", 12 * 3600)]
+    # Verificar de novo não duplica
+    assert historico.registrar_perdidos(agenda, instante(2026, 10, 21, 14)) == 0
+    historico.fechar()
+
+
+def test_virada_do_dia_fecha_o_ultimo_minuto_do_dia_anterior(tmp_path):
+    historico = PlaybackHistory(str(tmp_path / "reproducoes.db"))
+    agenda = {"segunda": [(23 * 3600 + 59 * 60 + 30, "23:59:30", "Último", "a.mp3")]}
+    historico.registrar_perdidos(agenda, instante(2026, 10, 19, 7))
+    # Verificação periódica pouco antes da meia-noite: o sinal ainda pode tocar com atraso
+    assert historico.registrar_perdidos(agenda, instante(2026, 10, 19, 23, 59)) == 0
+
+    # Na virada, a interface fecha a segunda até a meia-noite e depois confere a terça
+    meia_noite = instante(2026, 10, 20, 0)
+    assert historico.registrar_perdidos(agenda, meia_noite, date(2026, 10, 19)) == 1
+    assert historico.registrar_perdidos(agenda, meia_noite + 0.05 - 60) == 0
+    assert perdidos(historico) == [("2026-10-19", 23 * 3600 + 59 * 60 + 30)]
+    historico.fechar()
+
+
+def test_falha_marca_so_o_registro_do_sinal(tmp_path):
+    historico = PlaybackHistory(str(tmp_path / "reproducoes.db"))
+    momento = instante(2026, 10, 19, 8)
+    primeiro = historico.registrar("2026-10-19", "segunda", 8 * 3600, momento, "Entrada", "a.mp3", 2.0, RESULTADO_TOCADO)
+    segundo = historico.registrar("2026-10-19", "segunda", 8 * 3600, momento, "Aviso", "b.mp3", 2.5, RESULTADO_TOCADO)
+    historico.marcar_falha(segundo, "Arquivo inválido: b.mp3")
+    historico.fechar()
+
+    # Os ids continuam únicos depois de reabrir o histórico
+    historico = PlaybackHistory(str(tmp_path / "reproducoes.db"))
+    terceiro = historico.registrar("2026-10-19", "segunda", 9 * 3600, momento, "Recreio", "c.mp3", 1.0, RESULTADO_TOCADO)
+    assert len({primeiro, segundo, terceiro}) == 3
+    historico.descarregar()
+    assert historico._conn.execute("SELECT nome, resultado FROM reproducoes ORDER BY id").fetchall() == [
+        ("Entrada", RESULTADO_TOCADO), ("Aviso", RESULTADO_FALHOU), ("Recreio", RESULTADO_TOCADO),
+    ]
+    historico.fechar()
@@ -0,0 +1,53 @@
+from schedule_search import ScheduleSearch, palavras
+
+
+def indice():
+    return ScheduleSearch(
+        {
+            "segunda": [("1", "07:00", "Hino Nacional", "/m/hino_nacional.mp3"), ("2", "08:00", "Entrada", "/m/sino.mp3")],
+            "terça": [("3", "07:00", "Recreio", "/m/Música Hinário.mp3")],
+        },
+        versao=5,
+    )
+
+
+def encontrados(busca, texto):
+    return {dia: ids for dia, ids in busca.buscar(texto).items() if ids}
+
+
+def test_palavras_sem_acento_e_em_minusculas():
+    assert palavras("Hino_Nacional.MP3") == ["hino", "nacional", "mp3"]
+    assert palavras("Música Hinário") == ["musica", "hinario"]
+
+
+def test_busca_por_prefixo_em_nome_e_arquivo():
+    busca = indice()
+    assert busca.buscar("") is None
+    assert encontrados(busca, "hin") == {"segunda": {"1"}, "terça": {"3"}}
+    assert encontrados(busca, "hino") == {"segunda": {"1"}}
+    assert encontrados(busca, "sino entr") == {"segunda": {"2"}}
+    assert encontrados(busca, "MUSICA") == {"terça": {"3"}}
+
+
+def test_aplicar_alteracoes_do_registro():
+    busca = indice()
+    assert encontrados(busca, "hinos") == {}
+    busca.aplicar_alteracoes(
+        [
+            {"versao": 4, "dia": "segunda", "operacao": "delete", "id": "1"},  # já vista: ignorada
+            {"versao": 6, "dia": "segunda", "operacao": "update", "id": "2", "nome": "Hinos", "musica": "/m/a.mp3"},
+            {"versao": 7, "dia": "terça", "operacao": "delete", "id": "3"},
+            {"versao": 8, "dia": "quarta", "operacao": "insert", "id": "4", "nome": "Hino", "musica": "/m/b.mp3"},
+        ]
+    )
+    assert busca.versao == 8
+    assert len(busca) == 3
+    # O resultado guardado de "hinos" é descartado pela alteração
+    assert encontrados(busca, "hinos") == {"segunda": {"2"}}
+    assert encontrados(busca, "hin") == {"segunda": {"1", "2"}, "quarta": {"4"}}
+    assert encontrados(busca, "sino") == {}
+
+
+def test_indice_vazio_pede_a_copia_completa(logic):
+    assert ScheduleSearch().versao == -1
+    assert logic.alteracoes_desde(ScheduleSearch().versao) is None
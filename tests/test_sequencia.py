@@ -0,0 +1,49 @@
+import pytest
+
+from app_logic import ler_sequencia, montar_sequencia
+
+
+def test_um_clipe_sem_opcoes_continua_um_caminho_simples():
+    assert montar_sequencia(["/m/sino.mp3"]) == "/m/sino.mp3"
+    assert montar_sequencia(["", "/m/sino.mp3", None]) == "/m/sino.mp3"
+    assert ler_sequencia("/m/sino.mp3") == {"clipes": ["/m/sino.mp3"], "crossfade_ms": 0, "duracao_maxima_ms": 0}
+    assert ler_sequencia("") == {"clipes": [], "crossfade_ms": 0, "duracao_maxima_ms": 0}
+
+
+@pytest.mark.parametrize("clipes, crossfade_ms, duracao_maxima_ms", [
+    (["/m/vinheta.mp3", "/m/hino.mp3"], 0, 0),
+    (["/m/vinheta.mp3", "/m/hino.mp3"], 300, 0),
+    (["/m/hino.mp3"], 0, 45000),
+    (["/m/ação.mp3", "/m/saída.mp3"], 150, 60000),
+])
+def test_ida_e_volta(clipes, crossfade_ms, duracao_maxima_ms):
+    musica = montar_sequencia(clipes, crossfade_ms, duracao_maxima_ms)
+    assert musica.startswith("{")
+    assert ler_sequencia(musica) == {
+        "clipes": clipes, "crossfade_ms": crossfade_ms, "duracao_maxima_ms": duracao_maxima_ms,
+    }
+
+
+@pytest.mark.parametrize("musica, esperado", [
+    # JSON quebrado: tratado como um nome de arquivo qualquer
+    ("{ruim", {"clipes": ["{ruim"], "crossfade_ms": 0, "duracao_maxima_ms": 0}),
+    ('{"clipes": ["/a.mp3", ""], "crossfade_ms": -5}', {"clipes": ["/a.mp3"], "crossfade_ms": 0, "duracao_maxima_ms": 0}),
+    ('{"clipes": ["/a.mp3"], "crossfade_ms": "x"}', {"clipes": ['{"clipes": ["/a.mp3"], "crossfade_ms": "x"}'],
+                                                     "crossfade_ms": 0, "duracao_maxima_ms": 0}),
+])
+def test_valores_invalidos(musica, esperado):
+    assert ler_sequencia(musica) == esperado
+
+
+def test_arquivos_dentro_das_sequencias(logic):
+    logic.adicionar_musica("segunda", "08:00", "Hino", montar_sequencia(["/m/vinheta.mp3", "/m/hino.mp3"], 200))
+    logic.adicionar_musica("terça", "08:00", "Vinheta", "/m/vinheta.mp3")
+    assert sorted(logic.listar_musicas_referenciadas()) == ["/m/hino.mp3", "/m/vinheta.mp3"]
+
+    # Trocar um arquivo alcança os clipes das sequências, sem perder as opções
+    resumo = logic.aplicar_lote([{"operacao": "substituir_musica", "antiga": "/m/vinheta.mp3", "nova": "/lib/vinheta.mp3"}])
+    assert resumo["editados"] == 2
+    [(_, _, _, hino)] = logic.get_linhas_por_dia("segunda")
+    assert ler_sequencia(hino) == {"clipes": ["/lib/vinheta.mp3", "/m/hino.mp3"], "crossfade_ms": 200, "duracao_maxima_ms": 0}
+    [(_, _, _, vinheta)] = logic.get_linhas_por_dia("terça")
+    assert vinheta == "/lib/vinheta.mp3"
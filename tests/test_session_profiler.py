@@ -0,0 +1,91 @@
+import pstats
+import time
+
+import pytest
+
+from session_profiler import DURACAO_PADRAO_S, SessionProfiler, criar_perfilador, ler_janela
+
+
+@pytest.mark.parametrize("texto, janela", [
+    (None, (0.0, DURACAO_PADRAO_S)),
+    ("", (0.0, DURACAO_PADRAO_S)),
+    ("120", (0.0, 120.0)),
+    ("3600+300", (3600.0, 300.0)),
+    (" 1.5+2 ", (1.5, 2.0)),
+])
+def test_ler_janela(texto, janela):
+    assert ler_janela(texto) == janela
+
+
+@pytest.mark.parametrize("texto", ["abc", "10+", "-5+10", "0", "10+-1"])
+def test_janela_invalida(texto):
+    with pytest.raises(ValueError):
+        ler_janela(texto)
+
+
+@pytest.mark.parametrize("argv, ambiente, esperado", [
+    ([], {}, None),
+    (["--bandeja"], {}, None),
+    (["--perfil"], {}, (0.0, DURACAO_PADRAO_S, False)),
+    (["--perfil=3600+300", "--perfil-amostragem"], {}, (3600.0, 300.0, True)),
+    # A linha de comando vale mais que a variável de ambiente
+    (["--perfil=60"], {"SINAL_PERFIL": "10"}, (0.0, 60.0, False)),
+    ([], {"SINAL_PERFIL": "10"}, (0.0, 10.0, False)),
+    ([], {"SINAL_PERFIL_MODO": "Amostragem"}, (0.0, DURACAO_PADRAO_S, True)),
+    # Janela inválida: o aplicativo abre normalmente, sem perfil
+    (["--perfil=dez"], {}, None),
+])
+def test_criar_perfilador(tmp_path, argv, ambiente, esperado):
+    perfilador = criar_perfilador(argv, ambiente, str(tmp_path))
+    if esperado is None:
+        assert perfilador is None
+        return
+    assert (perfilador.inicio, perfilador.duracao, perfilador.amostragem) == esperado
+    assert perfilador.pasta == str(tmp_path)
+
+
+def funcao_pesada():
+    fim = time.perf_counter() + 0.15
+    while time.perf_counter() < fim:
+        sum(range(1000))
+
+
+def test_cprofile_grava_estatisticas_e_resumo(tmp_path):
+    perfilador = SessionProfiler(str(tmp_path))
+    perfilador.iniciar()
+    funcao_pesada()
+    arquivos = perfilador.concluir()
+
+    assert [arquivo.rsplit(".", 1)[1] for arquivo in arquivos] == ["pstats", "txt"]
+    funcoes = {nome for _, _, nome in pstats.Stats(arquivos[0]).stats}
+    assert "funcao_pesada" in funcoes
+    with open(arquivos[1], encoding="utf-8") as arquivo:
+        resumo = arquivo.read()
+    assert resumo.startswith("Perfil cProfile de ") and "funcao_pesada" in resumo
+    # Concluir de novo não grava outra vez
+    assert perfilador.concluir() == arquivos
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_amostragem_grava_pilhas_agrupadas(tmp_path):
+    perfilador = SessionProfiler(str(tmp_path), amostragem=True)
+    perfilador.iniciar()
+    funcao_pesada()
+    arquivos = perfilador.concluir()
+
+    assert [arquivo.rsplit(".", 1)[1] for arquivo in arquivos] == ["folded", "txt"]
+    with open(arquivos[0], encoding="utf-8") as arquivo:
+        linhas = arquivo.read().splitlines()
+    # Formato dos flame graphs: "thread;função;função quantidade"
+    assert any(linha.startswith("MainThread;") and "funcao_pesada" in linha for linha in linhas)
+    assert all(linha.rsplit(" ", 1)[1].isdigit() for linha in linhas)
+    with open(arquivos[1], encoding="utf-8") as arquivo:
+        assert arquivo.read().startswith("Perfil por amostragem de ")
+
+
+def test_concluir_sem_iniciar_nao_grava(tmp_path):
+    perfilador = SessionProfiler(str(tmp_path), inicio=3600)
+    assert perfilador.concluir() == []
+    # Depois de concluído, o perfil não liga mais
+    perfilador.iniciar()
+    assert perfilador.concluir() == [] and list(tmp_path.iterdir()) == []
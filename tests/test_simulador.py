@@ -0,0 +1,63 @@
+from datetime import date
+
+import pytest
+
+import simulador
+from simulador import agenda_sintetica, simular
+
+
+@pytest.mark.parametrize("zona, inicio, dias", [
+    ("UTC", date(2026, 10, 19), 14),
+    # Início do horário de verão à meia-noite (a meia-noite de 04/11/2018 não existiu)
+    ("America/Sao_Paulo", date(2018, 10, 28), 14),
+    # Dias de 23 e de 25 horas
+    ("Europe/Berlin", date(2026, 3, 23), 14),
+    ("Europe/Berlin", date(2026, 10, 19), 14),
+])
+def test_cada_sinal_toca_exatamente_uma_vez(fuso, zona, inicio, dias):
+    fuso(zona)
+    semana = agenda_sintetica(60, semente=7)
+    resultado = simular(semana, inicio, dias)
+    assert (resultado["faltando"], resultado["repetidos"], resultado["inesperados"]) == ([], [], [])
+    assert resultado["disparados"] == resultado["esperados"] == 60 * 10
+    assert resultado["maior_erro_ms"] < 1
+
+
+def test_latencia_e_saida_de_audio_antecipada(fuso):
+    fuso("UTC")
+    resultado = simular(agenda_sintetica(30), date(2026, 10, 19), 7, latencia_ms=120, antecedencia_ms=20000)
+    assert resultado["faltando"] == [] and resultado["repetidos"] == []
+    assert resultado["disparados"] == 30 * 5
+    # Com a antecedência, cada sinal custa um despertar a mais
+    sem_antecedencia = simular(agenda_sintetica(30), date(2026, 10, 19), 7, latencia_ms=120)
+    assert resultado["despertares"] > sem_antecedencia["despertares"]
+
+
+def test_agenda_sintetica_inclui_os_extremos_do_dia():
+    semana = agenda_sintetica(5, semente=1)
+    assert sorted(semana) == sorted(simulador.DIAS_SEMANA)
+    horas = [sinal.hora for sinal in semana["segunda"]]
+    assert len(horas) == 5 and horas[0] == "00:00" and horas[-1] == "23:59:59"
+    assert agenda_sintetica(5, semente=1)["sexta"][2].hora == semana["sexta"][2].hora
+
+
+def test_linha_de_comando(fuso, capsys):
+    fuso("UTC")
+    assert simulador.main(["--dias", "3", "--sinais-por-dia", "20", "--inicio", "2026-10-19"]) == 0
+    saida = capsys.readouterr().out
+    assert "Sinais esperados: 60, disparados: 60" in saida
+    assert saida.rstrip().endswith("OK: cada sinal tocou exatamente uma vez")
+
+
+def test_linha_de_comando_falha_quando_um_sinal_nao_toca(fuso, capsys, monkeypatch):
+    fuso("UTC")
+    # Um agendador que esquece o último sinal de cada dia
+    original = simulador.AgendadorSinais.trocar_dia
+
+    def trocar_dia(agendador, dia):
+        original(agendador, dia)
+        agendador.agenda = agendador.agenda[:-1]
+
+    monkeypatch.setattr(simulador.AgendadorSinais, "trocar_dia", trocar_dia)
+    assert simulador.main(["--dias", "1", "--sinais-por-dia", "5", "--inicio", "2026-10-19"]) == 1
+    assert "Sinais faltando: 1 (ex.: 2026-10-19 23:59:59 (segunda4))" in capsys.readouterr().out
@@ -0,0 +1,105 @@
+import json
+import os
+
+import pytest
+
+import sinal_cli
+from app_logic import MusicAppLogic, ler_sequencia
+
+
+@pytest.fixture
+def pasta(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("Musicas")
+    for nome in ("entrada.mp3", "saida.mp3"):
+        with open(os.path.join("Musicas", nome), "wb") as arquivo:
+            arquivo.write(b"mp3")
+    return tmp_path
+
+
+def executar(capsys, *argumentos):
+    """Roda a linha de comando com ``--json`` e devolve o código de saída e a resposta."""
+    codigo = sinal_cli.main([*argumentos, "--json"])
+    return codigo, json.loads(capsys.readouterr().out)
+
+
+def listar(capsys, dia):
+    codigo, resposta = executar(capsys, "listar", dia)
+    assert codigo == 0
+    return resposta["programacao"][dia]
+
+
+def test_adicionar_grava_caminhos_absolutos(pasta, capsys):
+    codigo, resposta = executar(capsys, "adicionar", "segunda,quarta", "07:30", "Entrada", "Musicas/entrada.mp3")
+    assert codigo == 0
+    assert resposta["adicionados"] == 2 and len(resposta["ids"]) == 2
+    [linha] = listar(capsys, "quarta")
+    assert linha == {
+        "id": resposta["ids"][1], "hora": "07:30", "nome": "Entrada",
+        "musica": str(pasta / "Musicas" / "entrada.mp3"),
+    }
+
+    codigo, _ = executar(
+        capsys, "adicionar", "sexta", "17:00", "Saída", "Musicas/saida.mp3", "Musicas/entrada.mp3",
+        "--crossfade-ms", "300",
+    )
+    assert codigo == 0
+    [linha] = listar(capsys, "sexta")
+    sequencia = ler_sequencia(linha["musica"])
+    assert sequencia["clipes"] == [str(pasta / "Musicas" / "saida.mp3"), str(pasta / "Musicas" / "entrada.mp3")]
+    assert sequencia["crossfade_ms"] == 300
+
+
+def test_editar_remover_e_copiar_dia(pasta, capsys):
+    _, resposta = executar(capsys, "adicionar", "segunda", "07:30", "Entrada", "Musicas/entrada.mp3")
+    [id_entrada] = resposta["ids"]
+    _, resposta = executar(capsys, "adicionar", "segunda", "12:00", "Almoço", "Musicas/entrada.mp3")
+    [id_almoco] = resposta["ids"]
+
+    codigo, resposta = executar(capsys, "editar", "segunda", id_entrada, "--hora", "07:35", "--musica", "Musicas/saida.mp3")
+    assert (codigo, resposta["editados"]) == (0, 1)
+    codigo, resposta = executar(capsys, "remover", "segunda", id_almoco)
+    assert (codigo, resposta["removidos"]) == (0, 1)
+    assert listar(capsys, "segunda") == [
+        {"id": id_entrada, "hora": "07:35", "nome": "Entrada", "musica": str(pasta / "Musicas" / "saida.mp3")}
+    ]
+
+    executar(capsys, "adicionar", "terça", "09:00", "Recreio", "Musicas/entrada.mp3")
+    codigo, resposta = executar(capsys, "copiar-dia", "segunda", "terça", "--substituir")
+    assert (codigo, resposta["adicionados"], resposta["removidos"]) == (0, 1, 1)
+    assert [(linha["hora"], linha["nome"]) for linha in listar(capsys, "terça")] == [("07:35", "Entrada")]
+
+    # Cada comando é uma única ação de desfazer no aplicativo
+    assert MusicAppLogic("dados.db").desfazer() == "Linha de comando: copiar-dia"
+
+
+def test_erro_no_comando_nao_altera_nada(pasta, capsys):
+    executar(capsys, "adicionar", "segunda", "07:30", "Entrada", "Musicas/entrada.mp3")
+    codigo, resposta = executar(capsys, "remover", "segunda", "nao-existe")
+    assert codigo == 2 and "não encontrado" in resposta["erro"]
+    assert len(listar(capsys, "segunda")) == 1
+
+
+def test_validar_aponta_arquivos_e_sobreposicoes(pasta, capsys):
+    executar(capsys, "adicionar", "segunda", "07:30", "Entrada", "Musicas/entrada.mp3")
+    executar(capsys, "adicionar", "segunda", "07:30", "Aviso", "Musicas/saida.mp3")
+    executar(capsys, "adicionar", "quinta", "10:00", "Sumiu", "Musicas/sumiu.mp3")
+
+    codigo, resposta = executar(capsys, "validar")
+    assert codigo == 1
+    problemas = sorted((problema["dia"], problema["nome"], problema["problema"]) for problema in resposta["problemas"])
+    assert problemas == [
+        ("quinta", "Sumiu", f"Arquivo não encontrado: {pasta / 'Musicas' / 'sumiu.mp3'}"),
+        ("segunda", "Aviso", "Toca ao mesmo tempo que: 07:30 Entrada"),
+        ("segunda", "Entrada", "Toca ao mesmo tempo que: 07:30 Aviso"),
+    ]
+    codigo, resposta = executar(capsys, "validar", "--sem-arquivos")
+    assert codigo == 1 and len(resposta["problemas"]) == 2
+
+
+@pytest.mark.parametrize("comando", [["listar"], ["validar"], ["remover", "segunda", "abc"]])
+def test_banco_inexistente_nao_e_criado(pasta, capsys, comando):
+    codigo, resposta = executar(capsys, *comando, "--banco", "dado.db")
+    assert codigo == 2
+    assert resposta == {"erro": "Banco de dados não encontrado: dado.db"}
+    assert not os.path.exists("dado.db")
@@ -0,0 +1,101 @@
+import os
+import uuid
+
+import pytest
+
+from conftest import processar_eventos
+
+pytest.importorskip("PyQt5.QtNetwork", exc_type=ImportError)
+
+from PyQt5.QtCore import QThread  # noqa: E402
+
+from single_instance import (  # noqa: E402
+    COMANDO_IMPORTAR,
+    COMANDO_MOSTRAR,
+    COMANDO_RECARREGAR,
+    SingleInstance,
+    ler_comandos,
+)
+
+
+def test_ler_comandos(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert ler_comandos([]) == [(COMANDO_MOSTRAR, "")]
+    assert ler_comandos(["--bandeja"]) == []
+    assert ler_comandos(["--recarregar", "--importar=sino.mp3", "hino.mp3"]) == [
+        (COMANDO_RECARREGAR, ""),
+        (COMANDO_IMPORTAR, str(tmp_path / "sino.mp3")),
+        (COMANDO_IMPORTAR, str(tmp_path / "hino.mp3")),
+    ]
+
+
+def test_segunda_instancia_repassa_os_comandos(qapp):
+    nome = f"Sinal-teste-{uuid.uuid4().hex[:8]}"
+    primeira = SingleInstance(nome)
+    assert primeira.assumir()
+    recebidos = []
+    primeira.comando_recebido.connect(lambda comando, argumento: recebidos.append((comando, argumento)))
+    primeira.escutar()
+
+    segunda = SingleInstance(nome)
+    assert not segunda.assumir()
+
+    class Repasse(QThread):
+        # ``repassar`` espera as respostas de forma síncrona; a primeira instância precisa do laço de eventos
+        def run(self):
+            self.ok = SingleInstance(nome).repassar([(COMANDO_RECARREGAR, ""), (COMANDO_IMPORTAR, "/sino.mp3")])
+
+    repasse = Repasse()
+    repasse.start()
+    assert processar_eventos(qapp, repasse.isFinished)
+    assert repasse.ok
+    assert recebidos == [(COMANDO_RECARREGAR, ""), (COMANDO_IMPORTAR, "/sino.mp3")]
+
+
+class DialogoAceito:
+    """Substitui os diálogos do cadastro de sinal: hora, nome e dias já preenchidos."""
+
+    def __init__(self, *args, **kwargs):
+        self.label = self
+
+    def setText(self, texto):
+        pass
+
+    def exec(self):
+        from PyQt5.QtWidgets import QDialog
+
+        return QDialog.Accepted
+
+    def get_selected_time(self):
+        return "10:00"
+
+    def get_input(self):
+        return "Sino"
+
+    def get_selected_days(self):
+        return ["segunda"]
+
+
+@pytest.mark.parametrize("confirmar", [False, True])
+def test_arquivo_importado_so_vai_para_a_biblioteca_depois_de_confirmado(janela, qapp, tmp_path, monkeypatch, confirmar):
+    import app_ui
+
+    for dialogo in ("HoraInputDialog", "EditDialog", "DaySelectionDialog"):
+        monkeypatch.setattr(app_ui, dialogo, DialogoAceito)
+    perguntas = []
+    monkeypatch.setattr(janela, "confirmar_sobreposicoes", lambda *args: perguntas.append(args) or confirmar)
+    janela.biblioteca = app_ui.MediaLibrary(str(tmp_path / "Biblioteca"))
+    janela.biblioteca_gerenciada = True
+    sino = tmp_path / "sino.mp3"
+    sino.write_bytes(b"sino")
+
+    janela.executar_comando(COMANDO_IMPORTAR, str(sino))
+    # A sobreposição é conferida com o arquivo de origem, antes de qualquer cópia
+    assert [args[2] for args in perguntas] == [str(sino)]
+    if not confirmar:
+        assert not os.path.exists(janela.biblioteca.raiz)
+        return
+    assert processar_eventos(qapp, lambda: janela.logic.get_linhas_por_dia("segunda"))
+    [(_, hora, nome, musica)] = janela.logic.get_linhas_por_dia("segunda")
+    assert (hora, nome) == ("10:00", "Sino")
+    assert janela.biblioteca.pertence(musica) and os.path.isfile(musica)
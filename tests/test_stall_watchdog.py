@@ -0,0 +1,73 @@
+import time
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("PyQt5.QtCore", exc_type=ImportError)
+
+from conftest import processar_eventos  # noqa: E402
+from stall_watchdog import TAMANHO_MAXIMO_DIAGNOSTICO, StallWatchdog  # noqa: E402
+
+
+@pytest.fixture
+def watchdog(qapp, tmp_path):
+    watchdog = StallWatchdog(str(tmp_path / "diagnostico.log"), limite_ms=150, intervalo_ms=20)
+    watchdog.travamentos = []
+    watchdog.travamento_detectado.connect(lambda *args: watchdog.travamentos.append(args))
+    watchdog.start()
+    yield watchdog
+    watchdog.parar()
+    assert watchdog.isFinished()
+
+
+def bloquear_a_thread_principal(segundos):
+    time.sleep(segundos)
+
+
+def test_travamento_e_gravado_com_a_pilha(watchdog, qapp, tmp_path):
+    processar_eventos(qapp, lambda: False, tempo_limite=0.1)
+    bloquear_a_thread_principal(0.5)
+    assert processar_eventos(qapp, lambda: watchdog.travamentos)
+
+    [(duracao_ms, maior_hoje_ms, horario)] = watchdog.travamentos
+    assert duracao_ms >= 400 and maior_hoje_ms == duracao_ms and horario == watchdog.horario_maior
+    diagnostico = (tmp_path / "diagnostico.log").read_text(encoding="utf-8")
+    assert "Travamento da thread principal" in diagnostico
+    # As amostras mostram onde a thread principal estava parada
+    assert "in bloquear_a_thread_principal" in diagnostico
+
+
+def test_laco_responsivo_nao_grava_nada(watchdog, qapp, tmp_path):
+    processar_eventos(qapp, lambda: False, tempo_limite=0.4)
+    assert watchdog.travamentos == []
+    assert not (tmp_path / "diagnostico.log").exists()
+
+
+def test_diagnostico_grande_e_rotacionado(qapp, tmp_path):
+    arquivo = tmp_path / "diagnostico.log"
+    arquivo.write_bytes(b"x" * (TAMANHO_MAXIMO_DIAGNOSTICO + 1))
+    watchdog = StallWatchdog(str(arquivo))
+    watchdog._registrar(800, Counter({"pilha A\n": 3, "pilha B\n": 1}))
+    watchdog._registrar(600, Counter())
+
+    assert (tmp_path / "diagnostico.log.1").stat().st_size == TAMANHO_MAXIMO_DIAGNOSTICO + 1
+    linhas = arquivo.read_text(encoding="utf-8").splitlines()
+    assert linhas[0].endswith("Travamento da thread principal: 800 ms (4 amostras, maior hoje: 800 ms)")
+    assert linhas[1:5] == ["  3 de 4 amostras:", "    pilha A", "  1 de 4 amostras:", "    pilha B"]
+    assert linhas[6].endswith("600 ms (0 amostras, maior hoje: 800 ms)")
+    assert watchdog.maior_hoje_ms == 800
+
+
+def test_falha_ao_gravar_nao_impede_o_aviso(qapp, tmp_path):
+    # O caminho do diagnóstico é uma pasta: a gravação falha, mas o travamento ainda é informado
+    watchdog = StallWatchdog(str(tmp_path))
+    avisos = []
+    watchdog.travamento_detectado.connect(lambda *args: avisos.append(args))
+    watchdog._registrar(700, Counter())
+    assert [duracao for duracao, _, _ in avisos] == [700]
+
+
+def test_janela_mostra_o_maior_travamento_do_dia(janela):
+    assert janela.watchdog.isRunning()
+    janela.on_travamento_detectado(700, 900, "10:15:00")
+    assert janela.status_label.toolTip() == "Maior travamento da janela hoje: 900 ms às 10:15:00 (ver diagnostico.log)"
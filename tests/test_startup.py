@@ -0,0 +1,82 @@
+import json
+from concurrent.futures import Future
+
+import pytest
+
+from app_logic import DIAS_SEMANA
+from conftest import processar_eventos
+from startup import StartupStages, caminho_instantaneo, carregar_instantaneo, salvar_instantaneo
+
+
+def test_instantaneo_ao_lado_do_banco(tmp_path, logic):
+    caminho = caminho_instantaneo(logic.arquivo_dados)
+    assert caminho == str(tmp_path / "dados_instantaneo.json")
+    assert carregar_instantaneo(caminho) is None
+
+    logic.adicionar_musica("segunda", "07:00", "Entrada", "/m/entrada.mp3")
+    salvar_instantaneo(caminho, logic.exportar_programacao())
+    assert carregar_instantaneo(caminho) == json.loads(json.dumps(logic.exportar_programacao()))
+    # A gravação é atômica: nenhum temporário fica para trás
+    assert sorted(arquivo.name for arquivo in tmp_path.iterdir()) == ["dados.db", "dados_instantaneo.json"]
+
+
+@pytest.mark.parametrize("conteudo", ["{corrompido", "[]", '{"versao": 3}', '{"linhas": []}'])
+def test_instantaneo_invalido_e_ignorado(tmp_path, conteudo):
+    caminho = tmp_path / "dados_instantaneo.json"
+    caminho.write_text(conteudo, encoding="utf-8")
+    assert carregar_instantaneo(str(caminho)) is None
+
+
+def test_etapas_uma_por_vez_e_falha_nao_interrompe():
+    mensagens = []
+    executadas = []
+    etapas = StartupStages(inicio=0, registrar=mensagens.append)
+    etapas.adicionar("primeira", lambda: executadas.append(1))
+    etapas.adicionar("quebrada", lambda: 1 / 0)
+    etapas.adicionar("última", lambda: executadas.append(3))
+    assert etapas.pendentes() == 3
+
+    assert etapas.executar_proxima() and executadas == [1]
+    assert etapas.executar_proxima() and executadas == [1]
+    assert not etapas.executar_proxima() and executadas == [1, 3]
+    assert not etapas.executar_proxima()
+    assert sorted(etapas.tempos) == ["primeira", "última"]
+    assert "Inicialização: etapa 'quebrada' falhou: division by zero" in mensagens
+
+    etapas.marcar("janela exibida")
+    assert etapas.tempos["janela exibida"] > 0
+
+
+def test_etapa_em_segundo_plano_conta_ate_o_fim_do_trabalho():
+    trabalho = Future()
+    etapas = StartupStages(registrar=lambda mensagem: None)
+    etapas.adicionar("banco", lambda: trabalho)
+    assert not etapas.executar_proxima()
+    assert "banco" not in etapas.tempos
+    trabalho.set_result(None)
+    assert "banco" in etapas.tempos
+
+
+def nomes(tabela):
+    return [tabela.item(linha, 1).text() for linha in range(tabela.rowCount())]
+
+
+def test_janela_pinta_a_copia_local_antes_do_banco(request, qapp, logic):
+    # Cópia local de uma execução anterior, diferente do que está no banco
+    salvar_instantaneo(caminho_instantaneo(logic.arquivo_dados), {
+        "versao": 1,
+        "linhas": {dia: [["antigo", "06:00", "Antigo", "/m/antigo.mp3"]] for dia in DIAS_SEMANA},
+    })
+    for dia in DIAS_SEMANA:
+        logic.adicionar_musica(dia, "07:00", "Entrada", "/m/entrada.mp3")
+
+    janela = request.getfixturevalue("janela")
+    tabela = janela.table_widget
+    assert nomes(tabela) == ["Antigo"]
+    assert "cópia local da programação exibida" in janela.etapas_inicializacao.tempos
+
+    janela.iniciar_etapas()
+    assert processar_eventos(qapp, lambda: nomes(tabela) == ["Entrada"])
+    # Terminada a carga, a cópia local passa a refletir o banco
+    esperado = json.loads(json.dumps(logic.exportar_programacao()))
+    assert processar_eventos(qapp, lambda: carregar_instantaneo(janela.arquivo_instantaneo) == esperado)
@@ -0,0 +1,193 @@
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from app_logic import DIAS_SEMANA, MusicAppLogic
+from conftest import RAIZ, contar
+from sync import (
+    HttpSyncClient,
+    PastaSyncClient,
+    SyncServer,
+    aplicar_resposta,
+    exportar_para_pasta,
+    montar_resposta,
+)
+
+
+def banco_sem_diario(caminho):
+    """Banco criado por uma versão antiga: linhas sem nenhuma entrada no registro de alterações."""
+    conn = sqlite3.connect(caminho)
+    conn.execute("CREATE TABLE segunda (hora TEXT, nome TEXT, musica TEXT)")
+    conn.executemany(
+        "INSERT INTO segunda VALUES (?, ?, ?)",
+        [("07:00", "Entrada", "entrada.mp3"), ("12:00", "Almoço", "almoco.mp3"), ("17:00", "Saída", "saida.mp3")],
+    )
+    conn.commit()
+    conn.close()
+    return MusicAppLogic(caminho)
+
+
+def programacao(logic):
+    return {dia: sorted(logic.get_linhas_por_dia(dia)) for dia in DIAS_SEMANA}
+
+
+def puxar(banco, url, *opcoes):
+    """Um cliente em outro processo, como uma estação de verdade."""
+    saida = subprocess.run(
+        [sys.executable, "sync.py", "puxar", banco, url, *opcoes], cwd=RAIZ, capture_output=True, text=True, timeout=60
+    )
+    assert saida.returncode == 0, saida.stderr
+    return int(saida.stdout.split()[0])
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    banco = str(tmp_path / "servidor.db")
+    logic = banco_sem_diario(banco)
+    servidor = SyncServer(banco, host="127.0.0.1", porta=0)
+    servidor.iniciar()
+    yield logic, f"http://127.0.0.1:{servidor.porta}"
+    servidor.parar()
+
+
+def test_servidor_prepara_o_banco_na_propria_thread(tmp_path):
+    banco = str(tmp_path / "servidor.db")
+    servidor = SyncServer(banco, host="127.0.0.1", porta=0)
+    try:
+        # Criar o servidor (o que a interface faz) só abre a porta, sem tocar no SQLite
+        assert not os.path.exists(banco)
+        servidor.iniciar()
+        assert puxar(str(tmp_path / "cliente.db"), f"http://127.0.0.1:{servidor.porta}") == 0
+        assert contar(banco, "alteracoes") == 0
+    finally:
+        servidor.parar()
+
+
+def test_dois_clientes_em_processos_separados_convergem_sem_crescer_o_diario(tmp_path, servidor):
+    logic_servidor, url = servidor
+    clientes = [str(tmp_path / f"cliente{numero}.db") for numero in (1, 2)]
+
+    # Primeira sincronização: cópia completa de um servidor com o diário vazio
+    assert [puxar(banco, url) for banco in clientes] == [3, 3]
+    diarios = [contar(banco, "alteracoes") for banco in clientes]
+    grupos = [contar(banco, "grupos_alteracoes") for banco in clientes]
+    for banco in clientes:
+        assert MusicAppLogic(banco).versao_remota() == 0
+        assert programacao(MusicAppLogic(banco)) == programacao(logic_servidor)
+
+    # Laço de consultas sem novidades no servidor: nada muda nos clientes
+    for _ in range(3):
+        assert [puxar(banco, url) for banco in clientes] == [0, 0]
+    assert [contar(banco, "alteracoes") for banco in clientes] == diarios
+    assert [contar(banco, "grupos_alteracoes") for banco in clientes] == grupos
+
+    # Uma alteração no servidor chega aos dois clientes como uma única entrada
+    logic_servidor.adicionar_musica("quarta", "09:30", "Recreio", "recreio.mp3")
+    assert [puxar(banco, url) for banco in clientes] == [1, 1]
+    assert [contar(banco, "alteracoes") for banco in clientes] == [total + 1 for total in diarios]
+    for _ in range(2):
+        assert [puxar(banco, url) for banco in clientes] == [0, 0]
+    assert [contar(banco, "alteracoes") for banco in clientes] == [total + 1 for total in diarios]
+    for banco in clientes:
+        assert programacao(MusicAppLogic(banco)) == programacao(logic_servidor)
+        assert MusicAppLogic(banco).versao_remota() == logic_servidor.versao_atual()
+
+
+def test_copia_completa_igual_a_local_nao_grava_nada(tmp_path):
+    servidor = banco_sem_diario(str(tmp_path / "servidor.db"))
+    cliente = MusicAppLogic(str(tmp_path / "cliente.db"))
+    assert cliente.versao_remota() == -1
+    resposta = montar_resposta(servidor, cliente.versao_remota())
+    assert "programacao" in resposta
+    assert aplicar_resposta(cliente, resposta) == 3
+
+    diario = contar(cliente.arquivo_dados, "alteracoes")
+    grupos = contar(cliente.arquivo_dados, "grupos_alteracoes")
+    # Mesmo forçando outra cópia completa, linhas iguais não viram "update"
+    assert cliente.substituir_programacao(servidor.exportar_programacao()) == 0
+    assert aplicar_resposta(cliente, montar_resposta(servidor, cliente.versao_remota())) == 0
+    assert contar(cliente.arquivo_dados, "alteracoes") == diario
+    assert contar(cliente.arquivo_dados, "grupos_alteracoes") == grupos
+
+
+def test_pasta_compartilhada(tmp_path):
+    servidor = banco_sem_diario(str(tmp_path / "servidor.db"))
+    pasta = str(tmp_path / "compartilhada")
+    cliente = MusicAppLogic(str(tmp_path / "cliente.db"))
+
+    exportar_para_pasta(servidor, pasta)
+    assert PastaSyncClient(cliente, pasta).sincronizar() == 3
+    assert PastaSyncClient(cliente, pasta).sincronizar() == 0
+
+    [id_linha] = servidor.buscar_ids("segunda", "12:00", "Almoço")
+    servidor.editar_musica_por_id("segunda", id_linha, "hora", "12:10")
+    exportar_para_pasta(servidor, pasta)
+    diario = contar(cliente.arquivo_dados, "alteracoes")
+    assert PastaSyncClient(cliente, pasta).sincronizar() == 1
+    assert contar(cliente.arquivo_dados, "alteracoes") == diario + 1
+    assert programacao(cliente) == programacao(servidor)
+
+
+def test_servidor_aberto_a_rede_exige_token(tmp_path):
+    with pytest.raises(ValueError):
+        SyncServer(str(tmp_path / "servidor.db"), host="0.0.0.0", porta=0)
+
+
+def test_cliente_sem_o_token_e_recusado(tmp_path):
+    banco = str(tmp_path / "servidor.db")
+    banco_sem_diario(banco)
+    servidor = SyncServer(banco, host="127.0.0.1", porta=0, token="segredo")
+    servidor.iniciar()
+    try:
+        url = f"http://127.0.0.1:{servidor.porta}"
+        for token in (None, "errado"):
+            cliente = MusicAppLogic(str(tmp_path / "cliente.db"))
+            with pytest.raises(RuntimeError, match="403"):
+                HttpSyncClient(cliente, url, token).sincronizar()
+            assert cliente.versao_remota() == -1
+        assert puxar(str(tmp_path / "cliente.db"), url, "--token", "segredo") == 3
+    finally:
+        servidor.parar()
+
+
+def test_cliente_a_frente_do_servidor_recriado_recebe_copia_completa(tmp_path, servidor):
+    logic_servidor, url = servidor
+    cliente = str(tmp_path / "cliente.db")
+    backup = str(tmp_path / "backup.db")
+    shutil.copy(logic_servidor.arquivo_dados, backup)
+    for hora in ("08:00", "09:00", "10:00"):
+        logic_servidor.adicionar_musica("terça", hora, "Aula", "aula.mp3")
+    puxar(cliente, url)
+    assert MusicAppLogic(cliente).versao_remota() == logic_servidor.versao_atual() == 3
+
+    # O banco do servidor é restaurado: a versão volta para trás da que o cliente já recebeu
+    shutil.copy(backup, logic_servidor.arquivo_dados)
+    logic_servidor.adicionar_musica("sexta", "17:00", "Saída", "saida.mp3")
+    assert logic_servidor.versao_atual() == 1
+
+    assert puxar(cliente, url) > 0
+    assert programacao(MusicAppLogic(cliente)) == programacao(logic_servidor)
+    assert MusicAppLogic(cliente).versao_remota() == 1
+    assert puxar(cliente, url) == 0
+
+
+def test_pasta_de_servidor_recriado_substitui_a_programacao(tmp_path):
+    pasta = str(tmp_path / "compartilhada")
+    cliente = MusicAppLogic(str(tmp_path / "cliente.db"))
+    antigo = banco_sem_diario(str(tmp_path / "antigo.db"))
+    for hora in ("08:00", "09:00"):
+        antigo.adicionar_musica("terça", hora, "Aula", "aula.mp3")
+    exportar_para_pasta(antigo, pasta)
+    PastaSyncClient(cliente, pasta).sincronizar()
+    assert cliente.versao_remota() == 2
+
+    novo = MusicAppLogic(str(tmp_path / "novo.db"))
+    novo.adicionar_musica("sexta", "17:00", "Saída", "saida.mp3")
+    exportar_para_pasta(novo, pasta)
+    assert PastaSyncClient(cliente, pasta).sincronizar() > 0
+    assert programacao(cliente) == programacao(novo)
+    assert cliente.versao_remota() == 1
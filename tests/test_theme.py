@@ -0,0 +1,111 @@
+import pytest
+
+pytest.importorskip("PyQt5.QtWidgets", exc_type=ImportError)
+
+from PyQt5.QtCore import QEvent  # noqa: E402
+from PyQt5.QtWidgets import QApplication, QPushButton, QWidget  # noqa: E402
+
+import theme  # noqa: E402
+from theme import (  # noqa: E402
+    ESTILO_APLICATIVO,
+    ESTILO_BAIXO_RENDER,
+    VARIAVEL_BAIXO_RENDER,
+    SombraWidget,
+    aplicar_tema,
+    baixo_render_ativo,
+    folha_de_estilo,
+    medir_repinturas,
+    pixmap_sombra,
+)
+
+
+@pytest.fixture
+def app(qapp, monkeypatch):
+    monkeypatch.delenv(VARIAVEL_BAIXO_RENDER, raising=False)
+    yield qapp
+    aplicar_tema(qapp, False)
+    qapp.setStyleSheet("")
+
+
+@pytest.fixture
+def botao(app):
+    pai = QWidget()
+    pai.resize(300, 200)
+    botao = QPushButton("Play", pai)
+    botao.setGeometry(50, 40, 90, 40)
+    pai.show()
+    yield botao
+    pai.close()
+
+
+def test_folha_de_estilo_unica(app, monkeypatch):
+    assert folha_de_estilo() == ESTILO_APLICATIVO
+    assert folha_de_estilo(True) == ESTILO_APLICATIVO + ESTILO_BAIXO_RENDER
+
+    aplicar_tema(app)
+    assert app.styleSheet() == ESTILO_APLICATIVO and not baixo_render_ativo()
+    monkeypatch.setenv(VARIAVEL_BAIXO_RENDER, "1")
+    aplicar_tema(app)
+    assert app.styleSheet() == folha_de_estilo(True) and baixo_render_ativo()
+
+
+def test_sombra_renderizada_uma_vez_por_tamanho(app):
+    theme._cache_sombras.clear()
+    sombra = pixmap_sombra(90, 40, 16, 110, 5)
+    assert (sombra.width(), sombra.height()) == (90 + 32, 40 + 32)
+    assert pixmap_sombra(90, 40, 16, 110, 5) is sombra
+    assert pixmap_sombra(40, 40, 16, 110, 5) is not sombra
+    assert len(theme._cache_sombras) == 2
+
+    imagem = sombra.toImage()
+    # Opaca sob o botão, desvanecendo até a transparência nas bordas
+    assert imagem.pixelColor(61, 36).alpha() > 0
+    assert imagem.pixelColor(0, 0).alpha() == 0
+
+
+def test_sombra_acompanha_o_botao(app, botao):
+    aplicar_tema(app)
+    sombra = SombraWidget(botao)
+    assert botao.graphicsEffect() is None
+    assert sombra.parentWidget() is botao.parentWidget() and sombra.isVisible()
+    assert sombra.geometry().getRect() == (50 - 16, 40 - 16 + 3, 90 + 32, 40 + 32)
+
+    botao.move(100, 100)
+    assert sombra.geometry().topLeft().x() == 100 - 16
+    botao.hide()
+    assert not sombra.isVisible()
+    botao.show()
+    assert sombra.isVisible()
+
+    # Modo leve: nenhuma sombra é desenhada
+    aplicar_tema(app, baixo_render=True)
+    assert not sombra.isVisible()
+    aplicar_tema(app)
+    assert sombra.isVisible()
+
+
+def test_trocar_o_tema_depois_de_fechar_a_janela(app):
+    pai = QWidget()
+    botao = QPushButton("Novo", pai)
+    sombra = SombraWidget(botao)
+    botao.deleteLater()
+    QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    aplicar_tema(app, baixo_render=True)
+    assert sombra not in theme._sombras
+    pai.deleteLater()
+    QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    aplicar_tema(app)
+
+
+def test_medir_repinturas(app):
+    resultados = medir_repinturas(repeticoes=5)
+    assert list(resultados) == ["QGraphicsDropShadowEffect", "sombra em cache", "modo leve"]
+    assert all(milissegundos > 0 for milissegundos in resultados.values())
+    assert not baixo_render_ativo()
+
+
+def test_janela_usa_so_a_folha_do_aplicativo(janela):
+    widgets = janela.findChildren(QWidget)
+    assert [widget for widget in widgets if widget.graphicsEffect() is not None] == []
+    assert [widget.objectName() for widget in widgets if widget.styleSheet()] == []
+    assert any(isinstance(widget, SombraWidget) for widget in widgets)
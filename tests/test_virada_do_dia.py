@@ -0,0 +1,51 @@
+import time
+from datetime import date
+
+import pytest
+
+from agendador import instante_do_horario, proxima_meia_noite
+
+
+@pytest.fixture
+def janela_virada(janela, monkeypatch):
+    janela.perdidos = []
+    monkeypatch.setattr(janela, "registrar_sinais_perdidos", lambda *args: janela.perdidos.append(args))
+    janela.agendador.trocar_dia("segunda")
+    janela.agendador.disparados.add(("1", 8 * 3600))
+    janela.set_selected_day("segunda")
+    return janela
+
+
+def test_virada_troca_o_dia_e_rearma(janela_virada, monkeypatch):
+    janela = janela_virada
+    monkeypatch.setattr(janela, "dia_atual", lambda: "terça")
+    janela.on_virada_do_dia()
+
+    assert janela.agendador.dia == "terça" and janela.agendador.disparados == set()
+    assert janela.selected_day == "terça" and janela.buttons["terça"].isChecked()
+    assert not janela.buttons["segunda"].isChecked()
+    # Primeiro fecha o dia que terminou, depois confere o novo
+    meia_noite = instante_do_horario(0)
+    assert janela.perdidos == [(meia_noite, date.fromtimestamp(meia_noite - 1)), ()]
+
+    assert janela.virada_timer.isActive()
+    restante_ms = (proxima_meia_noite() - time.time()) * 1000
+    assert abs(janela.virada_timer.remainingTime() - restante_ms) < 1000
+
+
+def test_acordar_antes_da_virada_so_rearma(janela_virada, monkeypatch):
+    janela = janela_virada
+    monkeypatch.setattr(janela, "dia_atual", lambda: "segunda")
+    janela.virada_timer.stop()
+    janela.on_virada_do_dia()
+    assert janela.agendador.disparados == {("1", 8 * 3600)}
+    assert janela.perdidos == []
+    assert janela.virada_timer.isActive()
+
+
+def test_fim_de_semana_mantem_o_dia_selecionado(janela_virada, monkeypatch):
+    janela = janela_virada
+    monkeypatch.setattr(janela, "dia_atual", lambda: None)
+    janela.on_virada_do_dia()
+    assert janela.agendador.dia is None and janela.agendador.agenda == ()
+    assert janela.selected_day == "segunda"
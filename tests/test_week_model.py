@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+pytest.importorskip("PyQt5.QtCore", exc_type=ImportError)
+
+from PyQt5.QtCore import QModelIndex, Qt, qInstallMessageHandler  # noqa: E402
+from PyQt5.QtTest import QAbstractItemModelTester  # noqa: E402
+
+from app_logic import DIAS_SEMANA, montar_sequencia  # noqa: E402
+from week_model import TIPO_MIME_SINAIS, WeekModel  # noqa: E402
+
+
+@pytest.fixture
+def modelo(qapp, logic):
+    logic.adicionar_musicas(["segunda", "quarta"], "07:00", "Entrada", "/m/sino.mp3")
+    logic.adicionar_musica("segunda", "07:00", "Hino", montar_sequencia(["/m/vinheta.mp3", "/m/hino.mp3"]))
+    logic.adicionar_musica("terça", "12:00", "Almoço", "/m/almoco.mp3")
+    modelo = WeekModel()
+    # Confere a consistência do modelo (contagens, índices e sinais de reset) a cada operação
+    falhas = []
+    anterior = qInstallMessageHandler(
+        lambda tipo, contexto, mensagem: falhas.append(mensagem) if contexto.category == "qt.modeltest" else None
+    )
+    modelo.testador = QAbstractItemModelTester(modelo, QAbstractItemModelTester.FailureReportingMode.Warning)
+    modelo.carregar(logic.get_semana())
+    yield modelo
+    qInstallMessageHandler(anterior)
+    assert falhas == []
+
+
+def celula(modelo, hora, dia, role=Qt.DisplayRole):
+    linha = [modelo.headerData(linha, Qt.Vertical) for linha in range(modelo.rowCount())].index(hora)
+    return modelo.data(modelo.index(linha, DIAS_SEMANA.index(dia)), role)
+
+
+def test_linhas_por_horario_e_colunas_por_dia(modelo):
+    assert modelo.rowCount() == 2 and modelo.columnCount() == len(DIAS_SEMANA)
+    assert modelo.rowCount(modelo.index(0, 0)) == 0
+    assert [modelo.headerData(coluna, Qt.Horizontal) for coluna in range(modelo.columnCount())] == [
+        dia.capitalize() for dia in DIAS_SEMANA
+    ]
+    assert [modelo.headerData(linha, Qt.Vertical) for linha in range(modelo.rowCount())] == ["07:00", "12:00"]
+    assert modelo.headerData(0, Qt.Horizontal, Qt.ToolTipRole) is None
+
+
+def test_texto_dica_e_flags_das_celulas(modelo):
+    assert celula(modelo, "07:00", "segunda") == "Entrada / Hino"
+    assert celula(modelo, "07:00", "segunda", Qt.ToolTipRole) == (
+        "07:00 Entrada: sino.mp3\n07:00 Hino: vinheta.mp3 + hino.mp3"
+    )
+    assert celula(modelo, "12:00", "terça") == "Almoço"
+    assert celula(modelo, "12:00", "segunda") is None
+    assert celula(modelo, "07:00", "segunda", Qt.DecorationRole) is None
+
+    cheia = modelo.index(0, DIAS_SEMANA.index("segunda"))
+    vazia = modelo.index(0, DIAS_SEMANA.index("sexta"))
+    assert modelo.flags(cheia) & Qt.ItemIsDragEnabled and modelo.flags(cheia) & Qt.ItemIsSelectable
+    assert not modelo.flags(vazia) & Qt.ItemIsDragEnabled
+    assert modelo.flags(vazia) & Qt.ItemIsDropEnabled
+
+
+def test_recarregar_depois_de_outra_gravacao(modelo, logic):
+    resets = []
+    modelo.modelReset.connect(lambda: resets.append(modelo.rowCount()))
+    [id_almoco] = logic.buscar_ids("terça", "12:00", "Almoço")
+    logic.editar_musica_por_id("terça", id_almoco, "hora", "06:30")
+    logic.adicionar_musica("sexta", "17:00", "Saída", "/m/saida.mp3")
+
+    modelo.carregar(logic.get_semana())
+    assert resets == [3]
+    assert [modelo.headerData(linha, Qt.Vertical) for linha in range(modelo.rowCount())] == ["06:30", "07:00", "17:00"]
+    assert celula(modelo, "06:30", "terça") == "Almoço"
+    assert celula(modelo, "17:00", "sexta") == "Saída"
+
+    modelo.carregar([])
+    assert modelo.rowCount() == 0
+
+
+def test_arrastar_para_outro_dia_pede_a_copia_sem_repetir(modelo):
+    pedidos = []
+    modelo.copia_solicitada.connect(lambda destino, operacoes: pedidos.append((destino, operacoes)))
+    origem = [modelo.index(0, DIAS_SEMANA.index("segunda")), modelo.index(1, DIAS_SEMANA.index("terça"))]
+    dados = modelo.mimeData(origem)
+    assert [sinal[:3] for sinal in json.loads(bytes(dados.data(TIPO_MIME_SINAIS)))] == [
+        ["segunda", "07:00", "Entrada"], ["segunda", "07:00", "Hino"], ["terça", "12:00", "Almoço"],
+    ]
+
+    # A quarta já tem a Entrada das 07:00: só o Hino e o Almoço são copiados
+    assert modelo.dropMimeData(dados, Qt.CopyAction, -1, -1, modelo.index(0, DIAS_SEMANA.index("quarta")))
+    [(destino, operacoes)] = pedidos
+    assert destino == "quarta"
+    assert [(operacao["hora"], operacao["nome"]) for operacao in operacoes] == [("07:00", "Hino"), ("12:00", "Almoço")]
+    assert all(operacao["operacao"] == "adicionar" and operacao["dia"] == "quarta" for operacao in operacoes)
+
+    assert not modelo.dropMimeData(dados, Qt.CopyAction, -1, 99, QModelIndex())
@@ -0,0 +1,220 @@
+import os
+import sys
+import time
+import weakref
+
+from PyQt5 import sip
+from PyQt5.QtCore import QEvent, QRectF, Qt
+from PyQt5.QtGui import QColor, QImage, QPainter, QPainterPath, QPixmap
+from PyQt5.QtWidgets import (
+    QApplication,
+    QGraphicsBlurEffect,
+    QGraphicsPixmapItem,
+    QGraphicsScene,
+    QWidget,
+)
+
+
+VARIAVEL_BAIXO_RENDER = "SINAL_BAIXO_RENDER"
+
+# Folha de estilo única do aplicativo; os widgets são identificados por objectName
+ESTILO_APLICATIVO = """
+QWidget#painelCentral { background-color: #003b71; }
+QWidget#barraInferior { background-color: #f1c50e; }
+QLabel#relogio, QLabel#status { color: white; background-color: transparent; }
+QPushButton { background-color: white; color: black; border-radius: 5px; border: 1px solid black; }
+QPushButton:checked { background-color: #f1c50e; }
+QTableWidget { background-color: rgba(3, 119, 175, 0.5); color: white; border: 1px solid lightgray; gridline-color: lightgray; }
+QHeaderView::section { background-color: lightgray; }
+QDialog { background-color: white; }
+QFrame#painelDicas { background-color: #f6f6f6; border: 1px solid #d4d4d4; border-radius: 8px; }
+QLabel#tituloDicas { color: #1f1f1f; }
+QLabel#textoDicas, QLabel#textoSecundario { color: #333333; }
+QToolButton#botaoAtualizar { background-color: transparent; }
+"""
+
+# Sem cantos arredondados nem transparência: tudo é pintado com cores opacas
+ESTILO_BAIXO_RENDER = """
+QPushButton { border-radius: 0px; }
+QTableWidget { background-color: rgb(2, 89, 144); }
+QFrame#painelDicas { border-radius: 0px; }
+"""
+
+_estado = {"baixo_render": False}
+_sombras = weakref.WeakSet()
+_cache_sombras = {}
+
+
+def baixo_render_forcado():
+    return os.environ.get(VARIAVEL_BAIXO_RENDER) == "1"
+
+
+def baixo_render_ativo():
+    return _estado["baixo_render"]
+
+
+def folha_de_estilo(baixo_render=False):
+    return ESTILO_APLICATIVO + (ESTILO_BAIXO_RENDER if baixo_render else "")
+
+
+def aplicar_tema(app, baixo_render=False):
+    """Aplica a folha de estilo do aplicativo e mostra ou oculta as sombras."""
+    baixo_render = baixo_render or baixo_render_forcado()
+    _estado["baixo_render"] = baixo_render
+    app.setStyleSheet(folha_de_estilo(baixo_render))
+    for sombra in list(_sombras):
+        # A sombra (ou o botão) pode já ter sido destruída junto com uma janela fechada
+        if sip.isdeleted(sombra) or sip.isdeleted(sombra.alvo):
+            _sombras.discard(sombra)
+            continue
+        sombra.sincronizar()
+
+
+def pixmap_sombra(largura, altura, desfoque, opacidade, raio):
+    """Sombra de um retângulo arredondado, renderizada uma única vez por tamanho e parâmetros.
+
+    Os botões do aplicativo têm tamanho fixo, então o cache fica com poucas imagens.
+    """
+    chave = (largura, altura, desfoque, opacidade, raio)
+    pixmap = _cache_sombras.get(chave)
+    if pixmap is not None:
+        return pixmap
+
+    largura_total = largura + 2 * desfoque
+    altura_total = altura + 2 * desfoque
+    forma = QImage(largura_total, altura_total, QImage.Format_ARGB32_Premultiplied)
+    forma.fill(Qt.transparent)
+    painter = QPainter(forma)
+    painter.setRenderHint(QPainter.Antialiasing)
+    caminho = QPainterPath()
+    caminho.addRoundedRect(QRectF(desfoque, desfoque, largura, altura), raio, raio)
+    painter.fillPath(caminho, QColor(0, 0, 0, opacidade))
+    painter.end()
+
+    # O desfoque é feito pela cena gráfica apenas aqui, nunca durante a pintura dos botões
+    cena = QGraphicsScene()
+    item = QGraphicsPixmapItem(QPixmap.fromImage(forma))
+    efeito = QGraphicsBlurEffect()
+    efeito.setBlurRadius(desfoque)
+    item.setGraphicsEffect(efeito)
+    cena.addItem(item)
+    area = QRectF(0, 0, largura_total, altura_total)
+    resultado = QImage(largura_total, altura_total, QImage.Format_ARGB32_Premultiplied)
+    resultado.fill(Qt.transparent)
+    painter = QPainter(resultado)
+    cena.render(painter, area, area)
+    painter.end()
+
+    pixmap = QPixmap.fromImage(resultado)
+    _cache_sombras[chave] = pixmap
+    return pixmap
+
+
+class SombraWidget(QWidget):
+    """Sombra desenhada atrás de um widget a partir de uma imagem em cache.
+
+    Substitui o ``QGraphicsDropShadowEffect``, que obrigava cada repintura do
+    botão a passar por uma renderização fora da tela com desfoque.
+    """
+
+    def __init__(self, alvo, desfoque=16, deslocamento_x=0, deslocamento_y=3, opacidade=110, raio=5):
+        super().__init__(alvo.parentWidget())
+        self.alvo = alvo
+        self.desfoque = desfoque
+        self.deslocamento_x = deslocamento_x
+        self.deslocamento_y = deslocamento_y
+        self.opacidade = opacidade
+        self.raio = raio
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setFocusPolicy(Qt.NoFocus)
+        alvo.installEventFilter(self)
+        _sombras.add(self)
+        self.sincronizar()
+
+    def eventFilter(self, objeto, evento):
+        if objeto is self.alvo and evento.type() in (
+            QEvent.Move, QEvent.Resize, QEvent.Show, QEvent.Hide, QEvent.ParentChange
+        ):
+            self.sincronizar()
+        return False
+
+    def sincronizar(self):
+        pai = self.alvo.parentWidget()
+        if self.parentWidget() is not pai:
+            self.setParent(pai)
+        if pai is None or baixo_render_ativo() or self.alvo.isHidden():
+            self.hide()
+            return
+        self.setGeometry(
+            self.alvo.geometry()
+            .adjusted(-self.desfoque, -self.desfoque, self.desfoque, self.desfoque)
+            .translated(self.deslocamento_x, self.deslocamento_y)
+        )
+        self.stackUnder(self.alvo)
+        self.show()
+
+    def paintEvent(self, event):
+        tamanho = self.alvo.size()
+        painter = QPainter(self)
+        painter.drawPixmap(
+            0, 0, pixmap_sombra(tamanho.width(), tamanho.height(), self.desfoque, self.opacidade, self.raio)
+        )
+        painter.end()
+
+
+def medir_repinturas(repeticoes=300):
+    """Compara o tempo de repintura de uma barra de botões em cada modo de sombra."""
+    from PyQt5.QtWidgets import QGraphicsDropShadowEffect, QHBoxLayout, QPushButton
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    def sombra_antiga(botao):
+        efeito = QGraphicsDropShadowEffect(botao)
+        efeito.setBlurRadius(16)
+        efeito.setOffset(0, 3)
+        efeito.setColor(QColor(0, 0, 0, 110))
+        botao.setGraphicsEffect(efeito)
+
+    def montar_barra(adicionar_sombra):
+        barra = QWidget()
+        barra.setObjectName("barraInferior")
+        layout = QHBoxLayout(barra)
+        layout.setContentsMargins(10, 10, 10, 10)
+        botoes = []
+        for texto in ("Novo", "Play", "Parar", "Deletar", "?"):
+            botao = QPushButton(texto)
+            botao.setFixedSize(90 if texto != "?" else 40, 40)
+            layout.addWidget(botao)
+            if adicionar_sombra is not None:
+                adicionar_sombra(botao)
+            botoes.append(botao)
+        barra.resize(450, 60)
+        return barra, botoes
+
+    resultados = {}
+    modos = (
+        ("QGraphicsDropShadowEffect", False, sombra_antiga),
+        ("sombra em cache", False, SombraWidget),
+        ("modo leve", True, SombraWidget),
+    )
+    for nome, baixo_render, adicionar_sombra in modos:
+        aplicar_tema(app, baixo_render)
+        barra, botoes = montar_barra(adicionar_sombra)
+        barra.show()
+        app.processEvents()
+        inicio = time.perf_counter()
+        for indice in range(repeticoes):
+            # Simula a troca de estado de um botão (hover/clique) seguida de repintura imediata
+            botoes[indice % len(botoes)].repaint()
+        resultados[nome] = (time.perf_counter() - inicio) * 1000 / repeticoes
+        barra.close()
+        barra.deleteLater()
+        app.processEvents()
+    aplicar_tema(app, False)
+    return resultados
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    for nome, milissegundos in medir_repinturas().items():
+        print(f"{nome}: {milissegundos:.3f} ms por repintura de botão")
@@ -0,0 +1,115 @@
+import json
+
+from PyQt5.QtCore import QAbstractTableModel, QMimeData, QModelIndex, Qt, pyqtSignal
+
+from app_logic import DIAS_SEMANA
+
+
+TIPO_MIME_SINAIS = "application/x-sinal-sinais"
+
+
+class WeekModel(QAbstractTableModel):
+    """Programação da semana: uma linha por horário e uma coluna por dia.
+
+    O modelo guarda só os ``SinalProgramado`` de ``MusicAppLogic.get_semana``;
+    o texto de cada célula é montado em ``data`` quando a view pede, e a view só
+    pede as células visíveis. Soltar células em outra coluna não grava nada:
+    o modelo emite ``copia_solicitada`` com as operações de
+    ``MusicAppLogic.aplicar_lote`` (os sinais mantêm o horário e quem já
+    existir igual no dia de destino é ignorado).
+    """
+
+    copia_solicitada = pyqtSignal(str, list)  # dia de destino, operações
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._horarios = []
+        self._celulas = {}  # (linha, coluna) -> [SinalProgramado]
+        self._existentes = {dia: set() for dia in DIAS_SEMANA}
+
+    def carregar(self, sinais):
+        """Substitui o conteúdo pelos sinais de todos os dias, já ordenados por horário."""
+        self.beginResetModel()
+        self._horarios = []
+        self._celulas = {}
+        self._existentes = {dia: set() for dia in DIAS_SEMANA}
+        linha_do_horario = {}
+        for sinal in sinais:
+            if sinal.hora not in linha_do_horario:
+                linha_do_horario[sinal.hora] = len(self._horarios)
+                self._horarios.append(sinal.hora)
+            chave = (linha_do_horario[sinal.hora], DIAS_SEMANA.index(sinal.dia))
+            self._celulas.setdefault(chave, []).append(sinal)
+            self._existentes[sinal.dia].add((sinal.hora, sinal.nome, sinal.musica))
+        self.endResetModel()
+
+    def sinais(self, index):
+        return self._celulas.get((index.row(), index.column()), [])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._horarios)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(DIAS_SEMANA)
+
+    def data(self, index, role=Qt.DisplayRole):
+        sinais = self.sinais(index)
+        if not sinais:
+            return None
+        if role == Qt.DisplayRole:
+            return " / ".join(sinal.nome for sinal in sinais)
+        if role == Qt.ToolTipRole:
+            return "\n".join(f"{sinal.hora} {sinal.nome}: {sinal.rotulo}" for sinal in sinais)
+        return None
+
+    def headerData(self, secao, orientacao, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientacao == Qt.Horizontal:
+            return DIAS_SEMANA[secao].capitalize()
+        return self._horarios[secao]
+
+    def flags(self, index):
+        if not index.isValid():
+            # A raiz só aceita soltar (contrato do QAbstractItemModel)
+            return Qt.ItemIsDropEnabled
+        flags = Qt.ItemIsEnabled | Qt.ItemIsDropEnabled
+        if self.sinais(index):
+            flags |= Qt.ItemIsSelectable | Qt.ItemIsDragEnabled
+        return flags
+
+    def mimeTypes(self):
+        return [TIPO_MIME_SINAIS]
+
+    def supportedDragActions(self):
+        return Qt.CopyAction
+
+    def supportedDropActions(self):
+        return Qt.CopyAction
+
+    def mimeData(self, indexes):
+        sinais = [
+            [sinal.dia, sinal.hora, sinal.nome, sinal.musica]
+            for index in indexes
+            for sinal in self.sinais(index)
+        ]
+        dados = QMimeData()
+        dados.setData(TIPO_MIME_SINAIS, json.dumps(sinais, ensure_ascii=False).encode("utf-8"))
+        return dados
+
+    def dropMimeData(self, dados, acao, linha, coluna, parent):
+        if acao == Qt.IgnoreAction:
+            return True
+        coluna = parent.column() if parent.isValid() else coluna
+        if not dados.hasFormat(TIPO_MIME_SINAIS) or not 0 <= coluna < len(DIAS_SEMANA):
+            return False
+        destino = DIAS_SEMANA[coluna]
+        vistos = set(self._existentes[destino])
+        operacoes = []
+        for dia, hora, nome, musica in json.loads(bytes(dados.data(TIPO_MIME_SINAIS)).decode("utf-8")):
+            if dia == destino or (hora, nome, musica) in vistos:
+                continue
+            vistos.add((hora, nome, musica))
+            operacoes.append({"operacao": "adicionar", "dia": destino, "hora": hora, "nome": nome, "musica": musica})
+        self.copia_solicitada.emit(destino, operacoes)
+        return True